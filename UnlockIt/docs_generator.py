@@ -3,13 +3,30 @@
 
 """
 
+import hashlib
+import os
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
+
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from drf_yasg.generators import OpenAPISchemaGenerator
+from drf_yasg.renderers import _SpecRenderer
 
 from rest_framework import permissions
 
 
+API_INFO = openapi.Info(
+    title="UnlockIt API Documentation",
+    default_version="v1",
+    description="API documentation",
+)
+
+
 class CoreAPISchemeGenerator(OpenAPISchemaGenerator):
     """
     This Generator class is in charge of generating the OpenAPI schema for the UnlockIt API.
@@ -25,14 +42,113 @@ class CoreAPISchemeGenerator(OpenAPISchemaGenerator):
         return schema
 
 
-core_schema_view = get_schema_view(
-    openapi.Info(
-        title="UnlockIt API Documentation",
-        default_version="v1",
-        description="API documentation",
-    ),
+class APISchemaCache:
+    """
+    Keeps the rendered OpenAPI document in memory so the views are only introspected once per
+    process instead of on every docs request.
+
+    The schema is generated without a request, so the document does not depend on the host or
+    the user viewing it and can also be written to a file at deploy time
+    (python manage.py generate_api_schema), which is then served as is.
+    """
+
+    _documents: dict = {}
+    _schema = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_schema(cls) -> openapi.Swagger:
+        """
+        Generate the schema, once per process.
+        """
+        if cls._schema is None:
+            generator = CoreAPISchemeGenerator(API_INFO, urlconf="app.urls")
+            cls._schema = generator.get_schema(request=None, public=True)
+
+        return cls._schema
+
+    @classmethod
+    def get_document(cls, renderer: _SpecRenderer) -> tuple:
+        """
+        Return the schema rendered by the renderer, with its ETag.
+
+        Args:
+            renderer (_SpecRenderer): The JSON or YAML renderer accepted for the request.
+
+        Returns:
+            tuple: The document (bytes) and its quoted ETag.
+        """
+        document = cls._documents.get(renderer.format)
+
+        if document is None:
+            with cls._lock:
+                document = cls._documents.get(renderer.format)
+
+                if document is None:
+                    content = cls.read_schema_file(renderer) or renderer.render(cls.get_schema())
+                    etag = quote_etag(hashlib.sha256(content).hexdigest()[:32])
+                    document = cls._documents[renderer.format] = (content, etag)
+
+        return document
+
+    @staticmethod
+    def read_schema_file(renderer: _SpecRenderer) -> bytes | None:
+        """
+        Return the content of API_SCHEMA_FILE when it exists and is in the renderer format.
+        """
+        path = settings.API_SCHEMA_FILE
+
+        if not path or not os.path.isfile(path):
+            return None
+
+        is_yaml = path.endswith((".yaml", ".yml"))
+
+        if is_yaml != renderer.media_type.endswith("yaml"):
+            return None
+
+        with open(path, "rb") as f:
+            return f.read()
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._documents = {}
+            cls._schema = None
+
+
+_SchemaView = get_schema_view(
+    API_INFO,
     public=True,
     permission_classes=[permissions.AllowAny],
     urlconf="app.urls",
     generator_class=CoreAPISchemeGenerator,
 )
+
+
+class CachedSchemaView(_SchemaView):
+    """
+    Serves the cached OpenAPI document with an ETag, browsers revalidate it and get a 304 when
+    it did not change. The Swagger UI page itself does not need the full schema.
+    """
+
+    def get(self, request, version="", format=None):
+        renderer = request.accepted_renderer
+
+        if not isinstance(renderer, _SpecRenderer):
+            return super().get(request, version, format)
+
+        content, etag = APISchemaCache.get_document(renderer)
+
+        if etag in parse_etags(request.META.get("HTTP_IF_NONE_MATCH", "")):
+            response = HttpResponseNotModified()
+
+        else:
+            response = HttpResponse(content, content_type=f"{renderer.media_type}; charset=utf-8")
+
+        response["ETag"] = etag
+        patch_cache_control(response, no_cache=True, public=True)
+
+        return response
+
+
+core_schema_view = CachedSchemaView
@@ -14,19 +14,14 @@ import os
 from pathlib import Path
 import re
 
+import dj_database_url
 from environs import Env
-import firebase_admin
-from firebase_admin import credentials
 
 
 env = Env()
 env.read_env()
 
 
-cred = credentials.Certificate(env.str("GOOGLE_APPLICATION_CREDENTIALS"))
-firebase_admin.initialize_app(cred)
-
-
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 # sys.path.insert(0, os.path.join(BASE_DIR, "apps"))
@@ -39,6 +34,12 @@ DEBUG = env.bool("DEBUG", default=False)
 
 ALLOWED_HOSTS = env.str("ALLOWED_HOSTS").split(",")
 
+SHOW_DOCS = env.bool("SHOW_DOCS")
+
+# pre-generated OpenAPI document (python manage.py generate_api_schema), when not set or missing
+# the schema is generated once per process on the first docs request
+API_SCHEMA_FILE = env.str("API_SCHEMA_FILE", default=None)
+
 
 SESSION_COOKIE_SECURE = False
 
@@ -70,9 +71,12 @@ DJANGO_APPS = [
 THIRD_PARTY_APPS = [
     "rest_framework",
     "corsheaders",
-    "drf_yasg",
 ]
 
+# drf_yasg is only loaded when the documentation is served, see app.swagger
+if SHOW_DOCS:
+    THIRD_PARTY_APPS.append("drf_yasg")
+
 
 SELF_APPS = [
     "app",
@@ -82,6 +86,9 @@ SELF_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + SELF_APPS
 
 MIDDLEWARE = [
+    "app.middlewares.CorrelationIdMiddleware",
+    "app.metrics.RequestMetricsMiddleware",
+    "app.db_router.ReplicaRoutingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -93,9 +100,41 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "app.middlewares.Log500ErrorsMiddleware",
-    "djangorestframework_camel_case.middleware.CamelCaseMiddleWare",
+    "app.camel_case.CamelCaseMiddleWare",
 ]
 
+# development only, logs the N+1 and slow queries of every request (see app.query_inspector)
+QUERY_INSPECTOR_ENABLED = env.bool("QUERY_INSPECTOR_ENABLED", default=False)
+QUERY_INSPECTOR_REPEAT_THRESHOLD = env.int("QUERY_INSPECTOR_REPEAT_THRESHOLD", default=3)
+QUERY_INSPECTOR_SLOW_QUERY_MS = env.float("QUERY_INSPECTOR_SLOW_QUERY_MS", default=100)
+
+if QUERY_INSPECTOR_ENABLED:
+    MIDDLEWARE.insert(0, "app.query_inspector.QueryInspectorMiddleware")
+
+# maximum number of queries per endpoint, "<method> <url name>", checked by the
+# check_query_budgets command in CI and logged by the query inspector middleware; the GET
+# requests of the stateless_auth views do not read the user (STATELESS_AUTH_ENABLED) and a token
+# refresh inserts a row more with REFRESH_TOKEN_STORE "database"
+QUERY_BUDGETS = {
+    "POST login-view": 2,
+    "POST token-refresh-view": 1,
+    "POST sign-up-view": 7,
+    "GET profile-view": 1,
+    "GET story-views": 2,
+    "GET single-story-views": 1,
+    "GET get-story-details": 1,
+    "GET transaction-view": 2,
+    "GET referral-view": 1,
+}
+
+# INSERT, UPDATE and DELETE statements allowed per request, checked by check_query_budgets: a
+# successful login only reads
+QUERY_WRITE_BUDGETS = {
+    "POST login-view": 0,
+    "POST token-refresh-view": 0,
+    "POST sign-up-view": 3,
+}
+
 ROOT_URLCONF = "UnlockIt.urls"
 
 TEMPLATES = [
@@ -126,6 +165,50 @@ if "LIVE" in os.environ:
             "DATABASE_URL",
         ),
     }
+
+    # PgBouncer in transaction pooling mode hands every transaction a different server
+    # connection, named (server side) cursors cannot live across transactions
+    DATABASE_PGBOUNCER = env.bool("DATABASE_PGBOUNCER", default=False)
+
+    DATABASES["default"].update(
+        {
+            # seconds a connection is reused across requests, 0 opens one per request; the
+            # connections are per thread, a worker holds GUNICORN_THREADS of them plus one per
+            # running background task (see gunicorn.conf.py for the count per instance)
+            "CONN_MAX_AGE": env.int("DATABASE_CONN_MAX_AGE", default=60),
+            # ping a reused connection before the first query of a request, and reconnect if the
+            # server closed it (restart, idle timeout) instead of failing the request
+            "CONN_HEALTH_CHECKS": env.bool("DATABASE_CONN_HEALTH_CHECKS", default=True),
+            "DISABLE_SERVER_SIDE_CURSORS": DATABASE_PGBOUNCER,
+        }
+    )
+    DATABASES["default"].setdefault("OPTIONS", {}).update(
+        {
+            "connect_timeout": env.int("DATABASE_CONNECT_TIMEOUT", default=5),
+            # detect the connections dropped by a firewall or load balancer while idle
+            "keepalives": 1,
+            "keepalives_idle": 30,
+        }
+    )
+
+    # read replicas of the primary, the reads of the views marked with read_from_replica go
+    # to them (see app.db_router)
+    DATABASE_REPLICAS = []
+
+    for index, url in enumerate(env.list("DATABASE_REPLICA_URLS", default=[])):
+        alias = f"replica_{index}"
+        DATABASES[alias] = {
+            **dj_database_url.parse(url),
+            # the same connection settings as the primary
+            **{
+                key: DATABASES["default"][key]
+                for key in ("CONN_MAX_AGE", "CONN_HEALTH_CHECKS", "DISABLE_SERVER_SIDE_CURSORS")
+            },
+            "OPTIONS": DATABASES["default"]["OPTIONS"],
+            # the test runner does not create the replicas, they are the primary
+            "TEST": {"MIRROR": "default"},
+        }
+        DATABASE_REPLICAS.append(alias)
 else:
     DATABASES = {
         "default": {
@@ -133,6 +216,9 @@ else:
             "NAME": BASE_DIR / "db.sqlite3",
         }
     }
+    DATABASE_REPLICAS = []
+
+DATABASE_ROUTERS = ["app.db_router.ReplicaRouter"]
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -193,6 +279,30 @@ AUTH_USER_MODEL = "app.CustomUser"
 # overriding authentication backend
 AUTHENTICATION_BACKENDS = ["app.custom_authentication.CustomAuthenticationBackend"]
 
+# password hashing profile (see app.hashers): "pbkdf2", "scrypt" or "argon2" (after
+# pip install argon2-cffi), compare them with benchmark_password_hashing. The passwords hashed
+# with another profile or cost are rehashed on the next login.
+PASSWORD_HASHER = env.str("PASSWORD_HASHER", default="pbkdf2")
+PASSWORD_HASHER_CLASSES = {
+    "pbkdf2": "app.hashers.TunedPBKDF2PasswordHasher",
+    "scrypt": "app.hashers.TunedScryptPasswordHasher",
+    "argon2": "app.hashers.TunedArgon2PasswordHasher",
+}
+PASSWORD_HASHERS = [PASSWORD_HASHER_CLASSES[PASSWORD_HASHER]] + [
+    hasher for name, hasher in PASSWORD_HASHER_CLASSES.items() if name != PASSWORD_HASHER
+]
+
+# the defaults are the ones of Django for PBKDF2 and scrypt, the OWASP minimum for Argon2id
+PBKDF2_ITERATIONS = env.int("PBKDF2_ITERATIONS", default=390000)
+SCRYPT_WORK_FACTOR = env.int("SCRYPT_WORK_FACTOR", default=2**14)
+ARGON2_TIME_COST = env.int("ARGON2_TIME_COST", default=2)
+ARGON2_MEMORY_COST = env.int("ARGON2_MEMORY_COST", default=19456)
+ARGON2_PARALLELISM = env.int("ARGON2_PARALLELISM", default=1)
+
+# hashes running at once in a process, the other threads of a worker keep serving requests;
+# 0 for no limit
+PASSWORD_HASHING_CONCURRENCY = env.int("PASSWORD_HASHING_CONCURRENCY", default=2)
+
 
 # setting restframework authentication class
 REST_FRAMEWORK = {
@@ -200,18 +310,69 @@ REST_FRAMEWORK = {
         "app.api_authentication.MyAPIAuthentication",
     ],
     "DEFAULT_RENDERER_CLASSES": (
-        "djangorestframework_camel_case.render.CamelCaseJSONRenderer",
+        "app.camel_case.CamelCaseJSONRenderer",
         # Any other renders
     ),
     "DEFAULT_PARSER_CLASSES": (
         # If you use MultiPartFormParser or FormParser, we also have a camel case version
-        "djangorestframework_camel_case.parser.CamelCaseFormParser",
-        "djangorestframework_camel_case.parser.CamelCaseMultiPartParser",
-        "djangorestframework_camel_case.parser.CamelCaseJSONParser",
+        "app.camel_case.CamelCaseFormParser",
+        "app.camel_case.CamelCaseMultiPartParser",
+        "app.camel_case.CamelCaseJSONParser",
         # Any other parsers
     ),
+    # proxies in front of the app, their X-Forwarded-For gives the client IP of the rate limits
+    "NUM_PROXIES": env.int("NUM_PROXIES", default=0),
 }
 
+# short lived access tokens, renewed with the refresh tokens (POST auth/token/refresh/)
+ACCESS_TOKEN_LIFETIME_MINUTES = env.int("ACCESS_TOKEN_LIFETIME_MINUTES", default=15)
+REFRESH_TOKEN_LIFETIME_DAYS = env.int("REFRESH_TOKEN_LIFETIME_DAYS", default=30)
+
+# where the used refresh tokens are kept, a refresh token is exchanged once and reusing it revokes
+# the tokens of the user: "cache" needs a cache shared by the workers (REDIS_URL), the local
+# memory cache would accept a stolen token once per worker; "database" is the fallback (the
+# UsedRefreshToken table, purged by purge_stale_records)
+REFRESH_TOKEN_STORE = env.str("REFRESH_TOKEN_STORE", default=None) or (
+    "cache" if env.str("REDIS_URL", default=None) else "database"
+)
+
+# key id -> PEM private key (Ed25519 or P-256) of the tokens, see app.token_keys: the
+# JWT_ACTIVE_KEY_ID key signs, the others only verify; HS256 with SECRET_KEY when empty
+JWT_SIGNING_KEYS = env.json("JWT_SIGNING_KEYS", default="{}")
+JWT_ACTIVE_KEY_ID = env.str("JWT_ACTIVE_KEY_ID", default=None) or None
+# accept the HS256 tokens signed with SECRET_KEY, turn off once they have all expired
+JWT_ACCEPT_LEGACY_TOKENS = env.bool("JWT_ACCEPT_LEGACY_TOKENS", default=True)
+# how long the other services may cache the public keys (/api/v1/auth/jwks.json)
+JWKS_MAX_AGE = env.int("JWKS_MAX_AGE", default=3600)
+
+# Fernet keys of the download tokens, the first encrypts, the others only decrypt (rotation); the
+# key derived from SECRET_KEY still decrypts the tokens issued before them
+DOWNLOAD_TOKEN_KEYS = env.list("DOWNLOAD_TOKEN_KEYS", default=[])
+
+# the safe requests of the views marked stateless_auth are authorized from the claims of the
+# access token, without reading the user; the revocations are checked in the shared cache, so
+# on by default only with Redis
+STATELESS_AUTH_ENABLED = env.bool(
+    "STATELESS_AUTH_ENABLED", default=bool(env.str("REDIS_URL", default=None))
+)
+
+# sliding window rate limits of the public endpoints (see app.rate_limiting), per client IP and
+# per account (the email of the request), counted in the shared cache
+RATE_LIMITING_ENABLED = env.bool("RATE_LIMITING_ENABLED", default=True)
+RATE_LIMITS = {
+    "login": {"ip": "30/min", "account": "10/min"},
+    "signup": {"ip": "20/hour", "account": "5/hour"},
+    "otp": {"ip": "30/hour", "account": "10/hour"},
+    "payment_link": {"ip": "30/min", "account": "10/min"},
+    "token_refresh": {"ip": "60/min"},
+}
+
+# encoder of the API responses, "json" (standard library) or "orjson" (faster, optional package)
+API_JSON_ENCODER = env.str("API_JSON_ENCODER", default="json")
+
+# serialize the story and transaction lists from values_list() rows instead of ModelSerializers
+FAST_LIST_SERIALIZATION = env.bool("FAST_LIST_SERIALIZATION", default=True)
+
 
 # settings for swagger documentation
 SWAGGER_SETTINGS = {
@@ -222,20 +383,37 @@ SWAGGER_SETTINGS = {
 }
 
 
+# log records are written as JSON lines (LOG_FORMAT=standard for plain text) by a listener
+# thread, so the request threads never block on stdout (see app.structured_logging)
+LOG_FORMAT = env.str("LOG_FORMAT", default="json")
+LOG_LEVEL = env.str("LOG_LEVEL", default="INFO")
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
+    "filters": {
+        "correlation_id": {
+            "()": "app.structured_logging.CorrelationIdFilter",
+        },
+    },
     "formatters": {
         "standard": {
-            "format": "[%(asctime)s] %(levelname)s [%(name)s:%(lineno)s] -> %(message)s",
+            "format": (
+                "[%(asctime)s] %(levelname)s [%(name)s:%(lineno)s] [%(correlation_id)s] "
+                "-> %(message)s"
+            ),
             "datefmt": "%d/%b/%Y %H:%M:%S",
         },
+        "json": {
+            "()": "app.structured_logging.JSONFormatter",
+        },
     },
     "handlers": {
         "console": {
-            "level": "INFO",
-            "class": "logging.StreamHandler",
-            "formatter": "standard",
+            "level": LOG_LEVEL,
+            "()": "app.structured_logging.BackgroundQueueHandler",
+            "formatter": LOG_FORMAT,
+            "filters": ["correlation_id"],
         },
     },
     "loggers": {
@@ -254,6 +432,11 @@ LOGGING = {
             "level": "INFO",
             "propagate": True,
         },
+        "app": {
+            "handlers": ["console"],
+            "level": LOG_LEVEL,
+            "propagate": False,
+        },
     },
 }
 
@@ -272,9 +455,24 @@ OTP_EXPIRATION_MINUTES = 5
 OTP_GENERATE_TIME_LAPSE_MINUTES = 1
 MAX_LOGIN_ATTEMPTS = 4
 
+# where the OTPs are kept (see app.otp_store): "cache" needs a cache shared by the workers
+# (REDIS_URL), "database" is the fallback
+OTP_STORE = env.str("OTP_STORE", default=None) or (
+    "cache" if env.str("REDIS_URL", default=None) else "database"
+)
+
+# purge of the expired OTPs and archival of the abandoned checkouts (see app.maintenance): a
+# pending payment untouched for PENDING_TRANSACTION_RETENTION_HOURS is archived, in batches of
+# MAINTENANCE_BATCH_SIZE rows, each in its own short transaction
+PENDING_TRANSACTION_RETENTION_HOURS = env.int("PENDING_TRANSACTION_RETENTION_HOURS", default=168)
+MAINTENANCE_BATCH_SIZE = env.int("MAINTENANCE_BATCH_SIZE", default=1000)
+
 
 RUN_BACKGROUND_TASK = False
 
+# number of threads for in-process background tasks, 0 runs them inline
+BACKGROUND_TASK_WORKERS = env.int("BACKGROUND_TASK_WORKERS", default=2)
+
 # if "REDIS_URL" in os.environ:
 #     RUN_BACKGROUND_TASK = True
 
@@ -298,21 +496,39 @@ RUN_BACKGROUND_TASK = False
 #     CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
 
 
-# CACHES = {
-#     "default": {
-#         "BACKEND": "django.core.cache.backends.redis.RedisCache",
-#         "LOCATION": os.environ.get("REDIS_URL", "redis://" + REDIS_HOST + ":" + REDIS_PORT),
-#         "TIMEOUT": 600,
-#     }
-# }
+# shared between the workers when REDIS_URL is set, else local to each process
+if env.str("REDIS_URL", default=None):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": env.str("REDIS_URL"),
+            "TIMEOUT": 600,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "TIMEOUT": 600,
+        }
+    }
 
+# server-side cache of the public story details, invalidated when the story changes
+STORY_DETAILS_CACHE_TIMEOUT = env.int("STORY_DETAILS_CACHE_TIMEOUT", default=300)
 
-DATA_UPLOAD_MAX_MEMORY_SIZE = None
+# how long browsers and CDNs may reuse the story details before revalidating them
+STORY_DETAILS_MAX_AGE = env.int("STORY_DETAILS_MAX_AGE", default=60)
 
-FILE_UPLOAD_MAX_SIZE_MB = 100
+# story records read by the download endpoints, cached in each process for
+# STORY_CACHE_LOCAL_TIMEOUT seconds and in the shared cache for STORY_CACHE_TIMEOUT seconds
+STORY_CACHE_MAX_ENTRIES = env.int("STORY_CACHE_MAX_ENTRIES", default=1024)
+STORY_CACHE_LOCAL_TIMEOUT = env.int("STORY_CACHE_LOCAL_TIMEOUT", default=5)
+STORY_CACHE_TIMEOUT = env.int("STORY_CACHE_TIMEOUT", default=300)
 
 
-SHOW_DOCS = env.bool("SHOW_DOCS")
+DATA_UPLOAD_MAX_MEMORY_SIZE = None
+
+FILE_UPLOAD_MAX_SIZE_MB = 100
 
 
 GOOGLE_OAUTH2_CLIENT_ID = env.str("GOOGLE_OAUTH2_CLIENT_ID")
@@ -327,7 +543,26 @@ FACEBOOK_OAUTH_CLIENT_ID = env.str("FACEBOOK_OAUTH_CLIENT_ID")
 FACEBOOK_OAUTH_CLIENT_SECRET = env.str("FACEBOOK_OAUTH_CLIENT_SECRET")
 FACEBOOK_ACCESS_TOKEN_OBTAIN_URL = "https://graph.facebook.com/v19.0/oauth/access_token"
 FACEBOOK_PROFILE_ENDPOINT_URL = "https://graph.facebook.com/me"
-FACEBOOK_PROFILE_DETAILS_URL = "https://graph.facebook.com/USER-ID?fields=id,name,email,picture"
+FACEBOOK_PROFILE_FIELDS = "id,name,email,picture"
+
+
+# outbound http client settings (Stripe, Google and Facebook calls)
+OUTBOUND_HTTP_CONNECT_TIMEOUT = env.float("OUTBOUND_HTTP_CONNECT_TIMEOUT", default=5)
+OUTBOUND_HTTP_READ_TIMEOUT = env.float("OUTBOUND_HTTP_READ_TIMEOUT", default=30)
+OUTBOUND_HTTP_MAX_RETRIES = env.int("OUTBOUND_HTTP_MAX_RETRIES", default=2)
+OUTBOUND_HTTP_BACKOFF_FACTOR = env.float("OUTBOUND_HTTP_BACKOFF_FACTOR", default=0.3)
+OUTBOUND_HTTP_POOL_CONNECTIONS = env.int("OUTBOUND_HTTP_POOL_CONNECTIONS", default=4)
+OUTBOUND_HTTP_POOL_MAXSIZE = env.int("OUTBOUND_HTTP_POOL_MAXSIZE", default=10)
+OUTBOUND_HTTP_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+# request metrics, exported in the Prometheus format on /api/v1/internal/metrics/ (see app.metrics)
+# every request records its latency, status and response size, METRICS_SAMPLE_RATE of them also
+# record their SQL queries and upstream calls. The endpoint is disabled without METRICS_AUTH_TOKEN
+METRICS_ENABLED = env.bool("METRICS_ENABLED", default=True)
+METRICS_SAMPLE_RATE = env.float("METRICS_SAMPLE_RATE", default=0.1)
+METRICS_AUTH_TOKEN = env.str("METRICS_AUTH_TOKEN", default=None)
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
 
 
 DEFAULT_FILE_STORAGE = "storages.backends.s3.S3Storage"
@@ -367,4 +602,5 @@ EMAIL_PORT = 465
 EMAIL_HOST_USER = env.str("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = env.str("EMAIL_HOST_PASSWORD")
 
-GOOGLE_APPLICATION_CREDENTIALS = env.str("GOOGLE_APPLICATION_CREDENTIALS")
+# firebase admin is initialized on first use, see app.services
+GOOGLE_APPLICATION_CREDENTIALS = env.str("GOOGLE_APPLICATION_CREDENTIALS", default=None)
@@ -1,6 +1,14 @@
 from django.contrib import admin
 
-from app.models import CustomUser, Story, Transaction, Referral, OTP
+from app.models import (
+    CustomUser,
+    Story,
+    Transaction,
+    Referral,
+    OTP,
+    ArchivedTransaction,
+    UsedRefreshToken,
+)
 
 
 admin.site.register(CustomUser)
@@ -8,3 +16,5 @@ admin.site.register(Story)
 admin.site.register(Transaction)
 admin.site.register(Referral)
 admin.site.register(OTP)
+admin.site.register(ArchivedTransaction)
+admin.site.register(UsedRefreshToken)
@@ -1,10 +1,14 @@
 from random import choices
 from datetime import timedelta
 import string
+import time
 import uuid
-import jwt
 
 from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.db.models import F
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 from django.contrib.auth import get_user_model
@@ -13,16 +17,101 @@ from rest_framework.authentication import BaseAuthentication
 from rest_framework import exceptions
 
 from app.enum_classes import AccountStatuses
+from app.models import UsedRefreshToken
+from app.token_keys import TokenKeys
 
 
 USER_MODEL = get_user_model()
 
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# the user fields carried by the access tokens, see MyAPIAuthentication.get_claims
+CLAIM_FIELDS = {
+    "user_id": "id",
+    "account_status": "account_status",
+    "stripe_setup_complete": "stripe_setup_complete",
+    "ver": "token_version",
+}
+
+
+class TokenRevocations:
+    """
+    Revocation of the tokens, checked with a single cache read.
+
+    Incrementing the token_version of a user revokes all its tokens: the refresh tokens are
+    checked against the database, the access tokens against the version kept in the shared cache
+    for the lifetime of an access token.
+    """
+
+    @staticmethod
+    def get_version_key(user_id) -> str:
+        return f"auth:token-version:{user_id}"
+
+    @classmethod
+    def revoke_user_tokens(cls, user) -> None:
+        """
+        Revoke every access and refresh token issued to the user so far.
+
+        Args:
+            user (CustomUser): The user whose tokens are revoked.
+        """
+        USER_MODEL.objects.filter(id=user.id).update(token_version=F("token_version") + 1)
+        user.refresh_from_db(fields=["token_version"])
+
+        cache.set(
+            cls.get_version_key(user.id),
+            user.token_version,
+            timeout=settings.ACCESS_TOKEN_LIFETIME_MINUTES * 60,
+        )
+
+    @classmethod
+    def is_revoked(cls, claims: dict) -> bool:
+        version = cache.get(cls.get_version_key(claims["user_id"]))
+
+        return version is not None and claims["ver"] < version
+
+    @staticmethod
+    def use_refresh_token(claims: dict) -> bool:
+        """
+        Mark the refresh token as used in the REFRESH_TOKEN_STORE, a refresh token is only
+        exchanged once.
+
+        Returns:
+            bool: False if the refresh token was used already.
+
+        Raises:
+            ImproperlyConfigured: If REFRESH_TOKEN_STORE is not "cache" or "database".
+        """
+        timeout = max(int(claims["exp"] - time.time()), 1)
+
+        if settings.REFRESH_TOKEN_STORE == "cache":
+            # add() only sets a missing key (SET NX on Redis), a single request uses the token
+            return cache.add(f"auth:refresh-used:{claims['jti']}", 1, timeout=timeout)
+
+        if settings.REFRESH_TOKEN_STORE != "database":
+            raise ImproperlyConfigured("REFRESH_TOKEN_STORE must be 'cache' or 'database'")
+
+        # the jti is unique, a single insert succeeds whatever the worker
+        try:
+            with transaction.atomic():
+                UsedRefreshToken.objects.create(
+                    jti=claims["jti"], expire_at=timezone.now() + timedelta(seconds=timeout)
+                )
+
+        except IntegrityError:
+            return False
+
+        return True
+
 
 class MyAPIAuthentication(BaseAuthentication):
     def authenticate(self, request):
         """
         Authenticate user based on request headers.
 
+        The safe requests of the views marked with ``stateless_auth = True`` are authorized from
+        the claims of the token, without reading the user (STATELESS_AUTH_ENABLED).
+
         Parameters:
             request (dict): The request object containing headers.
 
@@ -33,14 +122,50 @@ class MyAPIAuthentication(BaseAuthentication):
         if not data:
             return None, None
 
-        return self.get_user(data["user_id"]), None
+        # the tokens issued before the token types are access tokens
+        if data.get("type", "access") != "access":
+            raise exceptions.AuthenticationFailed(_("Invalid or Expired token."))
+
+        if self.can_use_claims(request, data):
+            if TokenRevocations.is_revoked(data):
+                return None, None
+
+            return self.get_user_from_claims(data), None
+
+        # the tokens issued before the token versions have version 0, the first revocation of the
+        # user revokes them too
+        return self.get_user(data["user_id"], version=data.get("ver", 0)), None
+
+    @staticmethod
+    def can_use_claims(request, claims: dict) -> bool:
+        view = request.parser_context.get("view") if request.parser_context else None
+
+        return (
+            settings.STATELESS_AUTH_ENABLED
+            and request.method in SAFE_METHODS
+            and getattr(view, "stateless_auth", False)
+            and all(claim in claims for claim in CLAIM_FIELDS)
+            and claims["account_status"] == AccountStatuses.ACTIVE
+        )
+
+    @staticmethod
+    def get_user_from_claims(claims: dict):
+        """
+        Build the user from the claims of the token. Its other fields are deferred, reading one
+        loads it from the database.
+        """
+        values = {field: claims[claim] for claim, field in CLAIM_FIELDS.items()}
+        values["id"] = uuid.UUID(values["id"])
+
+        return USER_MODEL.from_db(DEFAULT_DB_ALIAS, list(values), list(values.values()))
 
-    def get_user(self, user_id):
+    def get_user(self, user_id, version=0):
         """
         Retrieves a user from the database based on their user ID.
 
         Parameters:
             user_id (str): The ID of the user to retrieve.
+            version (int): The token version of the token.
 
         Returns:
             UserModel or None: The user object if found, None otherwise.
@@ -53,6 +178,11 @@ class MyAPIAuthentication(BaseAuthentication):
                 .filter(account_status=AccountStatuses.ACTIVE)
                 .first()
             )
+
+            # revoked token
+            if user is not None and user.token_version != version:
+                return None
+
             return user
         except Exception:
             return None
@@ -92,7 +222,7 @@ class MyAPIAuthentication(BaseAuthentication):
     @staticmethod
     def verify_token(token):
         """
-        Verify the given token by decoding it using the provided secret key and algorithm.
+        Verify the given token with the key named by its kid header, see app.token_keys.
         If the token is valid and not expired, return the decoded content.
         If the token is invalid or expired, return None.
 
@@ -103,18 +233,12 @@ class MyAPIAuthentication(BaseAuthentication):
             dict or None: The decoded content of the token if it's valid and not expired, or None if it's invalid or expired.
         """
         try:
-            decoded = jwt.decode(token, settings.SECRET_KEY, algorithms="HS256")
+            # PyJWT checks the expiry
+            return TokenKeys.decode(token, require=["exp"])
 
         except Exception:
             return None
 
-        exp = decoded["exp"]
-
-        if timezone.now().timestamp() > exp:
-            return None
-
-        return decoded
-
     @classmethod
     def get_random_token(cls, length):
         """
@@ -129,10 +253,22 @@ class MyAPIAuthentication(BaseAuthentication):
 
         return "".join(choices(string.ascii_uppercase + string.digits, k=length))
 
+    @classmethod
+    def get_claims(cls, user) -> dict:
+        """
+        Return the claims of an access token of the user, see CLAIM_FIELDS.
+        """
+        return {
+            "user_id": str(user.id),
+            "account_status": user.account_status,
+            "stripe_setup_complete": user.stripe_setup_complete,
+            "ver": user.token_version,
+        }
+
     @classmethod
     def get_access_token(cls, payload):
         """
-        Generates an access token for the given payload.
+        Generates an access token for the given payload, valid ACCESS_TOKEN_LIFETIME_MINUTES.
 
         Args:
             payload (dict): The payload to be encoded in the access token.
@@ -140,22 +276,76 @@ class MyAPIAuthentication(BaseAuthentication):
         Returns:
             tuple: A tuple containing the encoded access token and the expiration time of the token.
         """
-        return jwt.encode(
-            {"exp": timezone.now() + timedelta(days=30), **payload},
-            settings.SECRET_KEY,
-            algorithm="HS256",
-        ), timezone.now() + timedelta(days=30)
+        expire_at = timezone.now() + timedelta(minutes=settings.ACCESS_TOKEN_LIFETIME_MINUTES)
+
+        return (
+            TokenKeys.encode({"exp": expire_at, "type": "access", **payload}),
+            expire_at,
+        )
 
     @classmethod
-    def get_refresh_token(cls):
+    def get_refresh_token(cls, payload):
         """
-        Return a refresh token encoded with the current time and a random token using the given secret key.
+        Generates a refresh token for the given payload, valid REFRESH_TOKEN_LIFETIME_DAYS and
+        exchanged once for new tokens, see refresh_tokens.
+
+        Args:
+            payload (dict): The payload to be encoded in the refresh token.
+
+        Returns:
+            tuple: A tuple containing the encoded refresh token and the expiration time of the token.
         """
-        return jwt.encode(
-            {
-                "exp": timezone.now() + timedelta(days=365),
-                "data": cls.get_random_token(15),
-            },
-            settings.SECRET_KEY,
-            algorithm="HS256",
+        expire_at = timezone.now() + timedelta(days=settings.REFRESH_TOKEN_LIFETIME_DAYS)
+
+        return (
+            TokenKeys.encode(
+                {"exp": expire_at, "type": "refresh", "jti": uuid.uuid4().hex, **payload}
+            ),
+            expire_at,
         )
+
+    @classmethod
+    def get_auth_data(cls, user) -> dict:
+        """
+        Return the access and refresh tokens of the user, with their expiration times.
+        """
+        auth_token, auth_exp = cls.get_access_token(cls.get_claims(user))
+        refresh_token, refresh_exp = cls.get_refresh_token(
+            {"user_id": str(user.id), "ver": user.token_version}
+        )
+
+        return {
+            "auth_token": auth_token,
+            "auth_token_exp": auth_exp,
+            "refresh_token": refresh_token,
+            "refresh_token_exp": refresh_exp,
+        }
+
+    @classmethod
+    def refresh_tokens(cls, refresh_token: str) -> dict | None:
+        """
+        Exchange a refresh token for new access and refresh tokens (rotation). Using a refresh
+        token twice means it leaked, every token of the user is then revoked.
+
+        Args:
+            refresh_token (str): The refresh token.
+
+        Returns:
+            dict | None: The new tokens, see get_auth_data, None if the refresh token is invalid,
+            expired, revoked or used already.
+        """
+        claims = cls.verify_token(refresh_token)
+
+        if not claims or claims.get("type") != "refresh":
+            return None
+
+        user = cls().get_user(claims["user_id"], version=claims["ver"])
+
+        if user is None:
+            return None
+
+        if not TokenRevocations.use_refresh_token(claims):
+            TokenRevocations.revoke_user_tokens(user)
+            return None
+
+        return cls.get_auth_data(user)
@@ -0,0 +1,84 @@
+import contextvars
+import logging
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+
+
+logger = logging.getLogger("server_error")
+
+
+class BackgroundTasks:
+    """
+    Small in-process runner for work that should not block the response, e.g. creating the
+    Stripe customer account of a newly signed up user.
+
+    Tasks are only submitted once the surrounding database transaction commits, so they always
+    see the rows written by the request. Each task closes its own database connections when done.
+    """
+
+    _executor: ThreadPoolExecutor | None = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_executor(cls) -> ThreadPoolExecutor:
+        """
+        Return the shared thread pool, creating it on first use.
+        """
+        if cls._executor is None:
+            with cls._lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(
+                        max_workers=settings.BACKGROUND_TASK_WORKERS,
+                        thread_name_prefix="background-task",
+                    )
+
+        return cls._executor
+
+    @classmethod
+    def submit(cls, func, *args, **kwargs) -> None:
+        """
+        Run the function in the background once the current transaction commits.
+
+        When BACKGROUND_TASK_WORKERS is 0 the function is run inline instead.
+
+        Args:
+            func (callable): The function to run.
+            args: Positional arguments for the function.
+            kwargs: Keyword arguments for the function.
+        """
+        if settings.BACKGROUND_TASK_WORKERS <= 0:
+            transaction.on_commit(lambda: func(*args, **kwargs))
+            return
+
+        # the task keeps the context of the request, e.g. its correlation id
+        transaction.on_commit(
+            lambda: cls.get_executor().submit(
+                contextvars.copy_context().run, cls._run, func, *args, **kwargs
+            )
+        )
+
+    @staticmethod
+    def _run(func, *args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+
+        except Exception:
+            logger.exception("Error when running background task %s", func.__qualname__)
+
+        finally:
+            connections.close_all()
+
+    @classmethod
+    def drain(cls) -> None:
+        """
+        Wait for every submitted task to finish. Used by management commands before exiting.
+        """
+        with cls._lock:
+            executor, cls._executor = cls._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=True)
@@ -0,0 +1,478 @@
+"""
+Scenarios of the API benchmark (manage.py benchmark_api): one scenario per route of app.urls,
+run against local stubs of Stripe, Google, Facebook, Firebase, SMTP and S3.
+"""
+
+import itertools
+import tempfile
+import uuid
+
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.test.client import MULTIPART_CONTENT, encode_multipart, BOUNDARY
+from django.urls import reverse
+
+from app.api_authentication import MyAPIAuthentication
+from app.benchmarks.seed import BENCHMARK_FILE_NAME, BENCHMARK_PASSWORD
+from app.benchmarks.stubs import StubFirebaseAuth, StubHTTPServer, StubSMTP
+from app.caching import StoryCache
+from app.enum_classes import OTPPurposes, OTPChannels, TransactionStatuses
+from app.enum_classes import TransactionTypes
+from app.models import CustomUser, Story, Transaction
+from app.services import ServiceRegistry
+from app.util_classes import EncryptionHelper, OTPHelper
+
+
+CHECKOUT_SESSION_ID = "cs_benchmark"
+LOCAL_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+class Scenario:
+    """
+    A call to an endpoint.
+
+    Args:
+        name (str): The name of the scenario, "<method> <url name>".
+        method (str): The HTTP method.
+        path (str): The path of the endpoint.
+        data (dict): The query parameters or body.
+        user (CustomUser): The user the request is authenticated as, None for anonymous.
+        expected_status (int): The status code of a successful call.
+        multipart (bool): Send the body as multipart/form-data instead of JSON.
+        prepare (callable): Called before every call, returns a dict overriding ``path`` and
+            ``data``, for calls that cannot be repeated with the same data (e.g. signups).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        method: str,
+        path: str,
+        data: dict | None = None,
+        user: CustomUser | None = None,
+        expected_status: int = 200,
+        multipart: bool = False,
+        prepare=None,
+    ):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.data = data
+        self.user = user
+        self.expected_status = expected_status
+        self.multipart = multipart
+        self.prepare = prepare
+
+    def get_headers(self) -> dict:
+        if self.user is None:
+            return {}
+
+        token, _ = MyAPIAuthentication.get_access_token(MyAPIAuthentication.get_claims(self.user))
+
+        return {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+    def get_request(self) -> tuple:
+        """
+        Return the ``(path, data)`` of the next call, running ``prepare``.
+        """
+        if self.user is not None:
+            # a previous scenario, e.g. the password reset, may have revoked its tokens
+            self.user.refresh_from_db(fields=["token_version"])
+
+        if self.prepare is None:
+            return self.path, self.data
+
+        overrides = self.prepare()
+
+        return overrides.get("path", self.path), overrides.get("data", self.data)
+
+    def call(self, client, path: str, data):
+        """
+        Call the endpoint once with the Django test client and return the response.
+        """
+        if self.method == "get":
+            return client.get(path, data=data, **self.get_headers())
+
+        if self.multipart and self.method == "post":
+            body, content_type = data, MULTIPART_CONTENT
+        elif self.multipart:
+            # only post() encodes multipart bodies
+            body, content_type = encode_multipart(BOUNDARY, data), MULTIPART_CONTENT
+        else:
+            body, content_type = data, "application/json"
+
+        return getattr(client, self.method)(
+            path, data=body, content_type=content_type, **self.get_headers()
+        )
+
+
+class BenchmarkEnvironment:
+    """
+    Replace every upstream by a local stub while the context is active:
+
+    - Stripe, Google and Facebook by a StubHTTPServer,
+    - S3 by a FileSystemStorage in a temporary directory, served by the same stub,
+    - SMTP by StubSMTP and Firebase by StubFirebaseAuth.
+
+    Every stubbed call is delayed by ``latency`` seconds.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.checkout_reference = None
+        self.stub = StubHTTPServer(self.get_routes(), latency=latency)
+        self._stack = None
+
+    def get_routes(self) -> dict:
+        account = {"id": "acct_benchmark", "object": "account", "charges_enabled": True}
+        link = {"object": "login_link", "url": "https://connect.example.com/benchmark"}
+
+        return {
+            # stripe
+            ("POST", "/v1/accounts"): (200, account),
+            ("GET", "/v1/accounts/*"): (200, account),
+            ("POST", "/v1/accounts/*"): (200, link),
+            ("POST", "/v1/account_links"): (200, {"object": "account_link", "url": link["url"]}),
+            ("POST", "/v1/customers"): (200, {"id": "cus_benchmark", "object": "customer"}),
+            (
+                "GET",
+                "/v1/balance",
+            ): (
+                200,
+                {"object": "balance", "available": [{"amount": 1000}], "pending": [{"amount": 0}]},
+            ),
+            (
+                "POST",
+                "/v1/checkout/sessions",
+            ): (
+                200,
+                {
+                    "id": CHECKOUT_SESSION_ID,
+                    "object": "checkout.session",
+                    "url": "https://checkout.example.com/benchmark",
+                },
+            ),
+            ("GET", f"/v1/checkout/sessions/{CHECKOUT_SESSION_ID}"): self.checkout_session,
+            # google
+            ("POST", "/google/token"): (200, {"access_token": "benchmark"}),
+            ("GET", "/google/userinfo"): self.google_profile,
+            # facebook
+            ("GET", "/facebook/oauth/access_token"): (200, {"access_token": "benchmark"}),
+            ("GET", "/facebook/me"): self.facebook_profile,
+            # s3
+            ("GET", f"/media/{BENCHMARK_FILE_NAME}"): (200, b"%PDF-1.4 benchmark story"),
+        }
+
+    def checkout_session(self, handler):
+        return 200, {
+            "id": CHECKOUT_SESSION_ID,
+            "object": "checkout.session",
+            "client_reference_id": self.checkout_reference,
+            "amount_received": 1000,
+            "status": "paid",
+        }
+
+    @staticmethod
+    def google_profile(handler):
+        identifier = uuid.uuid4().hex
+
+        return 200, {
+            "name": f"Google {identifier[:16]}",
+            "email": f"{identifier}@google.example.com",
+            "picture": "https://example.com/picture.png",
+        }
+
+    @staticmethod
+    def facebook_profile(handler):
+        identifier = uuid.uuid4().hex
+
+        return 200, {
+            "id": identifier,
+            "name": f"Facebook {identifier[:16]}",
+            "email": f"{identifier}@facebook.example.com",
+            "picture": {"data": {"url": "https://example.com/picture.png"}},
+        }
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        self.stub = self._stack.enter_context(self.stub)
+        media_root = self._stack.enter_context(tempfile.TemporaryDirectory())
+
+        self._stack.enter_context(
+            override_settings(
+                ALLOWED_HOSTS=["*"],
+                CACHES=LOCAL_CACHES,
+                BACKGROUND_TASK_WORKERS=0,
+                GENERATE_CODE=False,
+                DEFAULT_FILE_STORAGE="django.core.files.storage.FileSystemStorage",
+                MEDIA_ROOT=media_root,
+                MEDIA_URL=f"{self.stub.url}/media/",
+                GOOGLE_ACCESS_TOKEN_OBTAIN_URL=f"{self.stub.url}/google/token",
+                GOOGLE_USER_INFO_URL=f"{self.stub.url}/google/userinfo",
+                FACEBOOK_ACCESS_TOKEN_OBTAIN_URL=f"{self.stub.url}/facebook/oauth/access_token",
+                FACEBOOK_PROFILE_ENDPOINT_URL=f"{self.stub.url}/facebook/me",
+                # the requests are still counted, every scenario comes from the same client
+                RATE_LIMITS={
+                    scope: {kind: "1000000/s" for kind in rates}
+                    for scope, rates in settings.RATE_LIMITS.items()
+                },
+            )
+        )
+        self._stack.enter_context(StubSMTP(latency=self.latency))
+        self._stack.enter_context(
+            ServiceRegistry.override("firebase_auth", StubFirebaseAuth(latency=self.latency))
+        )
+
+        stripe = ServiceRegistry.get("stripe")
+        previous_api_base = stripe.api_base
+        stripe.api_base = self.stub.url
+        self._stack.callback(setattr, stripe, "api_base", previous_api_base)
+
+        StoryCache._local.clear()
+        self._stack.callback(StoryCache._local.clear)
+
+        return self
+
+    def __exit__(self, *args):
+        self._stack.close()
+        self._stack = None
+
+    def get_scenarios(self, user: CustomUser, story: Story, new_user: CustomUser) -> list:
+        """
+        Return a scenario for every route of the API.
+
+        Args:
+            user (CustomUser): A seeded user with a completed Stripe setup.
+            story (Story): A story of the user.
+            new_user (CustomUser): A seeded user that has not completed the Stripe setup.
+        """
+        counter = itertools.count()
+
+        def unique() -> str:
+            return f"{uuid.uuid4().hex[:8]}{next(counter)}"
+
+        def signup():
+            identifier = unique()
+
+            return {
+                "data": {
+                    "username": f"signup {identifier}",
+                    "email": f"{identifier}@signup.example.com",
+                    "password": BENCHMARK_PASSWORD,
+                    "referralCode": user.referral_code,
+                }
+            }
+
+        def verified_reset_code():
+            # replaces the OTP used by the previous call
+            code = OTPHelper.generate_otp(
+                purpose=OTPPurposes.RESET_PASSWORD,
+                channel=OTPChannels.EMAIL,
+                recipient=new_user.email,
+            )
+            OTPHelper.verify_otp(
+                otp=code, purpose=OTPPurposes.RESET_PASSWORD, recipient=new_user.email
+            )
+
+            return {}
+
+        def new_story():
+            created = Story.objects.create(
+                owner=user,
+                title="To delete",
+                price=story.price,
+                usage_number=1,
+                file=f"story_uploads/{unique()}.pdf",
+                file_type="PDF",
+                reference_number=f"RN-{unique()}",
+            )
+
+            return {"path": reverse("single-story-views", args=[created.id])}
+
+        def new_transaction(status: str) -> Transaction:
+            return Transaction.objects.create(
+                owner=user,
+                story=story,
+                email="buyer@benchmark.example.com",
+                payable_amount=story.price,
+                payment_type=TransactionTypes.PAYMENT,
+                status=status,
+                reference=unique(),
+            )
+
+        def download_token():
+            payload = {
+                "transaction_reference": new_transaction(TransactionStatuses.SUCCESS).reference,
+                "story_reference": f"xxxxxx-{story.reference_number}",
+            }
+
+            return {"data": {"token": EncryptionHelper.encrypt_download_payload(payload=payload)}}
+
+        def pending_checkout():
+            self.checkout_reference = new_transaction(TransactionStatuses.PENDING).reference
+            return {}
+
+        def new_story_upload():
+            return {
+                "data": {
+                    "title": f"Story {unique()}",
+                    "price": "12.50",
+                    # the story views parse multipart bodies without the camelCase conversion
+                    "usage_number": 5,
+                    "file": SimpleUploadedFile("story.pdf", b"%PDF-1.4 benchmark story"),
+                }
+            }
+
+        refresh_token = EncryptionHelper.encrypt_download_payload(
+            payload={"user_id": str(new_user.id)}
+        )
+        webhook_event = {
+            "data": {"object": {"object": "checkout.session", "id": CHECKOUT_SESSION_ID}}
+        }
+
+        return [
+            Scenario(
+                "POST login-view",
+                "post",
+                reverse("login-view"),
+                {"email": user.email, "password": BENCHMARK_PASSWORD},
+            ),
+            Scenario(
+                "POST token-refresh-view",
+                "post",
+                reverse("token-refresh-view"),
+                # a refresh token is used once
+                prepare=lambda: {
+                    "data": {
+                        "refreshToken": MyAPIAuthentication.get_auth_data(user)["refresh_token"]
+                    }
+                },
+            ),
+            Scenario(
+                "POST sign-up-view",
+                "post",
+                reverse("sign-up-view"),
+                expected_status=201,
+                prepare=signup,
+            ),
+            Scenario(
+                "POST google-sign-up-view",
+                "post",
+                reverse("google-sign-up-view"),
+                {"code": "benchmark"},
+            ),
+            Scenario(
+                "POST facebook-sign-up-view",
+                "post",
+                reverse("facebook-sign-up-view"),
+                {"code": "benchmark"},
+            ),
+            Scenario(
+                "POST firebase-sign-up-view",
+                "post",
+                reverse("firebase-sign-up-view"),
+                {"idToken": "benchmark"},
+            ),
+            Scenario(
+                "POST reset-password-first-view",
+                "post",
+                reverse("reset-password-first-view"),
+                {"email": new_user.email},
+            ),
+            Scenario(
+                "POST reset-password-second-view",
+                "post",
+                reverse("reset-password-second-view"),
+                {"email": new_user.email, "code": "123456"},
+            ),
+            Scenario(
+                "POST reset-password-third-view",
+                "post",
+                reverse("reset-password-third-view"),
+                {"email": new_user.email, "code": "123456", "newPassword": BENCHMARK_PASSWORD},
+                prepare=verified_reset_code,
+            ),
+            Scenario("GET profile-view", "get", reverse("profile-view"), user=user),
+            Scenario(
+                "PATCH profile-view",
+                "patch",
+                reverse("profile-view"),
+                {"username": user.username},
+                user=user,
+                multipart=True,
+            ),
+            Scenario(
+                "GET profile-stripe-setup-view",
+                "get",
+                reverse("profile-stripe-setup-view"),
+                user=new_user,
+            ),
+            Scenario(
+                "GET profile-stripe-setup-refresh-view",
+                "get",
+                reverse("profile-stripe-setup-refresh-view"),
+                {"token": refresh_token},
+                expected_status=302,
+            ),
+            Scenario(
+                "GET profile-stripe-login-view",
+                "get",
+                reverse("profile-stripe-login-view"),
+                user=user,
+            ),
+            Scenario(
+                "POST change-password-view",
+                "post",
+                reverse("change-password-view"),
+                {"oldPassword": BENCHMARK_PASSWORD, "newPassword": BENCHMARK_PASSWORD},
+                user=user,
+            ),
+            Scenario("GET story-views", "get", reverse("story-views"), user=user),
+            Scenario(
+                "POST story-views",
+                "post",
+                reverse("story-views"),
+                user=user,
+                expected_status=201,
+                multipart=True,
+                prepare=new_story_upload,
+            ),
+            Scenario(
+                "GET single-story-views",
+                "get",
+                reverse("single-story-views", args=[story.id]),
+                user=user,
+            ),
+            Scenario("DELETE single-story-views", "delete", "", user=user, prepare=new_story),
+            Scenario(
+                "GET get-story-details",
+                "get",
+                reverse("get-story-details"),
+                {"storyReference": f"xxxxxx-{story.reference_number}"},
+            ),
+            Scenario(
+                "POST get-payment-link",
+                "post",
+                reverse("get-payment-link"),
+                {"storyId": str(story.id), "email": "buyer@benchmark.example.com"},
+            ),
+            Scenario(
+                "GET story-download-view",
+                "get",
+                reverse("story-download-view"),
+                prepare=download_token,
+            ),
+            Scenario(
+                "POST stripe-webhook-view",
+                "post",
+                reverse("stripe-webhook-view"),
+                webhook_event,
+                prepare=pending_checkout,
+            ),
+            Scenario("GET transaction-view", "get", reverse("transaction-view"), user=user),
+            Scenario("GET wallet-view", "get", reverse("wallet-view"), user=user),
+            Scenario("GET referral-view", "get", reverse("referral-view"), user=user),
+        ]
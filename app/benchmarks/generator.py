@@ -0,0 +1,432 @@
+"""
+Synthetic data at production scale for performance testing (manage.py generate_data).
+
+The rows are built in memory one batch at a time and written with bulk_create, or with COPY on
+PostgreSQL, so millions of rows can be generated without holding them all. Every value, the
+primary keys and the timestamps included, comes from a random generator seeded by the caller
+and from a fixed epoch, the time of the newest rows: the same seed, epoch and options always
+produce the same rows.
+"""
+
+import io
+import random
+import string
+import uuid
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+
+from app.enum_classes import AccountStatuses, OTPChannels, OTPPurposes, OTPStatuses
+from app.enum_classes import TransactionStatuses, TransactionTypes
+from app.models import OTP, CustomUser, Story, Transaction
+
+
+GENERATED_PASSWORD = "Generated-1"
+GENERATED_FILE_NAME = "story_uploads/generated.pdf"
+DEFAULT_EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+# auto_now_add / auto_now, the ORM would set them to the time of the insert
+TIMESTAMP_FIELDS = ("created_at", "last_edited_at")
+
+
+def parse_weights(value: str, choices) -> dict:
+    """
+    Parse a distribution given as ``name=weight`` pairs, e.g. ``success=80,pending=15``.
+
+    Args:
+        value (str): The comma separated pairs, names are case insensitive.
+        choices (TextChoices): The enum the names belong to.
+
+    Returns:
+        dict: The weight of every chosen value of the enum.
+
+    Raises:
+        ValueError: When a name is not a member of the enum or a weight is not a number.
+    """
+    members = {member.name.lower(): member.value for member in choices}
+    weights = {}
+
+    for pair in value.split(","):
+        name, _, weight = pair.partition("=")
+        name = name.strip().lower()
+
+        if name not in members:
+            raise ValueError(f"unknown {choices.__name__} {name!r}, use one of {list(members)}")
+
+        weights[members[name]] = float(weight)
+
+    return weights
+
+
+class DataGenerator:
+    """
+    Generate users, stories, transactions, OTPs and referrals.
+
+    Args:
+        seed (int): Seed of the random generator.
+        users (int): Number of users.
+        creator_rate (float): Fraction of the users that publish stories.
+        stories_alpha (float): Shape of the Pareto distribution of the stories per creator, the
+            lower the heavier the tail (a few creators with most of the stories).
+        max_stories_per_user (int): Cap of the stories per creator.
+        transactions_alpha (float): Shape of the Pareto distribution of the sales per story.
+        max_transactions_per_story (int): Cap of the sales per story.
+        status_weights (dict): Weights of the transaction statuses.
+        otps_per_user (int): Number of OTPs of every user.
+        otp_status_weights (dict): Weights of the OTP statuses.
+        referral_rate (float): Fraction of the users that signed up with a referral code.
+        epoch (datetime): Time of the newest rows.
+        span_days (int): The rows are created over the days before the epoch, a story after its
+            owner and a sale after its story.
+        batch_size (int): Number of rows per INSERT or COPY.
+        use_copy (bool): Write the rows with COPY, PostgreSQL only.
+    """
+
+    def __init__(
+        self,
+        seed: int,
+        users: int,
+        creator_rate: float = 0.2,
+        stories_alpha: float = 1.2,
+        max_stories_per_user: int = 500,
+        transactions_alpha: float = 1.5,
+        max_transactions_per_story: int = 1000,
+        status_weights: dict | None = None,
+        otps_per_user: int = 2,
+        otp_status_weights: dict | None = None,
+        referral_rate: float = 0.3,
+        epoch: datetime = DEFAULT_EPOCH,
+        span_days: int = 365,
+        batch_size: int = 5000,
+        use_copy: bool = False,
+    ):
+        self.seed = seed
+        self.users = users
+        self.creator_rate = creator_rate
+        self.stories_alpha = stories_alpha
+        self.max_stories_per_user = max_stories_per_user
+        self.transactions_alpha = transactions_alpha
+        self.max_transactions_per_story = max_transactions_per_story
+        self.status_weights = status_weights or {
+            TransactionStatuses.SUCCESS: 80,
+            TransactionStatuses.PENDING: 12,
+            TransactionStatuses.FAILED: 8,
+        }
+        self.otps_per_user = otps_per_user
+        self.otp_status_weights = otp_status_weights or {
+            OTPStatuses.USED: 60,
+            OTPStatuses.EXPIRED: 30,
+            OTPStatuses.ACTIVE: 10,
+        }
+        self.referral_rate = referral_rate
+        self.epoch = epoch
+        self.start = epoch - timedelta(days=span_days)
+        self.batch_size = batch_size
+        self.use_copy = use_copy
+
+        self.random = random.Random(seed)
+        self.prefix = f"gen{seed}"
+        self.counts = {"users": 0, "stories": 0, "transactions": 0, "otps": 0, "referrals": 0}
+
+    @property
+    def email_domain(self) -> str:
+        return f"{self.prefix}.generated.example.com"
+
+    def generate(self) -> dict:
+        """
+        Write every row.
+
+        Returns:
+            dict: The number of rows generated per kind.
+        """
+        salt = "".join(self.random.choices(string.ascii_letters + string.digits, k=22))
+        password = make_password(GENERATED_PASSWORD, salt=salt)
+        user_ids = [self.new_uuid() for _ in range(self.users)]
+        # in signup order, a referrer signed up before the users it referred
+        signed_up_at = sorted(self.pick_time(self.start) for _ in user_ids)
+        referred_users = self.pick_referrals(len(user_ids))
+
+        users = BatchWriter(CustomUser, self)
+        stories = BatchWriter(Story, self)
+        # a batch of transactions is written after the stories it references
+        transactions = BatchWriter(Transaction, self, before_flush=stories.flush)
+        otps = BatchWriter(OTP, self)
+
+        for index, user_id in enumerate(user_ids):
+            users.add(
+                self.new_user(
+                    index, user_id, password, referred_users.get(index, 0), signed_up_at[index]
+                )
+            )
+
+        users.flush()
+
+        creators = [
+            (user_id, created_at)
+            for user_id, created_at in zip(user_ids, signed_up_at)
+            if self.random.random() < self.creator_rate
+        ]
+
+        for creator_index, (owner_id, owner_created_at) in enumerate(creators):
+            for story in self.new_stories(creator_index, owner_id, owner_created_at):
+                stories.add(story)
+
+                for transaction in self.new_transactions(story):
+                    transactions.add(transaction)
+
+        transactions.flush()
+
+        for otp in self.new_otps():
+            otps.add(otp)
+
+        otps.flush()
+
+        self.counts.update(
+            users=users.count,
+            stories=stories.count,
+            transactions=transactions.count,
+            otps=otps.count,
+        )
+
+        return self.counts
+
+    def delete(self) -> int:
+        """
+        Delete the rows generated with this seed, the related rows are deleted by cascade.
+
+        Returns:
+            int: The number of rows deleted.
+        """
+        otps, _ = OTP.objects.filter(recipient__endswith=f"@{self.email_domain}").delete()
+        users, _ = CustomUser.objects.filter(email__endswith=f"@{self.email_domain}").delete()
+
+        return otps + users
+
+    def new_uuid(self) -> uuid.UUID:
+        return uuid.UUID(int=self.random.getrandbits(128), version=4)
+
+    def pick_count(self, alpha: float, cap: int) -> int:
+        # Pareto draws are >= 1, most are close to 1 and a few are very large
+        return min(int(self.random.paretovariate(alpha)), cap)
+
+    def pick_time(self, start: datetime, end: datetime | None = None) -> datetime:
+        # microseconds, the precision of the database columns
+        end = end or self.epoch
+        microseconds = int((end - start) / timedelta(microseconds=1))
+
+        return start + timedelta(microseconds=self.random.randint(0, max(microseconds, 0)))
+
+    def pick(self, weights: dict):
+        return self.random.choices(list(weights), weights=list(weights.values()))[0]
+
+    def pick_referrals(self, users: int) -> dict:
+        """
+        Pick the referrer of the referred users, an earlier user with a preference for the
+        first ones so a few users refer most of the others.
+
+        Returns:
+            dict: The number of referred users of every referrer, keyed by user index.
+        """
+        referred_users = {}
+
+        for index in range(1, users):
+            if self.random.random() < self.referral_rate:
+                referrer = int(index * self.random.random() ** 2)
+                referred_users[referrer] = referred_users.get(referrer, 0) + 1
+                self.counts["referrals"] += 1
+
+        return referred_users
+
+    def new_user(
+        self, index: int, user_id, password: str, referred_users: int, created_at: datetime
+    ) -> CustomUser:
+        return CustomUser(
+            created_at=created_at,
+            last_edited_at=self.pick_time(created_at),
+            date_joined=created_at,
+            id=user_id,
+            username=f"{self.prefix}-{index}",
+            email=f"user-{index}@{self.email_domain}",
+            password=password,
+            account_status=AccountStatuses.ACTIVE,
+            referral_code=f"{self.prefix}r{index}",
+            referred_users=referred_users,
+            customer_id=f"acct_{self.prefix}{index}",
+            stripe_setup_complete=True,
+        )
+
+    def new_stories(self, creator_index: int, owner_id, owner_created_at: datetime):
+        for index in range(self.pick_count(self.stories_alpha, self.max_stories_per_user)):
+            created_at = self.pick_time(owner_created_at)
+
+            yield Story(
+                created_at=created_at,
+                last_edited_at=self.pick_time(created_at),
+                id=self.new_uuid(),
+                owner_id=owner_id,
+                title=f"Story {creator_index}-{index}",
+                price=Decimal(self.random.randint(100, 5000)) / 100,
+                usage_number=self.random.randint(1, 100),
+                file=GENERATED_FILE_NAME,
+                file_type="PDF",
+                reference_number=f"RN-{self.prefix}{creator_index:06d}{index:04d}",
+            )
+
+    def new_transactions(self, story: Story):
+        sales = self.pick_count(self.transactions_alpha, self.max_transactions_per_story)
+
+        for index in range(sales):
+            status = self.pick(self.status_weights)
+            success = status == TransactionStatuses.SUCCESS
+            created_at = self.pick_time(story.created_at)
+
+            # the webhook changes a checkout minutes later, a pending one was abandoned
+            if status == TransactionStatuses.PENDING:
+                last_edited_at = created_at
+            else:
+                last_edited_at = min(created_at + timedelta(minutes=10), self.epoch)
+
+            yield Transaction(
+                created_at=created_at,
+                last_edited_at=self.pick_time(created_at, last_edited_at),
+                id=self.new_uuid(),
+                owner_id=story.owner_id,
+                story_id=story.id,
+                email=f"buyer-{self.random.randrange(self.users * 10)}@{self.email_domain}",
+                payable_amount=story.price,
+                withdrawable_amount=story.price if success else 0,
+                payment_type=TransactionTypes.PAYMENT,
+                status=status,
+                reference=f"{self.prefix}t{story.reference_number[3:]}-{index}",
+                file_downloaded=success and self.random.random() < 0.7,
+            )
+
+    def new_otps(self):
+        lifetime = timedelta(minutes=settings.OTP_EXPIRATION_MINUTES)
+
+        for index in range(self.users):
+            for _ in range(self.otps_per_user):
+                status = self.pick(self.otp_status_weights)
+                # over the last 30 days, the active ones expire after the epoch
+                expire_at = self.pick_time(self.epoch - timedelta(days=30), self.epoch + lifetime)
+                created_at = expire_at - lifetime
+
+                yield OTP(
+                    created_at=created_at,
+                    last_edited_at=self.pick_time(created_at, expire_at),
+                    id=self.new_uuid(),
+                    otp=f"{self.random.randrange(10**6):06d}",
+                    purpose=OTPPurposes.RESET_PASSWORD,
+                    status=status,
+                    channel=OTPChannels.EMAIL,
+                    recipient=f"user-{index}@{self.email_domain}",
+                    expire_at=expire_at,
+                    verified=status == OTPStatuses.USED,
+                )
+
+
+class BatchWriter:
+    """
+    Buffer the rows of a model and write them a batch at a time, with bulk_create or COPY.
+
+    Args:
+        model (Model): The model of the rows.
+        generator (DataGenerator): Gives the batch size and the write method.
+        before_flush (callable): Called before a batch is written, e.g. to write the rows the
+            batch references first.
+    """
+
+    def __init__(self, model, generator: DataGenerator, before_flush=None):
+        self.model = model
+        self.batch_size = generator.batch_size
+        self.use_copy = generator.use_copy
+        self.before_flush = before_flush
+        self.rows = []
+        self.count = 0
+
+    def add(self, row):
+        self.rows.append(row)
+
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.before_flush is not None:
+            self.before_flush()
+
+        if not self.rows:
+            return
+
+        if self.use_copy:
+            self.copy(self.model, self.rows)
+        else:
+            self.bulk_create(self.model, self.rows, self.batch_size)
+
+        self.count += len(self.rows)
+        self.rows = []
+
+    @staticmethod
+    def bulk_create(model, batch: list, batch_size: int):
+        """
+        Write the batch with bulk_create, then its generated timestamps: bulk_create sets the
+        auto_now and auto_now_add fields to the time of the insert, whatever the rows hold.
+        """
+        timestamps = [[getattr(row, field) for field in TIMESTAMP_FIELDS] for row in batch]
+
+        model.objects.bulk_create(batch, batch_size=batch_size)
+
+        for row, values in zip(batch, timestamps):
+            for field, value in zip(TIMESTAMP_FIELDS, values):
+                setattr(row, field, value)
+
+        model.objects.bulk_update(batch, TIMESTAMP_FIELDS, batch_size=batch_size)
+
+    @staticmethod
+    def to_csv_field(value) -> str:
+        """
+        Encode a value for COPY in CSV format: None is an unquoted empty field, which PostgreSQL
+        reads as NULL, and every other value is quoted, so an empty string stays an empty string.
+        The csv module cannot do this, QUOTE_NONNUMERIC also quotes None.
+        """
+        if value is None:
+            return ""
+
+        return '"' + str(value).replace('"', '""') + '"'
+
+    @classmethod
+    def copy(cls, model, batch: list):
+        """
+        Write the batch with COPY FROM STDIN in CSV format (PostgreSQL with psycopg2), see
+        to_csv_field for how NULL and empty strings are told apart. The generated timestamps are
+        written as they are, COPY does not go through the auto_now fields.
+        """
+        fields = model._meta.concrete_fields
+        buffer = io.StringIO()
+
+        def get_value(row, field):
+            if field.attname in TIMESTAMP_FIELDS:
+                return getattr(row, field.attname)
+
+            return field.pre_save(row, add=True)
+
+        for row in batch:
+            values = (
+                field.get_db_prep_save(get_value(row, field), connection=connection)
+                for field in fields
+            )
+            buffer.write(",".join(cls.to_csv_field(value) for value in values) + "\n")
+
+        buffer.seek(0)
+
+        quote_name = connection.ops.quote_name
+        columns = ", ".join(quote_name(field.column) for field in fields)
+
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {quote_name(model._meta.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
@@ -0,0 +1,91 @@
+import random
+import uuid
+
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+
+from app.enum_classes import AccountStatuses, TransactionStatuses, TransactionTypes
+from app.models import CustomUser, Story, Transaction
+
+
+BENCHMARK_PASSWORD = "Benchmark-1"
+BENCHMARK_FILE_NAME = "story_uploads/benchmark.pdf"
+
+
+def seed_benchmark_data(
+    users: int, stories_per_user: int, transactions_per_story: int, batch_size: int = 1000
+) -> dict:
+    """
+    Create benchmark users with their stories and transactions using bulk inserts. Every user
+    has the BENCHMARK_PASSWORD password, a connected Stripe account and a completed setup.
+
+    Args:
+        users (int): Number of users.
+        stories_per_user (int): Number of stories of every user.
+        transactions_per_story (int): Number of transactions of every story.
+        batch_size (int): Number of rows per INSERT.
+
+    Returns:
+        dict: The created ``users``, ``stories`` and the number of ``transactions``.
+    """
+    generator = random.Random(0)
+    identifier = uuid.uuid4().hex[:8]
+    password = make_password(BENCHMARK_PASSWORD)
+
+    created_users = CustomUser.objects.bulk_create(
+        [
+            CustomUser(
+                username=f"Benchmark {identifier} {index}",
+                email=f"{identifier}-{index}@benchmark.example.com",
+                password=password,
+                account_status=AccountStatuses.ACTIVE,
+                referral_code=f"{identifier}{index}",
+                customer_id=f"acct_{identifier}{index}",
+                stripe_setup_complete=True,
+            )
+            for index in range(users)
+        ],
+        batch_size=batch_size,
+    )
+
+    stories = Story.objects.bulk_create(
+        [
+            Story(
+                owner=user,
+                title=f"Story {user_index}-{index}",
+                price=Decimal(generator.randint(100, 5000)) / 100,
+                usage_number=transactions_per_story + 1000,
+                file=BENCHMARK_FILE_NAME,
+                file_type="PDF",
+                reference_number=f"RN-{identifier}{user_index:05d}{index:04d}",
+            )
+            for user_index, user in enumerate(created_users)
+            for index in range(stories_per_user)
+        ],
+        batch_size=batch_size,
+    )
+
+    statuses = [TransactionStatuses.SUCCESS] * 8 + [
+        TransactionStatuses.PENDING,
+        TransactionStatuses.FAILED,
+    ]
+
+    transactions = Transaction.objects.bulk_create(
+        (
+            Transaction(
+                owner=story.owner,
+                story=story,
+                email=f"buyer-{index}@benchmark.example.com",
+                payable_amount=story.price,
+                payment_type=TransactionTypes.PAYMENT,
+                status=generator.choice(statuses),
+                reference=f"{identifier}{story_index:07d}{index:03d}",
+            )
+            for story_index, story in enumerate(stories)
+            for index in range(transactions_per_story)
+        ),
+        batch_size=batch_size,
+    )
+
+    return {"users": created_users, "stories": stories, "transactions": len(transactions)}
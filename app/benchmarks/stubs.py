@@ -0,0 +1,195 @@
+import json
+import smtplib
+import threading
+import time
+import uuid
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+
+class StubHTTPServer:
+    """
+    Local HTTP server standing in for a third party API during benchmarks.
+
+    Routes map ``(method, path)`` to either a ``(status, body)`` tuple or a callable taking the
+    request handler and returning one. A path ending with ``*`` matches every path starting
+    with it, e.g. ``/v1/accounts/*``. Every response is delayed by ``latency`` seconds to
+    simulate the network round trip of the real upstream.
+
+    Usage:
+        with StubHTTPServer(routes, latency=0.1) as stub:
+            requests.get(stub.url + "/me")
+    """
+
+    def __init__(self, routes: dict, latency: float = 0.0):
+        self.routes = routes
+        self.latency = latency
+        self.hits: dict[str, int] = {}
+        self._server = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset_hits(self):
+        with self._lock:
+            self.hits = {}
+
+    def get_route(self, method: str, path: str):
+        route = self.routes.get((method, path))
+
+        if route is not None:
+            return route
+
+        for (route_method, route_path), prefix_route in self.routes.items():
+            if (
+                route_method == method
+                and route_path.endswith("*")
+                and path.startswith(route_path[:-1])
+            ):
+                return prefix_route
+
+        return None
+
+    def _build_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def _respond(self):
+                path = urlsplit(self.path).path
+                route = stub.get_route(self.command, path)
+
+                length = int(self.headers.get("Content-Length") or 0)
+                self.body = self.rfile.read(length) if length else b""
+
+                with stub._lock:
+                    stub.hits[f"{self.command} {path}"] = (
+                        stub.hits.get(f"{self.command} {path}", 0) + 1
+                    )
+
+                if route is None:
+                    status, body = 404, {"error": "not found"}
+                elif callable(route):
+                    status, body = route(self)
+                else:
+                    status, body = route
+
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = _respond
+            do_POST = _respond
+            do_DELETE = _respond
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._build_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+class StubSMTP:
+    """
+    Stand-in for smtplib.SMTP_SSL during benchmarks: every connection sleeps ``latency``
+    seconds (connection and TLS handshake) and the sent messages are counted, not delivered.
+
+    Usage:
+        with StubSMTP(latency=0.05) as smtp:
+            EmailSender.send_download_link_email(...)
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.sent = 0
+        self._previous = None
+        self._lock = threading.Lock()
+
+    def _connect(self, *args, **kwargs):
+        stub = self
+
+        if stub.latency:
+            time.sleep(stub.latency)
+
+        class Connection:
+            def login(self, user, password):
+                pass
+
+            def sendmail(self, sender, receivers, message):
+                with stub._lock:
+                    stub.sent += 1
+
+            def quit(self):
+                pass
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                pass
+
+        return Connection()
+
+    def __enter__(self):
+        self._previous = smtplib.SMTP_SSL
+        smtplib.SMTP_SSL = self._connect
+        return self
+
+    def __exit__(self, *args):
+        smtplib.SMTP_SSL = self._previous
+
+
+class StubFirebaseAuth:
+    """
+    Stand-in for the firebase_admin.auth module, every ID token is valid and belongs to a new
+    user. Register it with ``ServiceRegistry.override("firebase_auth", StubFirebaseAuth())``.
+    """
+
+    def __init__(self, latency: float = 0.0, email_domain: str = "firebase.example.com"):
+        self.latency = latency
+        self.email_domain = email_domain
+
+    def verify_id_token(self, id_token: str) -> dict:
+        if self.latency:
+            time.sleep(self.latency)
+
+        identifier = uuid.uuid4().hex
+
+        return {
+            "uid": identifier,
+            "email": f"{identifier}@{self.email_domain}",
+            "name": f"Firebase {identifier[:8]}",
+            "picture": None,
+            "firebase": {"sign_in_provider": "google.com"},
+        }
@@ -0,0 +1,371 @@
+import hashlib
+import json
+import threading
+import time
+
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, Q
+
+
+class StoryDetailsCache:
+    """
+    Server-side cache of the public story details (GET /download/story-details/), keyed by the
+    story reference number. Entries are invalidated when the story is saved or deleted
+    (see app.signals) and expire after STORY_DETAILS_CACHE_TIMEOUT seconds.
+
+    An entry is a dict with the serialized ``data``, its ``etag`` and the ``last_modified``
+    timestamp of the story, so conditional requests are answered without touching the database.
+    """
+
+    KEY_PREFIX = "story-details"
+
+    @classmethod
+    def get_key(cls, reference_number: str) -> str:
+        # cache keys cannot contain spaces or control characters
+        digest = hashlib.sha256(reference_number.encode()).hexdigest()
+        return f"{cls.KEY_PREFIX}:{digest}"
+
+    @classmethod
+    def get(cls, reference_number: str) -> dict | None:
+        """
+        Return the cached entry of the story, None if it is not cached.
+
+        Args:
+            reference_number (str): The reference number of the story.
+        """
+        return cache.get(cls.get_key(reference_number))
+
+    @classmethod
+    def set(cls, reference_number: str, data: dict, last_edited_at) -> dict:
+        """
+        Cache the serialized details of the story.
+
+        Args:
+            reference_number (str): The reference number of the story.
+            data (dict): The serialized details.
+            last_edited_at (datetime): When the story was last edited.
+
+        Returns:
+            dict: The cached entry.
+        """
+        content = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+
+        entry = {
+            "data": data,
+            "etag": f'"{hashlib.sha256(content.encode()).hexdigest()[:32]}"',
+            "last_modified": int(last_edited_at.timestamp()),
+        }
+
+        cache.set(
+            cls.get_key(reference_number), entry, timeout=settings.STORY_DETAILS_CACHE_TIMEOUT
+        )
+
+        return entry
+
+    @classmethod
+    def invalidate(cls, reference_number: str | None) -> None:
+        """
+        Remove the story from the cache.
+
+        Args:
+            reference_number (str): The reference number of the story.
+        """
+        if reference_number:
+            cache.delete(cls.get_key(reference_number))
+
+
+class LocalLRUCache:
+    """
+    Thread-safe in-process LRU cache with a time to live, in front of the shared cache.
+    """
+
+    def __init__(self, max_entries: int, timeout: float):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+
+            return value
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class StoryCache:
+    """
+    Cache of the story records read by the public download endpoints, so a story shared
+    widely costs close to zero database queries.
+
+    Stories are cached by id as plain dicts of their columns and of the id and username of their
+    owner, never the owner record, and reference numbers point to the story id. Lookups go
+    through a small in-process LRU cache (STORY_CACHE_LOCAL_TIMEOUT seconds), then the shared
+    cache (STORY_CACHE_TIMEOUT seconds), then the database. Saving or deleting a story
+    invalidates it (see app.signals), other processes drop their local copy when it expires.
+
+    The number of successful transactions of a story (see Story.can_still_download) is only kept
+    in the shared cache, it is invalidated when a transaction changes and a stale local copy
+    would let a story sell past its usage number.
+
+    The caches are always filled from the primary database, also during the requests whose reads
+    go to a replica (see app.db_router): a lagging replica would cache a deleted story or the
+    count of before a sale for STORY_CACHE_TIMEOUT seconds. Only the cache hits skip the primary.
+
+    Usage:
+        story = StoryCache.get_by_reference(reference_number)
+    """
+
+    KEY_PREFIX = "story"
+
+    _local = LocalLRUCache(
+        max_entries=settings.STORY_CACHE_MAX_ENTRIES, timeout=settings.STORY_CACHE_LOCAL_TIMEOUT
+    )
+    _stats = {"local_hits": 0, "shared_hits": 0, "misses": 0}
+    _stats_lock = threading.Lock()
+
+    @classmethod
+    def get_key(cls, kind: str, value) -> str:
+        digest = hashlib.sha256(str(value).encode()).hexdigest()
+        return f"{cls.KEY_PREFIX}:{kind}:{digest}"
+
+    @classmethod
+    def _count(cls, stat: str) -> None:
+        with cls._stats_lock:
+            cls._stats[stat] += 1
+
+    @classmethod
+    def _get(cls, key: str):
+        value = cls._local.get(key)
+
+        if value is not None:
+            cls._count("local_hits")
+            return value
+
+        value = cache.get(key)
+
+        if value is not None:
+            cls._count("shared_hits")
+            cls._local.set(key, value)
+            return value
+
+        cls._count("misses")
+
+        return None
+
+    @classmethod
+    def _set(cls, key: str, value) -> None:
+        cache.set(key, value, timeout=settings.STORY_CACHE_TIMEOUT)
+        cls._local.set(key, value)
+
+    @staticmethod
+    def get_story_fields() -> list:
+        from app.models import Story
+
+        return [field.attname for field in Story._meta.concrete_fields]
+
+    @classmethod
+    def load(cls, **filters) -> tuple:
+        """
+        Load a story with what the download endpoints need, in a single query on the primary.
+
+        Returns:
+            tuple: The ``(record, successful transactions count)`` of the story, ``(None, None)``
+            if it does not exist.
+        """
+        from app.enum_classes import TransactionStatuses
+        from app.models import Story
+
+        row = (
+            Story.objects.using(DEFAULT_DB_ALIAS)
+            .filter(**filters)
+            .annotate(
+                successful_transactions_count=Count(
+                    "story_transactions",
+                    filter=Q(story_transactions__status=TransactionStatuses.SUCCESS),
+                )
+            )
+            .values(*cls.get_story_fields(), "owner__username", "successful_transactions_count")
+            .first()
+        )
+
+        if row is None:
+            return None, None
+
+        count = row.pop("successful_transactions_count")
+        row["owner_username"] = row.pop("owner__username")
+
+        return row, count
+
+    @classmethod
+    def get_transactions_count(cls, story_id) -> int:
+        """
+        Return the number of successful transactions of the story, from the shared cache only.
+        """
+        key = cls.get_key("transactions", story_id)
+        count = cache.get(key)
+
+        if count is None:
+            from app.enum_classes import TransactionStatuses
+            from app.models import Transaction
+
+            count = (
+                Transaction.objects.using(DEFAULT_DB_ALIAS)
+                .filter(story_id=story_id, status=TransactionStatuses.SUCCESS)
+                .count()
+            )
+            cache.set(key, count, timeout=settings.STORY_CACHE_TIMEOUT)
+
+        return count
+
+    @classmethod
+    def build(cls, record: dict, count: int):
+        """
+        Build the story of a cached record. The owner only has its id and username, its other
+        fields are deferred.
+        """
+        from app.models import CustomUser, Story
+
+        fields = cls.get_story_fields()
+
+        story = Story.from_db(DEFAULT_DB_ALIAS, fields, [record[field] for field in fields])
+        story.owner = CustomUser.from_db(
+            DEFAULT_DB_ALIAS, ["id", "username"], [record["owner_id"], record["owner_username"]]
+        )
+        story.successful_transactions_count = count
+
+        return story
+
+    @classmethod
+    def get_by_id(cls, story_id):
+        """
+        Return the story, None if it does not exist.
+
+        Args:
+            story_id (UUID | str): The id of the story.
+
+        Returns:
+            Story | None: A new instance built from the cache, safe to modify.
+        """
+        key = cls.get_key("id", story_id)
+        record = cls._get(key)
+
+        if record is None:
+            record, count = cls.load(id=story_id)
+
+            if record is None:
+                return None
+
+            cls._set(key, record)
+            cache.set(
+                cls.get_key("transactions", story_id), count, timeout=settings.STORY_CACHE_TIMEOUT
+            )
+
+            return cls.build(record, count)
+
+        return cls.build(record, cls.get_transactions_count(story_id))
+
+    @classmethod
+    def get_by_reference(cls, reference_number: str):
+        """
+        Return the story with the reference number, None if it does not exist.
+
+        Args:
+            reference_number (str): The reference number of the story.
+
+        Returns:
+            Story | None: A new instance built from the cache, safe to modify.
+        """
+        key = cls.get_key("reference", reference_number)
+        story_id = cls._get(key)
+
+        if story_id is not None:
+            return cls.get_by_id(story_id)
+
+        record, count = cls.load(reference_number=reference_number)
+
+        if record is None:
+            return None
+
+        cls._set(key, record["id"])
+        cls._set(cls.get_key("id", record["id"]), record)
+        cache.set(
+            cls.get_key("transactions", record["id"]), count, timeout=settings.STORY_CACHE_TIMEOUT
+        )
+
+        return cls.build(record, count)
+
+    @classmethod
+    def invalidate(cls, story_id, reference_number: str | None = None) -> None:
+        """
+        Remove the story from the caches of this process and from the shared cache.
+
+        Args:
+            story_id (UUID | str): The id of the story.
+            reference_number (str): The reference number of the story, when it is deleted.
+        """
+        keys = [cls.get_key("id", story_id), cls.get_key("transactions", story_id)]
+
+        if reference_number:
+            keys.append(cls.get_key("reference", reference_number))
+
+        cache.delete_many(keys)
+
+        for key in keys:
+            cls._local.delete(key)
+
+    @classmethod
+    def invalidate_transactions(cls, story_id) -> None:
+        """
+        Remove the number of successful transactions of the story from the shared cache.
+        """
+        cache.delete(cls.get_key("transactions", story_id))
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        """
+        Return the hit counts and ratios of this process since it started.
+        """
+        with cls._stats_lock:
+            stats = dict(cls._stats)
+
+        lookups = stats["local_hits"] + stats["shared_hits"] + stats["misses"]
+
+        stats["lookups"] = lookups
+        stats["hit_ratio"] = (
+            (stats["local_hits"] + stats["shared_hits"]) / lookups if lookups else None
+        )
+        stats["local_hit_ratio"] = stats["local_hits"] / lookups if lookups else None
+
+        return stats
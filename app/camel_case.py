@@ -0,0 +1,309 @@
+"""
+Translation of the API payload keys between snake_case (python) and camelCase (frontend).
+
+Drop-in replacement for the djangorestframework_camel_case renderer, parsers and middleware
+that produces the same keys, but memoizes every key it translates, precomputes the keys of
+serializer fields and walks the payload once without regexes in the hot path.
+"""
+
+import json
+import re
+
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import QueryDict
+from django.http.multipartparser import MultiPartParser as DjangoMultiPartParser
+from django.http.multipartparser import MultiPartParserError
+from django.utils.datastructures import MultiValueDict
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import DataAndFiles, FormParser, JSONParser, MultiPartParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+
+# same patterns as djangorestframework_camel_case, so the keys stay identical
+CAMELIZE_RE = re.compile(r"[a-z0-9]?_[a-z0-9]")
+UNDERSCOREIZE_RE = re.compile(
+    r"([a-z0-9]|[A-Z]?(?=[A-Z0-9](?=[a-z0-9]|(?<![A-Z])$)))([A-Z]|(?<=[a-z])[0-9](?=[0-9A-Z]|$)|(?<=[A-Z])[0-9](?=[0-9]|$))"
+)
+
+
+def _underscore_to_camel(match):
+    group = match.group()
+
+    if len(group) == 3:
+        return group[0] + group[2].upper()
+
+    return group[1].upper()
+
+
+@lru_cache(maxsize=4096)
+def camelize_key(key: str) -> str:
+    """
+    Convert a snake_case key to camelCase, e.g. created_at -> createdAt.
+
+    Args:
+        key (str): The snake_case key.
+
+    Returns:
+        str: The camelCase key.
+    """
+    if "_" not in key:
+        return key
+
+    return CAMELIZE_RE.sub(_underscore_to_camel, key)
+
+
+@lru_cache(maxsize=4096)
+def underscoreize_key(key: str) -> str:
+    """
+    Convert a camelCase key to snake_case, e.g. storyReference -> story_reference.
+
+    Args:
+        key (str): The camelCase key.
+
+    Returns:
+        str: The snake_case key.
+    """
+    return UNDERSCOREIZE_RE.sub(r"\1_\2", key).lower()
+
+
+class SerializerKeyMap:
+    """
+    camelCase names of the fields of every serializer class, computed once per class.
+    """
+
+    _maps: dict = {}
+
+    @classmethod
+    def get(cls, serializer) -> dict:
+        """
+        Return the snake_case to camelCase map of the fields of the serializer.
+
+        Args:
+            serializer (Serializer | ListSerializer): The serializer that produced the data.
+
+        Returns:
+            dict: The camelCase name of each field, keyed by field name.
+        """
+        serializer = getattr(serializer, "child", serializer)
+        serializer_class = type(serializer)
+
+        try:
+            return cls._maps[serializer_class]
+
+        except KeyError:
+            pass
+
+        try:
+            field_names = serializer.fields.keys()
+
+        except AttributeError:
+            field_names = ()
+
+        key_map = {name: camelize_key(name) for name in field_names}
+        cls._maps[serializer_class] = key_map
+
+        return key_map
+
+
+def _camelize_dict(data: dict, key_map: dict | None = None) -> dict:
+    camelized = {}
+
+    for key, value in data.items():
+        if isinstance(key, str):
+            new_key = (key_map and key_map.get(key)) or camelize_key(key)
+
+        elif isinstance(key, Promise):
+            new_key = camelize_key(force_str(key))
+
+        else:
+            new_key = key
+
+        camelized[new_key] = camelize(value)
+
+    return camelized
+
+
+def camelize(data):
+    """
+    Return a copy of the data with every dict key converted to camelCase.
+
+    Args:
+        data: The response data, usually a dict returned by APIResponses.
+
+    Returns:
+        The converted data, dicts become plain dicts and other iterables become lists.
+    """
+    if isinstance(data, (str, int, float, bool)) or data is None:
+        return data
+
+    if isinstance(data, ReturnDict):
+        return _camelize_dict(data, SerializerKeyMap.get(data.serializer))
+
+    if isinstance(data, dict):
+        return _camelize_dict(data)
+
+    if isinstance(data, ReturnList):
+        key_map = SerializerKeyMap.get(data.serializer)
+        return [
+            _camelize_dict(item, key_map) if isinstance(item, dict) else camelize(item)
+            for item in data
+        ]
+
+    if isinstance(data, (list, tuple)):
+        return [camelize(item) for item in data]
+
+    if isinstance(data, Promise):
+        return force_str(data)
+
+    if isinstance(data, bytes) or not hasattr(data, "__iter__"):
+        return data
+
+    return [camelize(item) for item in data]
+
+
+def underscoreize(data):
+    """
+    Return a copy of the data with every dict key converted to snake_case.
+
+    Args:
+        data: The parsed request data or query params.
+
+    Returns:
+        The converted data, QueryDict and MultiValueDict keep their type.
+    """
+    if isinstance(data, QueryDict):
+        underscoreized = QueryDict(mutable=True)
+
+        for key, values in data.lists():
+            underscoreized.setlist(underscoreize_key(key), values)
+
+        return underscoreized
+
+    if type(data) == MultiValueDict:
+        underscoreized = MultiValueDict()
+
+        for key in data:
+            underscoreized.setlist(underscoreize_key(key), data.getlist(key))
+
+        return underscoreized
+
+    if isinstance(data, dict):
+        return {
+            (underscoreize_key(key) if isinstance(key, str) else key): underscoreize(value)
+            for key, value in data.items()
+        }
+
+    if isinstance(data, list):
+        return [underscoreize(item) for item in data]
+
+    return data
+
+
+_encoder = JSONEncoder()
+
+# U+2028 and U+2029 in UTF-8
+LINE_SEPARATOR = "\u2028".encode()
+PARAGRAPH_SEPARATOR = "\u2029".encode()
+
+
+@lru_cache(maxsize=None)
+def get_json_dumps():
+    """
+    Return the function encoding the response data to bytes, selected by API_JSON_ENCODER.
+
+    "json" uses the standard library like the rest framework JSONRenderer. "orjson" is several
+    times faster but needs the optional orjson package.
+    """
+    if settings.API_JSON_ENCODER == "json":
+        return None
+
+    if settings.API_JSON_ENCODER != "orjson":
+        raise ImproperlyConfigured("API_JSON_ENCODER must be 'json' or 'orjson'")
+
+    try:
+        import orjson
+
+    except ImportError as error:
+        raise ImproperlyConfigured("API_JSON_ENCODER is orjson, install orjson") from error
+
+    # datetimes go through the rest framework encoder to keep its format
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(data) -> bytes:
+        content = orjson.dumps(data, default=_encoder.default, option=options)
+
+        # escaped like the rest framework JSONRenderer, they end a line in javascript
+        return content.replace(LINE_SEPARATOR, b"\\u2028").replace(PARAGRAPH_SEPARATOR, b"\\u2029")
+
+    return dumps
+
+
+class CamelCaseJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        data = camelize(data)
+        dumps = get_json_dumps()
+
+        if dumps is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        return dumps(data)
+
+
+class CamelCaseJSONParser(JSONParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+
+        try:
+            return underscoreize(json.loads(stream.read().decode(encoding)))
+
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+
+
+class CamelCaseFormParser(FormParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        return underscoreize(super().parse(stream, media_type, parser_context))
+
+
+class CamelCaseMultiPartParser(MultiPartParser):
+    media_type = "multipart/form-data"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        request = parser_context["request"]
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        meta = request.META.copy()
+        meta["CONTENT_TYPE"] = media_type
+
+        try:
+            parser = DjangoMultiPartParser(meta, stream, request.upload_handlers, encoding)
+            data, files = parser.parse()
+
+            return DataAndFiles(underscoreize(data), underscoreize(files))
+
+        except MultiPartParserError as exc:
+            raise ParseError(f"Multipart form parse error - {exc}")
+
+
+class CamelCaseMiddleWare:
+    """
+    Convert the query params to snake_case, e.g. ?storyReference= -> ?story_reference=.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.GET:
+            request.GET = underscoreize(request.GET)
+
+        return self.get_response(request)
@@ -1,8 +1,10 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import ModelBackend
 from django.conf import settings
+from django.db.models import F
 
 
+from app.api_authentication import TokenRevocations
 from app.enum_classes import AccountStatuses
 from app.models import CustomUser
 
@@ -53,7 +55,10 @@ class CustomAuthenticationBackend(ModelBackend):
         """
 
         user.account_status = AccountStatuses.INACTIVE
-        user.save()
+        user.save(update_fields=["account_status", "last_edited_at"])
+
+        # the access tokens would still be accepted from their claims
+        TokenRevocations.revoke_user_tokens(user)
 
     def reset_login_attempts(self, user: CustomUser):
         """
@@ -65,12 +70,17 @@ class CustomAuthenticationBackend(ModelBackend):
         Returns:
             None
         """
+        # a successful login does not write the user row unless there were failed attempts
+        if user.login_attempts == 0:
+            return
+
         user.login_attempts = 0
-        user.save()
+        CustomUser.objects.filter(id=user.id, login_attempts__gt=0).update(login_attempts=0)
 
     def increment_login_attempts(self, user: CustomUser):
         """
-        Increments the login attempts of a user and saves the updated user object.
+        Increments the login attempts of a user, in the database so concurrent failed attempts
+        are all counted.
 
         Args:
             user (CustomUser): The user object whose login attempts will be incremented.
@@ -78,5 +88,5 @@ class CustomAuthenticationBackend(ModelBackend):
         Returns:
             None
         """
+        CustomUser.objects.filter(id=user.id).update(login_attempts=F("login_attempts") + 1)
         user.login_attempts += 1
-        user.save()
@@ -0,0 +1,104 @@
+"""
+Read replica routing.
+
+The reads of the views marked with ``read_from_replica = True`` (class based views) or the
+``read_from_replica`` decorator (function views) go to one of the DATABASE_REPLICAS, every
+other query goes to the primary ("default"). A request that writes is pinned to the primary
+for the rest of the request, so it reads its own writes, and so are the queries run in a
+transaction.
+
+Usage:
+    class StoryView(APIView):
+        read_from_replica = True
+"""
+
+import random
+
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class RoutingState:
+    def __init__(self):
+        self.use_replica = False
+        self.pinned_to_primary = False
+
+
+routing_state: ContextVar[RoutingState | None] = ContextVar("routing_state", default=None)
+
+
+def read_from_replica(view):
+    """
+    Decorator sending the reads of a function view to the replicas.
+    """
+    view.read_from_replica = True
+    return view
+
+
+def get_replica_alias() -> str | None:
+    """
+    Return the replica the current read goes to, None for the primary.
+    """
+    state = routing_state.get()
+
+    if not settings.DATABASE_REPLICAS or state is None:
+        return None
+
+    if not state.use_replica or state.pinned_to_primary:
+        return None
+
+    # the reads of a transaction must see its writes
+    if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return None
+
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return get_replica_alias()
+
+    def db_for_write(self, model, **hints):
+        state = routing_state.get()
+
+        if state is not None:
+            state.pinned_to_primary = True
+
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Route the reads of the safe (GET, HEAD, OPTIONS) requests of the views marked with
+    ``read_from_replica`` to the replicas.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = routing_state.set(RoutingState())
+
+        try:
+            return self.get_response(request)
+
+        finally:
+            routing_state.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view = getattr(view_func, "view_class", view_func)
+
+        if request.method in SAFE_METHODS and getattr(view, "read_from_replica", False):
+            routing_state.get().use_replica = True
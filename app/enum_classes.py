@@ -83,6 +83,7 @@ class APIMessages:
 
     INVITE_SUCCESS = "User invited successfully"
 
+    TOKEN_REFRESH_SUCCESS = "Token refreshed"
     TOKEN_REFRESH_FAILURE = "Invalid or expired token"
 
     PROFILE_UPDATED_SUCCESSFULLY = "Profile Updated"
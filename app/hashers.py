@@ -0,0 +1,106 @@
+"""
+Password hashers with the cost read from the settings (PASSWORD_HASHER profile).
+
+The first hasher of PASSWORD_HASHERS hashes the new passwords, the others only verify the
+existing hashes. Django rehashes a password with the preferred hasher and cost when the user
+logs in with a hash of another profile or cost (``must_update``), so changing the profile or the
+cost upgrades the hashes transparently.
+
+A hash takes tens of milliseconds of CPU. hashlib and argon2-cffi release the GIL while hashing,
+and at most PASSWORD_HASHING_CONCURRENCY hashes run at once in a process, so with the threaded
+gunicorn workers (gunicorn.conf.py) the other threads keep serving the cheap requests while
+logins wait for a slot.
+"""
+
+import threading
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+)
+
+
+class HashingLimiter:
+    _semaphore: threading.BoundedSemaphore | None = None
+    _lock = threading.Lock()
+    _holder = threading.local()
+
+    @classmethod
+    def get_semaphore(cls) -> threading.BoundedSemaphore | None:
+        """
+        Return the semaphore bounding the concurrent hashes, None when unbounded.
+        """
+        if settings.PASSWORD_HASHING_CONCURRENCY <= 0:
+            return None
+
+        if cls._semaphore is None:
+            with cls._lock:
+                if cls._semaphore is None:
+                    cls._semaphore = threading.BoundedSemaphore(
+                        settings.PASSWORD_HASHING_CONCURRENCY
+                    )
+
+        return cls._semaphore
+
+    @classmethod
+    def run(cls, func, *args, **kwargs):
+        semaphore = cls.get_semaphore()
+
+        # verify() calls encode(), the thread already holds a slot
+        if semaphore is None or getattr(cls._holder, "active", False):
+            return func(*args, **kwargs)
+
+        with semaphore:
+            cls._holder.active = True
+
+            try:
+                return func(*args, **kwargs)
+
+            finally:
+                cls._holder.active = False
+
+
+class LimitedHasherMixin:
+    def encode(self, *args, **kwargs):
+        return HashingLimiter.run(super().encode, *args, **kwargs)
+
+    def verify(self, *args, **kwargs):
+        return HashingLimiter.run(super().verify, *args, **kwargs)
+
+
+class TunedPBKDF2PasswordHasher(LimitedHasherMixin, PBKDF2PasswordHasher):
+    @property
+    def iterations(self) -> int:
+        return settings.PBKDF2_ITERATIONS
+
+
+class TunedScryptPasswordHasher(LimitedHasherMixin, ScryptPasswordHasher):
+    @property
+    def work_factor(self) -> int:
+        return settings.SCRYPT_WORK_FACTOR
+
+    @property
+    def maxmem(self) -> int:
+        # only a bound, OpenSSL refuses more than 32 MB by default: scrypt uses 128 * n * r bytes
+        # and the hashes of a previous, higher, work factor must still verify
+        return 2 * 128 * max(self.work_factor, 2**17) * self.block_size
+
+
+class TunedArgon2PasswordHasher(LimitedHasherMixin, Argon2PasswordHasher):
+    """
+    Needs the argon2-cffi package.
+    """
+
+    @property
+    def time_cost(self) -> int:
+        return settings.ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self) -> int:
+        return settings.ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self) -> int:
+        return settings.ARGON2_PARALLELISM
@@ -0,0 +1,138 @@
+import threading
+
+from django.conf import settings
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.metrics import LatencyHistogram, add_upstream_time
+
+
+class OutboundHTTPClient:
+    """
+    Shared outbound HTTP layer for the third party APIs (Stripe, Google, Facebook).
+
+    Every upstream gets its own ``requests.Session`` whose adapter keeps a keep-alive
+    connection pool per host, so repeated calls reuse the TCP+TLS connection instead of
+    opening a new one. Requests get the configured timeouts and retry/backoff policy, and
+    the latency of every response is recorded in a per-upstream histogram.
+    """
+
+    _sessions: dict[str, requests.Session] = {}
+    _histograms: dict[str, LatencyHistogram] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_session(cls, upstream: str, retries: int | None = None) -> requests.Session:
+        """
+        Return the pooled session for the given upstream, creating it on first use.
+
+        Args:
+            upstream (str): The name of the upstream, e.g. "google" or "stripe".
+            retries (int, optional): Overrides OUTBOUND_HTTP_MAX_RETRIES for this upstream.
+                Only used when the session is created.
+
+        Returns:
+            requests.Session: The shared session for the upstream.
+        """
+        session = cls._sessions.get(upstream)
+
+        if session is not None:
+            return session
+
+        with cls._lock:
+            session = cls._sessions.get(upstream)
+
+            if session is None:
+                session = cls._build_session(upstream, retries)
+                cls._sessions[upstream] = session
+
+        return session
+
+    @classmethod
+    def _build_session(cls, upstream: str, retries: int | None) -> requests.Session:
+        """
+        Build a session with a pooled adapter, the retry policy and the latency hook.
+        """
+        if retries is None:
+            retries = settings.OUTBOUND_HTTP_MAX_RETRIES
+
+        # only idempotent methods are retried on error responses (urllib3 default)
+        retry = Retry(
+            total=retries,
+            backoff_factor=settings.OUTBOUND_HTTP_BACKOFF_FACTOR,
+            status_forcelist=(429, 500, 502, 503, 504),
+            raise_on_status=False,
+        )
+
+        adapter = HTTPAdapter(
+            pool_connections=settings.OUTBOUND_HTTP_POOL_CONNECTIONS,
+            pool_maxsize=settings.OUTBOUND_HTTP_POOL_MAXSIZE,
+            max_retries=retry,
+        )
+
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        histogram = cls.get_histogram(upstream)
+
+        def record_latency(response, *args, **kwargs):
+            seconds = response.elapsed.total_seconds()
+            histogram.observe(seconds)
+            add_upstream_time(upstream, seconds)
+
+        session.hooks["response"].append(record_latency)
+
+        return session
+
+    @classmethod
+    def get_histogram(cls, upstream: str) -> LatencyHistogram:
+        """
+        Return the latency histogram of the given upstream, creating it on first use.
+        """
+        histogram = cls._histograms.get(upstream)
+
+        if histogram is None:
+            histogram = cls._histograms.setdefault(
+                upstream, LatencyHistogram(settings.OUTBOUND_HTTP_LATENCY_BUCKETS)
+            )
+
+        return histogram
+
+    @classmethod
+    def get_latency_histograms(cls) -> dict[str, dict]:
+        """
+        Return a snapshot of every upstream latency histogram, keyed by upstream name.
+        """
+        return {upstream: histogram.snapshot() for upstream, histogram in cls._histograms.items()}
+
+    @classmethod
+    def request(cls, upstream: str, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request through the pooled session of the given upstream.
+
+        Args:
+            upstream (str): The name of the upstream.
+            method (str): The HTTP method.
+            url (str): The URL to call.
+            kwargs: Extra arguments for ``requests.Session.request``.
+
+        Returns:
+            requests.Response: The response from the upstream.
+        """
+        kwargs.setdefault(
+            "timeout",
+            (settings.OUTBOUND_HTTP_CONNECT_TIMEOUT, settings.OUTBOUND_HTTP_READ_TIMEOUT),
+        )
+
+        return cls.get_session(upstream).request(method, url, **kwargs)
+
+    @classmethod
+    def get(cls, upstream: str, url: str, **kwargs) -> requests.Response:
+        return cls.request(upstream, "GET", url, **kwargs)
+
+    @classmethod
+    def post(cls, upstream: str, url: str, **kwargs) -> requests.Response:
+        return cls.request(upstream, "POST", url, **kwargs)
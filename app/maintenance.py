@@ -0,0 +1,201 @@
+"""
+Purge of the tables that only ever grow:
+
+- the OTPs past their expiry are deleted,
+- the used refresh tokens past their expiry are deleted (REFRESH_TOKEN_STORE "database"),
+- the abandoned checkouts, payments still pending PENDING_TRANSACTION_RETENTION_HOURS after
+  their last change, are moved to ArchivedTransaction.
+
+The rows are processed in batches of MAINTENANCE_BATCH_SIZE, each in its own short transaction,
+so the locks are held briefly and the replicas keep up between the batches.
+
+Usage:
+    python manage.py purge_stale_records  # from cron, Heroku Scheduler, a Kubernetes CronJob...
+    MaintenanceTasks.run_all()
+"""
+
+import logging
+import time
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from app.enum_classes import TransactionStatuses, TransactionTypes
+from app.models import OTP, ArchivedTransaction, Transaction, UsedRefreshToken
+
+
+logger = logging.getLogger(__name__)
+
+
+class PurgeResult:
+    def __init__(self, name: str, rows: int, batches: int, duration: float):
+        self.name = name
+        self.rows = rows
+        self.batches = batches
+        self.duration = duration
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.duration if self.duration else 0.0
+
+
+class MaintenanceTasks:
+    @staticmethod
+    def get_expired_otps() -> QuerySet:
+        # served by the otp_expire_at_idx index
+        return OTP.objects.filter(expire_at__lt=timezone.now()).order_by("expire_at")
+
+    @staticmethod
+    def get_expired_refresh_tokens() -> QuerySet:
+        # served by the used_refresh_expire_at_idx index, an expired token fails verification
+        return UsedRefreshToken.objects.filter(expire_at__lt=timezone.now()).order_by("expire_at")
+
+    @staticmethod
+    def get_abandoned_transactions() -> QuerySet:
+        # a checkout moved to processing by the webhook is changed, so it is kept longer; served
+        # by the transaction_pending_idx partial index
+        cutoff = timezone.now() - timedelta(hours=settings.PENDING_TRANSACTION_RETENTION_HOURS)
+
+        return Transaction.objects.filter(
+            status=TransactionStatuses.PENDING,
+            payment_type=TransactionTypes.PAYMENT,
+            last_edited_at__lt=cutoff,
+        ).order_by("last_edited_at")
+
+    @classmethod
+    def purge_expired_otps(cls, **options) -> PurgeResult:
+        """
+        Delete the expired OTPs, see run_in_batches for the options.
+        """
+
+        def delete(queryset: QuerySet) -> int:
+            ids = list(queryset.values_list("id", flat=True))
+            OTP.objects.filter(id__in=ids).delete()
+
+            return len(ids)
+
+        return cls.run_in_batches("expired OTPs", cls.get_expired_otps, delete, **options)
+
+    @classmethod
+    def purge_expired_refresh_tokens(cls, **options) -> PurgeResult:
+        """
+        Delete the expired used refresh tokens, see run_in_batches for the options.
+        """
+
+        def delete(queryset: QuerySet) -> int:
+            ids = list(queryset.values_list("id", flat=True))
+            UsedRefreshToken.objects.filter(id__in=ids).delete()
+
+            return len(ids)
+
+        return cls.run_in_batches(
+            "expired refresh tokens", cls.get_expired_refresh_tokens, delete, **options
+        )
+
+    @classmethod
+    def archive_abandoned_transactions(cls, **options) -> PurgeResult:
+        """
+        Move the abandoned checkouts to ArchivedTransaction, see run_in_batches for the options.
+        """
+
+        def archive(queryset: QuerySet) -> int:
+            # a row locked by a webhook is left for the next run
+            rows = list(queryset.select_for_update(skip_locked=True).values())
+
+            ArchivedTransaction.objects.bulk_create(
+                [
+                    ArchivedTransaction(
+                        transaction_id=row["id"],
+                        reference=row["reference"],
+                        status=row["status"],
+                        transaction_created_at=row["created_at"],
+                        data=row,
+                    )
+                    for row in rows
+                ]
+            )
+            Transaction.objects.filter(id__in=[row["id"] for row in rows]).delete()
+
+            return len(rows)
+
+        return cls.run_in_batches(
+            "abandoned transactions", cls.get_abandoned_transactions, archive, **options
+        )
+
+    @staticmethod
+    def run_in_batches(
+        name: str,
+        get_queryset,
+        process,
+        batch_size: int | None = None,
+        max_batches: int | None = None,
+        pause: float = 0,
+    ) -> PurgeResult:
+        """
+        Process the rows of ``get_queryset()`` batch after batch until none is left.
+
+        Args:
+            name (str): The name of the rows, for the logs.
+            get_queryset (callable): Returns the rows to process, in the order of an index.
+            process (callable): Processes a batch, given as a sliced queryset, and returns the
+                number of rows processed.
+            batch_size (int): Rows per batch, MAINTENANCE_BATCH_SIZE by default.
+            max_batches (int): Stop after this many batches, the next run continues.
+            pause (float): Seconds to wait between two batches.
+
+        Returns:
+            PurgeResult: The rows processed and the time it took, pauses excluded.
+        """
+        batch_size = batch_size or settings.MAINTENANCE_BATCH_SIZE
+        rows = batches = 0
+        duration = 0.0
+
+        while max_batches is None or batches < max_batches:
+            start = time.perf_counter()
+
+            with transaction.atomic():
+                processed = process(get_queryset()[:batch_size])
+
+            duration += time.perf_counter() - start
+
+            if not processed:
+                break
+
+            rows += processed
+            batches += 1
+
+            if processed < batch_size:
+                break
+
+            time.sleep(pause)
+
+        result = PurgeResult(name, rows, batches, duration)
+
+        logger.info(
+            "Purged %s %s in %.2fs (%.0f rows/s)",
+            rows,
+            name,
+            duration,
+            result.rows_per_second,
+            extra={"task": name, "rows": rows, "rows_per_second": result.rows_per_second},
+        )
+
+        return result
+
+    @classmethod
+    def run_all(cls, **options) -> list:
+        """
+        Run every purge, see run_in_batches for the options.
+
+        Returns:
+            list: The PurgeResult of every purge.
+        """
+        return [
+            cls.purge_expired_otps(**options),
+            cls.purge_expired_refresh_tokens(**options),
+            cls.archive_abandoned_transactions(**options),
+        ]
@@ -0,0 +1,228 @@
+import json
+import os
+import statistics
+import subprocess
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+
+from app.benchmarks.api import BenchmarkEnvironment
+from app.benchmarks.seed import seed_benchmark_data
+from app.models import CustomUser
+from app.query_inspector import QueryInspector
+
+
+class Command(BaseCommand):
+    help = (
+        "Call every endpoint of the API against seeded data, with Stripe, Google, Facebook, "
+        "Firebase, SMTP and S3 replaced by local stubs, and report the p50/p95/p99 latency, the "
+        "throughput and the queries per request. The results are written to a JSON file per "
+        "commit and compared with a baseline, failing on regressions. The seeded rows are "
+        "created in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100, help="Number of seeded users")
+        parser.add_argument("--stories-per-user", type=int, default=20)
+        parser.add_argument("--transactions-per-story", type=int, default=10)
+        parser.add_argument("--iterations", type=int, default=50, help="Calls per endpoint")
+        parser.add_argument("--warmup", type=int, default=5, help="Untimed calls per endpoint")
+        parser.add_argument(
+            "--latency", type=float, default=0.0, help="Delay of the stubbed upstreams, seconds"
+        )
+        parser.add_argument(
+            "--only", nargs="*", help="Only run the scenarios containing one of these strings"
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the results to this JSON file, "
+            "defaults to benchmark-results/api-<commit>.json",
+        )
+        parser.add_argument("--baseline", help="Compare the results with this JSON file")
+        parser.add_argument(
+            "--max-regression",
+            type=float,
+            default=0.25,
+            help="Allowed slowdown of the p95 compared with the baseline, as a fraction",
+        )
+        parser.add_argument(
+            "--min-regression-ms",
+            type=float,
+            default=2,
+            help="Slowdowns smaller than this are ignored, to absorb measurement noise",
+        )
+
+    def handle(self, *args, **options):
+        results = {}
+
+        with BenchmarkEnvironment(latency=options["latency"]) as environment, transaction.atomic():
+            try:
+                start = time.perf_counter()
+                seeded = seed_benchmark_data(
+                    users=options["users"] + 1,
+                    stories_per_user=options["stories_per_user"],
+                    transactions_per_story=options["transactions_per_story"],
+                )
+                self.stdout.write(
+                    f"seeded {len(seeded['users'])} users, {len(seeded['stories'])} stories and "
+                    f"{seeded['transactions']} transactions in {time.perf_counter() - start:.1f} s"
+                )
+
+                # the last user goes through the stripe setup and the password reset
+                new_user = seeded["users"][-1]
+                CustomUser.objects.filter(id=new_user.id).update(stripe_setup_complete=False)
+
+                scenarios = environment.get_scenarios(
+                    user=seeded["users"][0], story=seeded["stories"][0], new_user=new_user
+                )
+
+                if options["only"]:
+                    scenarios = [
+                        scenario
+                        for scenario in scenarios
+                        if any(name in scenario.name for name in options["only"])
+                    ]
+
+                self.stdout.write(
+                    f"\n{'endpoint':<40} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+                    f"{'req/s':>8} {'queries':>8}"
+                )
+
+                for scenario in scenarios:
+                    results[scenario.name] = self.run_scenario(
+                        scenario, options["iterations"], options["warmup"]
+                    )
+                    self.write_result(scenario.name, results[scenario.name])
+
+            finally:
+                transaction.set_rollback(True)
+
+        commit = self.get_commit()
+        output = options["output"] or os.path.join("benchmark-results", f"api-{commit}.json")
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+
+        with open(output, "w") as f:
+            json.dump(
+                {"commit": commit, "options": self.get_run_options(options), **results},
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+
+        self.stdout.write(f"\nresults written to {output}")
+
+        if options["baseline"]:
+            with open(options["baseline"]) as f:
+                baseline = json.load(f)
+
+            regressions = self.find_regressions(
+                results, baseline, options["max_regression"], options["min_regression_ms"]
+            )
+
+            if regressions:
+                raise CommandError("API regressions:\n" + "\n".join(regressions))
+
+            self.stdout.write(self.style.SUCCESS("\nno API regressions"))
+
+    def run_scenario(self, scenario, iterations: int, warmup: int) -> dict:
+        """
+        Call the scenario ``warmup`` + ``iterations`` times, sequentially, and time the calls.
+
+        Returns:
+            dict: The latency percentiles and mean in milliseconds, the requests per second of
+            a single worker and the mean number of queries per request.
+        """
+        client = Client()
+        durations = []
+        queries = []
+
+        for iteration in range(warmup + iterations):
+            path, data = scenario.get_request()
+
+            with QueryInspector() as inspector:
+                start = time.perf_counter()
+                response = scenario.call(client, path, data)
+                elapsed = time.perf_counter() - start
+
+            if response.status_code != scenario.expected_status:
+                raise CommandError(
+                    f"{scenario.name} returned {response.status_code}, expected "
+                    f"{scenario.expected_status}: {response.content[:500]}"
+                )
+
+            if iteration >= warmup:
+                durations.append(elapsed)
+                queries.append(inspector.count)
+
+        percentiles = statistics.quantiles(durations, n=100, method="inclusive")
+
+        return {
+            "p50_ms": percentiles[49] * 1000,
+            "p95_ms": percentiles[94] * 1000,
+            "p99_ms": percentiles[98] * 1000,
+            "mean_ms": statistics.mean(durations) * 1000,
+            "requests_per_second": len(durations) / sum(durations),
+            "queries": statistics.mean(queries),
+        }
+
+    def write_result(self, name: str, result: dict):
+        self.stdout.write(
+            f"{name:<40} {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} "
+            f"{result['p99_ms']:>8.1f} {result['requests_per_second']:>8.0f} "
+            f"{result['queries']:>8.1f}"
+        )
+
+    @staticmethod
+    def get_run_options(options: dict) -> dict:
+        keys = ("users", "stories_per_user", "transactions_per_story", "iterations", "latency")
+
+        return {key: options[key] for key in keys}
+
+    @staticmethod
+    def get_commit() -> str:
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=settings.BASE_DIR,
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout.strip()
+
+        except (OSError, subprocess.CalledProcessError):
+            return "unknown"
+
+    @staticmethod
+    def find_regressions(results, baseline, max_regression, min_regression_ms) -> list:
+        """
+        Compare the p95 latency and the queries of every endpoint with the baseline.
+
+        Returns:
+            list: A description of every endpoint that got slower than allowed or runs more
+            queries.
+        """
+        regressions = []
+
+        for name, result in results.items():
+            previous = baseline.get(name)
+
+            if previous is None:
+                continue
+
+            current_ms, previous_ms = result["p95_ms"], previous["p95_ms"]
+
+            if (
+                current_ms > previous_ms * (1 + max_regression)
+                and current_ms - previous_ms > min_regression_ms
+            ):
+                regressions.append(f"  {name}: p95 {previous_ms:.1f} ms -> {current_ms:.1f} ms")
+
+            if result["queries"] > previous["queries"]:
+                regressions.append(
+                    f"  {name}: {previous['queries']:.1f} -> {result['queries']:.1f} queries"
+                )
+
+        return regressions
@@ -0,0 +1,120 @@
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+from django.db.backends.signals import connection_created
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from app.api_authentication import MyAPIAuthentication
+from app.enum_classes import AccountStatuses
+from app.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the requests/sec of a one query endpoint when every request opens a new "
+        "database connection (CONN_MAX_AGE=0) against persistent connections, with and without "
+        "health checks. Run it against the LIVE PostgreSQL database, where a connection costs a "
+        "TCP handshake and the authentication."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500, help="Requests per mode")
+        parser.add_argument("--warmup", type=int, default=20, help="Untimed requests per mode")
+        parser.add_argument(
+            "--max-age", type=int, default=60, help="CONN_MAX_AGE of the persistent modes"
+        )
+
+    def handle(self, *args, **options):
+        modes = [
+            ("new connection per request", 0, False),
+            ("persistent", options["max_age"], False),
+            ("persistent + health checks", options["max_age"], True),
+        ]
+        previous = {
+            key: connection.settings_dict[key] for key in ("CONN_MAX_AGE", "CONN_HEALTH_CHECKS")
+        }
+        user = self.create_user()
+        opened = []
+
+        def count_connection(sender, **kwargs):
+            opened.append(sender)
+
+        connection_created.connect(count_connection)
+
+        self.stdout.write(f"database: {connection.vendor} {connection.settings_dict['NAME']}")
+        self.stdout.write(
+            f"\n{'mode':<30} {'req/s':>8} {'mean ms':>8} {'p95 ms':>8} {'connections':>12}"
+        )
+
+        try:
+            with override_settings(ALLOWED_HOSTS=["*"]):
+                for name, max_age, health_checks in modes:
+                    connection.close()
+                    connection.settings_dict["CONN_MAX_AGE"] = max_age
+                    connection.settings_dict["CONN_HEALTH_CHECKS"] = health_checks
+
+                    durations = self.run_requests(
+                        user, options["requests"], options["warmup"], opened
+                    )
+                    percentiles = statistics.quantiles(durations, n=100, method="inclusive")
+
+                    self.stdout.write(
+                        f"{name:<30} {len(durations) / sum(durations):>8.0f} "
+                        f"{statistics.mean(durations) * 1000:>8.2f} {percentiles[94] * 1000:>8.2f} "
+                        f"{len(opened):>12}"
+                    )
+
+        finally:
+            connection_created.disconnect(count_connection)
+            connection.close()
+            connection.settings_dict.update(previous)
+            user.delete()
+
+    @staticmethod
+    def run_requests(user: CustomUser, requests: int, warmup: int, opened: list) -> list:
+        """
+        Call the profile endpoint, one query, ``warmup`` + ``requests`` times. The test client
+        does not close the connections at the start and end of a request, that is done here as
+        the WSGI handler of a worker does it. ``opened`` is emptied after the warmup.
+
+        Returns:
+            list: The duration of the timed requests in seconds.
+        """
+        client = Client()
+        token, _ = MyAPIAuthentication.get_access_token(MyAPIAuthentication.get_claims(user))
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+        path = reverse("profile-view")
+        durations = []
+
+        for index in range(warmup + requests):
+            if index == warmup:
+                opened.clear()
+
+            start = time.perf_counter()
+            close_old_connections()
+            response = client.get(path, **headers)
+            close_old_connections()
+            elapsed = time.perf_counter() - start
+
+            if response.status_code != 200:
+                raise CommandError(f"{path} returned {response.status_code}")
+
+            if index >= warmup:
+                durations.append(elapsed)
+
+        return durations
+
+    @staticmethod
+    def create_user() -> CustomUser:
+        identifier = uuid.uuid4().hex
+
+        return CustomUser.objects.create(
+            username=f"Connections {identifier[:16]}",
+            email=f"{identifier}@connections.example.com",
+            account_status=AccountStatuses.ACTIVE,
+            referral_code=identifier[:10],
+        )
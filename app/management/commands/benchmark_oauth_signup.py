@@ -0,0 +1,129 @@
+import statistics
+import time
+import uuid
+
+from urllib.parse import parse_qs, urlsplit
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from app.background_tasks import BackgroundTasks
+from app.benchmarks.stubs import StubHTTPServer
+from app.http_client import OutboundHTTPClient
+from app.models import CustomUser
+from app.serializers.auth_serializers import FaceBookOAuthSerializer
+from app.services import ServiceRegistry
+
+
+FACEBOOK_USER_ID = "1234567890"
+EMAIL_DOMAIN = "oauth-benchmark.example.com"
+
+
+def facebook_profile(handler):
+    """Stub for /me, returns the full profile when fields are requested, else only the id"""
+    query = parse_qs(urlsplit(handler.path).query)
+
+    if "fields" not in query:
+        return 200, {"id": FACEBOOK_USER_ID, "name": "Benchmark User"}
+
+    identifier = uuid.uuid4().hex
+
+    return 200, {
+        "id": FACEBOOK_USER_ID,
+        "name": f"Benchmark {identifier}",
+        "email": f"{identifier}@{EMAIL_DOMAIN}",
+        "picture": {"data": {"url": "https://example.com/picture.png"}},
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the Facebook OAuth signup latency against a local HTTP stub of the Graph API "
+        "and Stripe, compared with the previous sequential upstream call sequence"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=10)
+        parser.add_argument(
+            "--latency", type=float, default=0.1, help="Simulated upstream latency in seconds"
+        )
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+
+        routes = {
+            ("GET", "/v19.0/oauth/access_token"): (200, {"access_token": "stub-token"}),
+            ("GET", "/me"): facebook_profile,
+            ("GET", f"/{FACEBOOK_USER_ID}"): facebook_profile,
+            ("POST", "/v1/customers"): (200, {"id": "cus_benchmark", "object": "customer"}),
+        }
+
+        stripe = ServiceRegistry.get("stripe")
+        previous_api_base = stripe.api_base
+
+        with StubHTTPServer(routes, latency=options["latency"]) as stub:
+            stripe.api_base = stub.url
+
+            try:
+                with override_settings(
+                    FACEBOOK_ACCESS_TOKEN_OBTAIN_URL=f"{stub.url}/v19.0/oauth/access_token",
+                    FACEBOOK_PROFILE_ENDPOINT_URL=f"{stub.url}/me",
+                ):
+                    baseline = [self.run_sequential_baseline(stub.url) for _ in range(iterations)]
+
+                    stub.reset_hits()
+                    current = [self.run_signup() for _ in range(iterations)]
+
+                BackgroundTasks.drain()
+
+            finally:
+                stripe.api_base = previous_api_base
+                CustomUser.objects.filter(email__endswith=f"@{EMAIL_DOMAIN}").delete()
+
+        self.report("previous call sequence (upstream only)", baseline)
+        self.report("current signup path (end to end)", current)
+        self.stdout.write(f"upstream calls during signup: {stub.hits}")
+        self.stdout.write(
+            f"speedup: {statistics.mean(baseline) / statistics.mean(current):.2f}x "
+            "(conservative, the baseline excludes database work)"
+        )
+
+    @staticmethod
+    def run_sequential_baseline(stub_url: str) -> float:
+        """
+        Replays the upstream calls of the previous signup flow, one after the other:
+        token, /me for the id, the profile details and the blocking Stripe customer creation.
+        """
+        start = time.perf_counter()
+
+        OutboundHTTPClient.get("facebook", f"{stub_url}/v19.0/oauth/access_token")
+        OutboundHTTPClient.get("facebook", f"{stub_url}/me")
+        OutboundHTTPClient.get(
+            "facebook", f"{stub_url}/{FACEBOOK_USER_ID}", params={"fields": "id"}
+        )
+        ServiceRegistry.get("stripe").Customer.create(
+            name="Benchmark User", email=f"baseline@{EMAIL_DOMAIN}"
+        )
+
+        return time.perf_counter() - start
+
+    @staticmethod
+    def run_signup() -> float:
+        start = time.perf_counter()
+
+        form = FaceBookOAuthSerializer(data={"code": "stub-code"})
+        form.is_valid(raise_exception=True)
+        _, success = form.process_facebook_oauth()
+
+        elapsed = time.perf_counter() - start
+
+        if not success:
+            raise RuntimeError("Facebook signup failed against the stub")
+
+        return elapsed
+
+    def report(self, label: str, timings: list):
+        self.stdout.write(
+            f"{label}: mean {statistics.mean(timings) * 1000:.1f} ms, "
+            f"min {min(timings) * 1000:.1f} ms, max {max(timings) * 1000:.1f} ms"
+        )
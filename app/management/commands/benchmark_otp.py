@@ -0,0 +1,89 @@
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import override_settings
+
+from app.enum_classes import OTPChannels, OTPPurposes
+from app.otp_store import CacheOTPStore, DatabaseOTPStore
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the OTP throughput of the cache and database stores: issue, verify, then "
+        "consume an OTP for distinct recipients. The cache store uses the default cache, run "
+        "it with REDIS_URL set to measure Redis. The database rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--otps", type=int, default=2000, help="OTPs per store")
+        parser.add_argument(
+            "--existing",
+            type=int,
+            default=0,
+            help="OTPs issued to other recipients first, to measure the lookups on a large table",
+        )
+
+    def handle(self, *args, **options):
+        caches = settings.CACHES
+        backend = caches["default"]["BACKEND"]
+
+        if backend.endswith("LocMemCache"):
+            # the local memory cache culls past 300 keys by default
+            caches = {"default": {**caches["default"], "OPTIONS": {"MAX_ENTRIES": 10**7}}}
+
+        stores = [
+            (f"cache ({backend.rsplit('.', 1)[-1]})", CacheOTPStore()),
+            ("database", DatabaseOTPStore()),
+        ]
+
+        self.stdout.write(f"{'store':<22} {'issue/s':>10} {'verify/s':>10} {'consume/s':>10}")
+
+        for name, store in stores:
+            with override_settings(CACHES=caches), transaction.atomic():
+                try:
+                    self.issue(store, self.get_recipients(options["existing"]))
+                    rates = self.run(store, self.get_recipients(options["otps"]))
+
+                finally:
+                    transaction.set_rollback(True)
+
+            self.stdout.write(
+                f"{name:<22} {rates['issue']:>10.0f} {rates['verify']:>10.0f} "
+                f"{rates['consume']:>10.0f}"
+            )
+
+    @staticmethod
+    def get_recipients(count: int) -> list:
+        identifier = uuid.uuid4().hex[:8]
+        return [f"{identifier}-{index}@otp.example.com" for index in range(count)]
+
+    @staticmethod
+    def issue(store, recipients: list) -> None:
+        for recipient in recipients:
+            store.issue(OTPPurposes.RESET_PASSWORD, OTPChannels.EMAIL, recipient, "123456")
+
+    def run(self, store, recipients: list) -> dict:
+        """
+        Returns:
+            dict: The operations per second of every step.
+        """
+        rates = {}
+        purpose = OTPPurposes.RESET_PASSWORD
+
+        start = time.perf_counter()
+        self.issue(store, recipients)
+        rates["issue"] = len(recipients) / (time.perf_counter() - start)
+
+        for step, consume in (("verify", False), ("consume", True)):
+            start = time.perf_counter()
+
+            for recipient in recipients:
+                if not store.verify("123456", purpose, recipient, consume=consume):
+                    raise CommandError(f"{step} failed for {recipient}")
+
+            rates[step] = len(recipients) / (time.perf_counter() - start)
+
+        return rates
@@ -0,0 +1,83 @@
+import os
+import statistics
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+
+PASSWORD = "Benchmark-Password-1"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the password hashing profiles (PASSWORD_HASHER_CLASSES) with the costs of the "
+        "settings: time to hash and to verify a password, logins/sec per core and logins/sec "
+        "with several threads, which scales when the hasher releases the GIL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20, help="Hashes per measure")
+        parser.add_argument(
+            "--threads", type=int, default=os.cpu_count() or 1, help="Threads of the last measure"
+        )
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        threads = options["threads"]
+
+        self.stdout.write(f"cores: {os.cpu_count()}, preferred profile: {settings.PASSWORD_HASHER}")
+        self.stdout.write(
+            f"\n{'profile':<8} {'hash ms':>8} {'verify ms':>10} {'logins/s/core':>14} "
+            f"{f'logins/s x{threads}':>16}"
+        )
+
+        for name, hasher in settings.PASSWORD_HASHER_CLASSES.items():
+            # the concurrency limit would hide how the hasher scales with the threads
+            with override_settings(PASSWORD_HASHERS=[hasher], PASSWORD_HASHING_CONCURRENCY=0):
+                try:
+                    encoded = make_password(PASSWORD)
+
+                except ValueError as error:
+                    # e.g. argon2-cffi not installed
+                    self.stdout.write(f"{name:<8} skipped: {error}")
+                    continue
+
+                hash_times = self.measure(lambda: make_password(PASSWORD), iterations)
+                verify_times = self.measure(lambda: check_password(PASSWORD, encoded), iterations)
+
+                start = time.perf_counter()
+
+                with ThreadPoolExecutor(max_workers=threads) as executor:
+                    for _ in executor.map(
+                        lambda _: check_password(PASSWORD, encoded), range(iterations * threads)
+                    ):
+                        pass
+
+                threaded_rate = iterations * threads / (time.perf_counter() - start)
+
+            verify_ms = statistics.mean(verify_times) * 1000
+
+            self.stdout.write(
+                f"{name:<8} {statistics.mean(hash_times) * 1000:>8.1f} {verify_ms:>10.1f} "
+                f"{1000 / verify_ms:>14.1f} {threaded_rate:>16.1f}"
+            )
+
+    @staticmethod
+    def measure(func, iterations: int) -> list:
+        """
+        Returns:
+            list: The duration of every call in seconds.
+        """
+        durations = []
+
+        for _ in range(iterations):
+            start = time.perf_counter()
+            func()
+            durations.append(time.perf_counter() - start)
+
+        return durations
@@ -0,0 +1,137 @@
+import json
+import time
+import uuid
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django.utils import timezone
+
+from rest_framework.status import HTTP_200_OK
+
+from app import camel_case
+from app.enum_classes import APIMessages, TransactionStatuses, TransactionTypes
+from app.models import Transaction
+from app.serializers.transaction_serializers import TransactionDataSerializer
+from app.util_classes import APIResponses
+
+
+def build_transactions(count: int) -> list:
+    """Unsaved transactions, the benchmark does not need a database"""
+    now = timezone.now()
+
+    return [
+        Transaction(
+            id=uuid.uuid4(),
+            payable_amount=Decimal("10.50") + index,
+            payment_type=TransactionTypes.PAYMENT,
+            status=TransactionStatuses.SUCCESS,
+            created_at=now - timedelta(minutes=index),
+        )
+        for index in range(count)
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark rendering and parsing of camelCase API payloads: a page of transactions "
+        "rendered by djangorestframework_camel_case and by app.camel_case (json and orjson)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-size", type=int, default=100)
+        parser.add_argument("--iterations", type=int, default=500)
+
+    def handle(self, *args, **options):
+        from djangorestframework_camel_case.parser import CamelCaseJSONParser as LibraryParser
+        from djangorestframework_camel_case.render import CamelCaseJSONRenderer as LibraryRenderer
+
+        iterations = options["iterations"]
+        transactions = build_transactions(options["page_size"])
+        paginate_data = {"page": 1, "pageSize": options["page_size"], "totalPages": 1}
+
+        def page():
+            data = TransactionDataSerializer(transactions, many=True).data
+
+            return APIResponses.success_response(
+                message=APIMessages.SUCCESS,
+                status_code=HTTP_200_OK,
+                data=data,
+                paginate_data=paginate_data,
+            ).data
+
+        renderers = [("djangorestframework_camel_case", LibraryRenderer(), "json")]
+        renderers.append(("app.camel_case", camel_case.CamelCaseJSONRenderer(), "json"))
+
+        try:
+            import orjson  # noqa: F401
+
+            renderers.append(("app.camel_case", camel_case.CamelCaseJSONRenderer(), "orjson"))
+
+        except ImportError:
+            self.stdout.write("orjson is not installed, skipping the orjson encoder")
+
+        self.stdout.write(
+            f"rendering a page of {options['page_size']} transactions, {iterations} iterations"
+        )
+
+        serialize = self.time(page, iterations)
+        self.stdout.write(f"  serializing the page: {serialize * 1000:.3f} ms, then rendering it:")
+
+        data = page()
+        expected = None
+
+        for name, renderer, encoder in renderers:
+            with override_settings(API_JSON_ENCODER=encoder):
+                camel_case.get_json_dumps.cache_clear()
+
+                content = renderer.render(data)
+
+                if expected is None:
+                    expected = content
+
+                # the standard library encoder gives the same bytes, orjson the same document
+                elif content != expected and (
+                    encoder == "json" or json.loads(content) != json.loads(expected)
+                ):
+                    raise CommandError(f"{name} ({encoder}) renders a different payload")
+
+                elapsed = self.time(lambda: renderer.render(data), iterations)
+
+            self.stdout.write(
+                f"  {name:<32} {encoder:<7} {elapsed * 1000:>7.3f} ms/page "
+                f"{1 / elapsed:>8.0f} pages/s"
+            )
+
+        camel_case.get_json_dumps.cache_clear()
+
+        body = json.dumps({"data": [{"storyReference": "abc", "pageSize": 25}] * 100}).encode()
+
+        self.stdout.write("\nparsing a camelCase JSON body with 100 items")
+
+        for name, parser in (
+            ("djangorestframework_camel_case", LibraryParser()),
+            ("app.camel_case", camel_case.CamelCaseJSONParser()),
+        ):
+            elapsed = self.time(lambda: parser.parse(_Stream(body)), iterations)
+            self.stdout.write(f"  {name:<40} {elapsed * 1000:>7.3f} ms/body")
+
+    @staticmethod
+    def time(func, iterations: int) -> float:
+        """Average duration of a call in seconds"""
+        start = time.perf_counter()
+
+        for _ in range(iterations):
+            func()
+
+        return (time.perf_counter() - start) / iterations
+
+
+class _Stream:
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def read(self):
+        return self.content
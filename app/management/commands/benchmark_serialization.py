@@ -0,0 +1,118 @@
+import time
+import uuid
+
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from app.enum_classes import TransactionStatuses, TransactionTypes
+from app.models import CustomUser, Story, Transaction
+from app.serializers.story_serializers import StoryBriefDataSerializer, StoryBriefValuesSerializer
+from app.serializers.transaction_serializers import (
+    TransactionDataSerializer,
+    TransactionValuesSerializer,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the list serializers: rows/sec of the ModelSerializers and of the values_list() "
+        "fast path, on pages of stories and transactions. The rows are created in a transaction "
+        "that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-sizes", type=int, nargs="+", default=[25, 100, 1000])
+        parser.add_argument("--iterations", type=int, default=20)
+
+    def handle(self, *args, **options):
+        page_sizes = options["page_sizes"]
+
+        with transaction.atomic():
+            user = self.create_rows(max(page_sizes))
+
+            for name, queryset, model_serializer, values_serializer in (
+                (
+                    "stories",
+                    Story.objects.filter(owner=user),
+                    StoryBriefDataSerializer,
+                    StoryBriefValuesSerializer,
+                ),
+                (
+                    "transactions",
+                    Transaction.objects.filter(owner=user),
+                    TransactionDataSerializer,
+                    TransactionValuesSerializer,
+                ),
+            ):
+                self.stdout.write(f"{name} (query + serialization)")
+
+                for page_size in page_sizes:
+                    # a fresh slice per call, evaluated querysets cache their rows
+                    expected = model_serializer(queryset[:page_size], many=True).data
+
+                    if values_serializer.serialize(queryset[:page_size]) != expected:
+                        raise CommandError(f"{values_serializer.__name__} output differs")
+
+                    model_elapsed = self.time(
+                        lambda: model_serializer(queryset[:page_size], many=True).data,
+                        options["iterations"],
+                    )
+                    values_elapsed = self.time(
+                        lambda: values_serializer.serialize(queryset[:page_size]),
+                        options["iterations"],
+                    )
+
+                    self.stdout.write(
+                        f"  {page_size:>5} rows: ModelSerializer {page_size / model_elapsed:>9.0f} "
+                        f"rows/s, values_list {page_size / values_elapsed:>9.0f} rows/s "
+                        f"({model_elapsed / values_elapsed:.1f}x)"
+                    )
+
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def create_rows(count: int) -> CustomUser:
+        identifier = uuid.uuid4().hex
+
+        user = CustomUser.objects.create(
+            username=f"benchmark-{identifier}", email=f"{identifier}@benchmark.example.com"
+        )
+
+        stories = Story.objects.bulk_create(
+            Story(
+                owner=user,
+                title=f"Story {index}",
+                price=Decimal("9.99") + index,
+                usage_number=10,
+                file_type="PDF",
+                reference_number=f"{identifier[:8]}-{index}",
+            )
+            for index in range(count)
+        )
+
+        Transaction.objects.bulk_create(
+            Transaction(
+                owner=user,
+                story=stories[index],
+                email=user.email,
+                payable_amount=Decimal("9.99") + index,
+                payment_type=TransactionTypes.PAYMENT,
+                status=TransactionStatuses.SUCCESS,
+                reference=f"{identifier[:8]}{index}",
+            )
+            for index in range(count)
+        )
+
+        return user
+
+    @staticmethod
+    def time(func, iterations: int) -> float:
+        """Average duration of a call in seconds"""
+        start = time.perf_counter()
+
+        for _ in range(iterations):
+            func()
+
+        return (time.perf_counter() - start) / iterations
@@ -0,0 +1,203 @@
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# what a worker does when it boots: configure django, load the apps and import the url conf
+BOOT_SNIPPET = "import django; django.setup(); import {urlconf}"
+
+# boots the wsgi application the way gunicorn does and serves a single request
+FIRST_REQUEST_SNIPPET = """
+from wsgiref.util import setup_testing_defaults
+from django.core.wsgi import get_wsgi_application
+
+application = get_wsgi_application()
+environ = {{"PATH_INFO": {path!r}, "QUERY_STRING": {query!r}, "HTTP_HOST": {host!r}}}
+setup_testing_defaults(environ)
+statuses = []
+b"".join(application(environ, lambda status, headers, exc_info=None: statuses.append(status)))
+print(statuses[0])
+"""
+
+# modules whose import time is tracked individually for regressions
+TRACKED_MODULE_PREFIXES = ("app.", "UnlockIt.")
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the cold start cost of a worker process: boot time, time from process start to "
+        "the first request served, and the import time of every module (python -X importtime). "
+        "Compares the results with a baseline and fails on regressions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5, help="Number of fresh processes")
+        parser.add_argument("--top", type=int, default=15, help="Number of slow imports to list")
+        parser.add_argument(
+            "--path",
+            default="/api/v1/download/story-details/",
+            help="Path of the first request, should not need any database data",
+        )
+        parser.add_argument("--query", default="storyReference=cold-start")
+        parser.add_argument("--save-baseline", help="Write the results to this JSON file")
+        parser.add_argument("--baseline", help="Compare the results with this JSON file")
+        parser.add_argument(
+            "--max-regression",
+            type=float,
+            default=0.25,
+            help="Allowed slowdown compared with the baseline, as a fraction",
+        )
+        parser.add_argument(
+            "--min-regression-ms",
+            type=float,
+            default=10,
+            help="Slowdowns smaller than this are ignored, to absorb measurement noise",
+        )
+
+    def handle(self, *args, **options):
+        runs = options["runs"]
+        boot_snippet = BOOT_SNIPPET.format(urlconf=settings.ROOT_URLCONF)
+        first_request_snippet = FIRST_REQUEST_SNIPPET.format(
+            path=options["path"], query=options["query"], host=self.get_host()
+        )
+
+        boot = [self.time_process(boot_snippet) for _ in range(runs)]
+        first_request = [self.time_process(first_request_snippet) for _ in range(runs)]
+
+        imports = self.profile_imports(boot_snippet, runs)
+
+        # the fastest run is the least disturbed by other load on the machine
+        results = {
+            "boot_ms": min(boot) * 1000,
+            "first_request_ms": min(first_request) * 1000,
+            "total_import_ms": sum(self_us for self_us, _ in imports.values()) / 1000,
+            "modules_ms": {
+                module: cumulative_us / 1000
+                for module, (_, cumulative_us) in imports.items()
+                if module.startswith(TRACKED_MODULE_PREFIXES)
+            },
+        }
+
+        self.stdout.write(f"best of {runs} fresh processes (median in brackets)")
+        self.stdout.write(
+            f"  boot (django.setup + url conf): {results['boot_ms']:.0f} ms "
+            f"({statistics.median(boot) * 1000:.0f} ms)"
+        )
+        self.stdout.write(
+            f"  process start to first request: {results['first_request_ms']:.0f} ms "
+            f"({statistics.median(first_request) * 1000:.0f} ms)"
+        )
+        self.stdout.write(
+            f"  total import time: {results['total_import_ms']:.0f} ms in {len(imports)} modules"
+        )
+
+        self.stdout.write(f"\n{'self ms':>9} {'cumulative ms':>14}  module")
+
+        slowest = sorted(imports.items(), key=lambda item: item[1][0], reverse=True)
+
+        for module, (self_us, cumulative_us) in slowest[: options["top"]]:
+            self.stdout.write(f"{self_us / 1000:>9.1f} {cumulative_us / 1000:>14.1f}  {module}")
+
+        if options["save_baseline"]:
+            with open(options["save_baseline"], "w") as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+
+            self.stdout.write(f"\nbaseline written to {options['save_baseline']}")
+
+        if options["baseline"]:
+            with open(options["baseline"]) as f:
+                baseline = json.load(f)
+
+            regressions = self.find_regressions(
+                results, baseline, options["max_regression"], options["min_regression_ms"]
+            )
+
+            if regressions:
+                raise CommandError("cold start regressions:\n" + "\n".join(regressions))
+
+            self.stdout.write(self.style.SUCCESS("\nno cold start regressions"))
+
+    @staticmethod
+    def get_host() -> str:
+        for host in settings.ALLOWED_HOSTS:
+            if host and "*" not in host:
+                return host.lstrip(".")
+
+        return "localhost"
+
+    @staticmethod
+    def time_process(snippet: str) -> float:
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", snippet], check=True, capture_output=True, text=True
+        )
+        elapsed = time.perf_counter() - start
+
+        if result.stdout.startswith("5"):
+            raise CommandError(f"the first request failed with {result.stdout.strip()}")
+
+        return elapsed
+
+    @staticmethod
+    def profile_imports(snippet: str, runs: int) -> dict:
+        """
+        Run the snippet under ``python -X importtime`` and parse its report.
+
+        Returns:
+            dict: The lowest self and cumulative import times over the runs in microseconds,
+            keyed by module name.
+        """
+        imports = {}
+
+        for _ in range(runs):
+            result = subprocess.run(
+                [sys.executable, "-X", "importtime", "-c", snippet],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+
+            for line in result.stderr.splitlines():
+                if not line.startswith("import time:") or "[us]" in line:
+                    continue
+
+                self_us, cumulative_us, module = line[len("import time:") :].split("|")
+                timing = (int(self_us), int(cumulative_us))
+                module = module.strip()
+
+                imports[module] = min(imports.get(module, timing), timing)
+
+        return imports
+
+    @staticmethod
+    def find_regressions(results, baseline, max_regression, min_regression_ms) -> list:
+        """
+        Compare the results with the baseline.
+
+        Returns:
+            list: A description of every measurement that got slower than allowed.
+        """
+
+        def is_regression(current, previous):
+            return (
+                current > previous * (1 + max_regression) and current - previous > min_regression_ms
+            )
+
+        regressions = []
+
+        for key in ("boot_ms", "first_request_ms", "total_import_ms"):
+            if is_regression(results[key], baseline[key]):
+                regressions.append(f"  {key}: {baseline[key]:.0f} ms -> {results[key]:.0f} ms")
+
+        for module, current in results["modules_ms"].items():
+            previous = baseline["modules_ms"].get(module, 0)
+
+            if is_regression(current, previous):
+                regressions.append(f"  import {module}: {previous:.1f} ms -> {current:.1f} ms")
+
+        return regressions
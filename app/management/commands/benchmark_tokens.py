@@ -0,0 +1,71 @@
+import time
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from django.utils import timezone
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+from app.token_keys import TokenKeys
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the tokens/sec signed and verified with the keys of every algorithm of "
+        "app.token_keys (HS256 with SECRET_KEY, EdDSA and ES256), with temporary keys."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=2000, help="Tokens per measure")
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        payload = {
+            "user_id": "00000000-0000-0000-0000-000000000000",
+            "type": "access",
+            "exp": timezone.now() + timedelta(minutes=15),
+        }
+        profiles = {
+            "HS256": {},
+            "EdDSA": {"benchmark": self.get_pem(ed25519.Ed25519PrivateKey.generate())},
+            "ES256": {"benchmark": self.get_pem(ec.generate_private_key(ec.SECP256R1()))},
+        }
+
+        self.stdout.write(f"{'algorithm':<10} {'sign/s':>10} {'verify/s':>10} {'bytes':>6}")
+
+        for algorithm, keys in profiles.items():
+            with override_settings(JWT_SIGNING_KEYS=keys, JWT_ACTIVE_KEY_ID=None):
+                token = TokenKeys.encode(payload)
+
+                sign_rate = self.measure(lambda: TokenKeys.encode(payload), iterations)
+                verify_rate = self.measure(
+                    lambda: TokenKeys.decode(token, require=["exp"]), iterations
+                )
+
+            self.stdout.write(
+                f"{algorithm:<10} {sign_rate:>10.0f} {verify_rate:>10.0f} {len(token):>6}"
+            )
+
+    @staticmethod
+    def get_pem(private_key) -> str:
+        return private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption(),
+        ).decode()
+
+    @staticmethod
+    def measure(func, iterations: int) -> float:
+        """
+        Returns:
+            float: The calls per second.
+        """
+        start = time.perf_counter()
+
+        for _ in range(iterations):
+            func()
+
+        return iterations / (time.perf_counter() - start)
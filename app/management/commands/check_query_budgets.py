@@ -0,0 +1,203 @@
+import uuid
+
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from app.api_authentication import MyAPIAuthentication
+from app.benchmarks.stubs import StubHTTPServer
+from app.caching import StoryCache
+from app.enum_classes import AccountStatuses, TransactionStatuses, TransactionTypes
+from app.models import CustomUser, Story, Transaction
+from app.query_inspector import QueryBudgetExceeded, QueryInspector
+from app.services import ServiceRegistry
+
+
+PASSWORD = "Budget-Check-1"
+STRIPE_ACCOUNT_ID = "acct_budget"
+LOCAL_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+class Command(BaseCommand):
+    help = (
+        "Call the endpoints listed in QUERY_BUDGETS with seeded data and fail when one runs more "
+        "queries or writes (QUERY_WRITE_BUDGETS) than its budget, repeats a statement (N+1) or "
+        "runs a slow query. The rows are created in a transaction that is rolled back and Stripe "
+        "is replaced by a local stub."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows", type=int, default=30, help="Stories and transactions of the seeded user"
+        )
+
+    def handle(self, *args, **options):
+        account = {"id": STRIPE_ACCOUNT_ID, "object": "account", "charges_enabled": True}
+        routes = {
+            ("POST", "/v1/accounts"): (200, account),
+            ("GET", f"/v1/accounts/{STRIPE_ACCOUNT_ID}"): (200, account),
+        }
+        stripe = ServiceRegistry.get("stripe")
+        previous_api_base = stripe.api_base
+        failures = []
+
+        # the budgets are the ones of a deployment with a shared cache (REDIS_URL)
+        with StubHTTPServer(routes) as stub, override_settings(
+            CACHES=LOCAL_CACHES,
+            ALLOWED_HOSTS=["*"],
+            STATELESS_AUTH_ENABLED=True,
+            REFRESH_TOKEN_STORE="cache",
+        ), transaction.atomic():
+            stripe.api_base = stub.url
+            StoryCache._local.clear()
+
+            try:
+                user = self.create_rows(options["rows"])
+
+                for name, method, url, data, authenticated in self.get_scenarios(user):
+                    budget = settings.QUERY_BUDGETS[name]
+                    write_budget = settings.QUERY_WRITE_BUDGETS.get(name)
+                    client = Client()
+
+                    if authenticated:
+                        token, _ = MyAPIAuthentication.get_access_token(
+                            MyAPIAuthentication.get_claims(user)
+                        )
+                        client.defaults["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+
+                    with QueryInspector() as inspector:
+                        response = getattr(client, method)(
+                            url, data=data, content_type="application/json"
+                        )
+
+                    if response.status_code >= 400:
+                        raise CommandError(
+                            f"{name} returned {response.status_code}: {response.content[:500]}"
+                        )
+
+                    counts = f"{inspector.count:>3}/{budget}"
+
+                    if write_budget is not None:
+                        counts += f"  writes {inspector.writes}/{write_budget}"
+
+                    try:
+                        inspector.assert_budget(max_queries=budget, max_writes=write_budget)
+                        self.stdout.write(f"  ok    {name:<28} {counts}")
+
+                    except QueryBudgetExceeded as error:
+                        failures.append(name)
+                        self.stdout.write(f"  FAIL  {name:<28} {counts}")
+                        self.stdout.write(f"        {error}".replace("\n", "\n        "))
+
+                    if options["verbosity"] > 1:
+                        for query in inspector.queries:
+                            self.stdout.write(f"        {query.sql[:200]}")
+
+            finally:
+                stripe.api_base = previous_api_base
+                transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f"query budgets exceeded: {', '.join(failures)}")
+
+    @staticmethod
+    def get_scenarios(user: CustomUser) -> list:
+        """
+        The ``(budget name, method, url, data, authenticated)`` of every checked endpoint.
+        """
+        story = user.my_stories.first()
+        identifier = uuid.uuid4().hex[:8]
+
+        return [
+            (
+                "POST login-view",
+                "post",
+                reverse("login-view"),
+                {"email": user.email, "password": PASSWORD},
+                False,
+            ),
+            (
+                "POST token-refresh-view",
+                "post",
+                reverse("token-refresh-view"),
+                {"refreshToken": MyAPIAuthentication.get_auth_data(user)["refresh_token"]},
+                False,
+            ),
+            (
+                "POST sign-up-view",
+                "post",
+                reverse("sign-up-view"),
+                {
+                    "username": f"budget {identifier}",
+                    "email": f"{identifier}@budget.example.com",
+                    "password": PASSWORD,
+                    "referralCode": user.referral_code,
+                },
+                False,
+            ),
+            ("GET profile-view", "get", reverse("profile-view"), None, True),
+            ("GET story-views", "get", reverse("story-views"), None, True),
+            (
+                "GET single-story-views",
+                "get",
+                reverse("single-story-views", args=[story.id]),
+                None,
+                True,
+            ),
+            (
+                "GET get-story-details",
+                "get",
+                reverse("get-story-details"),
+                {"storyReference": f"share-{story.reference_number}"},
+                False,
+            ),
+            ("GET transaction-view", "get", reverse("transaction-view"), None, True),
+            ("GET referral-view", "get", reverse("referral-view"), None, True),
+        ]
+
+    @staticmethod
+    def create_rows(count: int) -> CustomUser:
+        identifier = uuid.uuid4().hex
+
+        user = CustomUser(
+            username=f"Budget {identifier}",
+            email=f"{identifier}@budget.example.com",
+            account_status=AccountStatuses.ACTIVE,
+            referral_code=identifier[:10],
+            customer_id=STRIPE_ACCOUNT_ID,
+            # in sync with the stub account, so the login is the happy path
+            stripe_setup_complete=True,
+        )
+        user.set_password(PASSWORD)
+        user.save()
+
+        stories = Story.objects.bulk_create(
+            Story(
+                owner=user,
+                title=f"Story {index}",
+                price=Decimal("9.99") + index,
+                usage_number=10,
+                file_type="PDF",
+                reference_number=f"RN-{identifier[:4]}{index:04d}",
+            )
+            for index in range(count)
+        )
+
+        Transaction.objects.bulk_create(
+            Transaction(
+                owner=user,
+                story=stories[index],
+                email=user.email,
+                payable_amount=Decimal("9.99") + index,
+                payment_type=TransactionTypes.PAYMENT,
+                status=TransactionStatuses.SUCCESS,
+                reference=f"{identifier[:8]}{index}",
+            )
+            for index in range(count)
+        )
+
+        return user
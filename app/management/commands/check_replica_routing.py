@@ -0,0 +1,166 @@
+import uuid
+
+from contextlib import nullcontext
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from app.api_authentication import MyAPIAuthentication
+from app.caching import StoryCache
+from app.db_router import RoutingState, routing_state
+from app.enum_classes import AccountStatuses, TransactionStatuses, TransactionTypes
+from app.models import CustomUser, Story, Transaction
+from app.query_inspector import QueryInspector
+
+
+REPLICA_ALIAS = "replica_check"
+LOCAL_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+class Command(BaseCommand):
+    help = (
+        "Check the read replica routing decisions. A second database alias connected to the "
+        "default database stands in for a replica, and the command checks on which alias the "
+        "queries of the endpoints and of the ORM run."
+    )
+
+    def handle(self, *args, **options):
+        failures = []
+
+        connections.settings[REPLICA_ALIAS] = connections.configure_settings(
+            {DEFAULT_DB_ALIAS: connections.settings[DEFAULT_DB_ALIAS]}
+        )[DEFAULT_DB_ALIAS]
+
+        user = self.create_rows()
+
+        try:
+            with override_settings(
+                DATABASE_REPLICAS=[REPLICA_ALIAS], CACHES=LOCAL_CACHES, ALLOWED_HOSTS=["*"]
+            ):
+                StoryCache._local.clear()
+
+                for name, expected, check in self.get_checks(user):
+                    with QueryInspector() as inspector:
+                        check()
+
+                    aliases = sorted({query.alias for query in inspector.queries})
+                    expected_aliases = [expected] if expected else []
+
+                    if aliases == expected_aliases:
+                        self.stdout.write(f"  ok    {name:<55} {expected or 'no query'}")
+                    else:
+                        failures.append(name)
+                        self.stdout.write(
+                            f"  FAIL  {name:<55} {', '.join(aliases) or 'no query'}, "
+                            f"expected {expected or 'no query'}"
+                        )
+
+        finally:
+            user.delete()
+            connections[REPLICA_ALIAS].close()
+            del connections[REPLICA_ALIAS]
+            del connections.settings[REPLICA_ALIAS]
+
+        if failures:
+            raise CommandError(f"wrong routing: {', '.join(failures)}")
+
+    @staticmethod
+    def get_checks(user: CustomUser) -> list:
+        """
+        The ``(name, expected alias, callable)`` of every check, the alias is None when the
+        check must not query the database.
+        """
+        token, _ = MyAPIAuthentication.get_access_token(MyAPIAuthentication.get_claims(user))
+        client = Client(HTTP_AUTHORIZATION=f"Bearer {token}")
+        story = user.my_stories.first()
+
+        def request(method, url_name, expected_status=200, **kwargs):
+            def call():
+                response = getattr(client, method)(reverse(url_name), **kwargs)
+
+                if response.status_code != expected_status:
+                    raise CommandError(f"{method} {url_name} returned {response.status_code}")
+
+            return call
+
+        def orm(*steps, atomic=False):
+            def call():
+                token = routing_state.set(RoutingState())
+                routing_state.get().use_replica = True
+
+                try:
+                    with transaction.atomic() if atomic else nullcontext():
+                        for step in steps:
+                            step()
+
+                finally:
+                    routing_state.reset(token)
+
+            return call
+
+        def read():
+            list(Story.objects.filter(owner=user))
+
+        def write():
+            Story.objects.filter(id=story.id).update(title=story.title)
+
+        def refill_sales_count():
+            # the post_save signal of a sale drops the count, a replica could be behind it
+            StoryCache.invalidate_transactions(story.id)
+            StoryCache.get_transactions_count(story.id)
+
+        story_details = request(
+            "get", "get-story-details", data={"storyReference": f"share-{story.reference_number}"}
+        )
+
+        return [
+            ("GET story-views, marked", REPLICA_ALIAS, request("get", "story-views")),
+            ("GET transaction-view, marked", REPLICA_ALIAS, request("get", "transaction-view")),
+            ("GET referral-view, marked", REPLICA_ALIAS, request("get", "referral-view")),
+            # the shared caches are filled from the primary, a cache hit does not query
+            ("GET get-story-details, marked, cache miss", DEFAULT_DB_ALIAS, story_details),
+            ("GET get-story-details, marked, cache hit", None, story_details),
+            ("sales count refill in a marked request", DEFAULT_DB_ALIAS, orm(refill_sales_count)),
+            ("GET profile-view, not marked", DEFAULT_DB_ALIAS, request("get", "profile-view")),
+            (
+                "POST story-views, marked but unsafe method",
+                DEFAULT_DB_ALIAS,
+                request("post", "story-views", expected_status=400, data={}),
+            ),
+            ("read outside a request", DEFAULT_DB_ALIAS, read),
+            ("read in a transaction of a marked request", DEFAULT_DB_ALIAS, orm(read, atomic=True)),
+            ("write then read in a marked request", DEFAULT_DB_ALIAS, orm(write, read)),
+        ]
+
+    @staticmethod
+    def create_rows() -> CustomUser:
+        identifier = uuid.uuid4().hex
+        user = CustomUser.objects.create(
+            username=f"Routing {identifier[:16]}",
+            email=f"{identifier}@routing.example.com",
+            account_status=AccountStatuses.ACTIVE,
+            referral_code=identifier[:10],
+            stripe_setup_complete=True,
+        )
+        story = Story.objects.create(
+            owner=user,
+            title="Routing",
+            price=Decimal("9.99"),
+            usage_number=10,
+            file_type="PDF",
+            reference_number=f"RN-{identifier[:8]}",
+        )
+        Transaction.objects.create(
+            owner=user,
+            story=story,
+            email=user.email,
+            payable_amount=story.price,
+            payment_type=TransactionTypes.PAYMENT,
+            status=TransactionStatuses.SUCCESS,
+            reference=identifier[:12],
+        )
+
+        return user
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the OpenAPI document once and write it to API_SCHEMA_FILE (or --output), "
+        "the docs then serve it as is instead of introspecting the views in every worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default=None,
+            help="Path of the document, .json or .yaml, defaults to API_SCHEMA_FILE",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.SHOW_DOCS:
+            self.stdout.write("SHOW_DOCS is off, no schema to generate")
+            return
+
+        output = options["output"] or settings.API_SCHEMA_FILE
+
+        if not output:
+            raise CommandError("set API_SCHEMA_FILE or pass --output")
+
+        from drf_yasg.renderers import OpenAPIRenderer, SwaggerYAMLRenderer
+
+        from UnlockIt.docs_generator import APISchemaCache
+
+        if output.endswith((".yaml", ".yml")):
+            renderer = SwaggerYAMLRenderer()
+
+        else:
+            renderer = OpenAPIRenderer()
+
+        content = renderer.render(APISchemaCache.get_schema())
+
+        with open(output, "wb") as f:
+            f.write(content)
+
+        self.stdout.write(self.style.SUCCESS(f"OpenAPI schema written to {output}"))
@@ -0,0 +1,150 @@
+import time
+
+from datetime import timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils.dateparse import parse_datetime
+
+from app.benchmarks.generator import DEFAULT_EPOCH, DataGenerator, GENERATED_PASSWORD
+from app.benchmarks.generator import parse_weights
+from app.enum_classes import OTPStatuses, TransactionStatuses
+from app.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic users, stories, transactions, OTPs and referrals at production scale "
+        "for performance testing. Rows are written in large batches with bulk_create, or with "
+        "COPY on PostgreSQL, and the same seed and epoch always generate the same rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--users", type=int, default=10000)
+        parser.add_argument(
+            "--creator-rate", type=float, default=0.2, help="Fraction of users publishing stories"
+        )
+        parser.add_argument(
+            "--stories-alpha",
+            type=float,
+            default=1.2,
+            help="Pareto shape of the stories per creator, lower is a heavier tail",
+        )
+        parser.add_argument("--max-stories-per-user", type=int, default=500)
+        parser.add_argument(
+            "--transactions-alpha",
+            type=float,
+            default=1.5,
+            help="Pareto shape of the transactions per story, lower is a heavier tail",
+        )
+        parser.add_argument("--max-transactions-per-story", type=int, default=1000)
+        parser.add_argument(
+            "--status-mix",
+            default="success=80,pending=12,failed=8",
+            help="Weights of the transaction statuses",
+        )
+        parser.add_argument("--otps-per-user", type=int, default=2)
+        parser.add_argument(
+            "--otp-status-mix",
+            default="used=60,expired=30,active=10",
+            help="Weights of the OTP statuses",
+        )
+        parser.add_argument(
+            "--referral-rate",
+            type=float,
+            default=0.3,
+            help="Fraction of users that signed up with a referral code",
+        )
+        parser.add_argument(
+            "--epoch",
+            default=DEFAULT_EPOCH.isoformat(),
+            help="Time of the newest rows (ISO 8601, UTC without an offset), a recent time "
+            "makes the rows look current",
+        )
+        parser.add_argument(
+            "--span-days",
+            type=int,
+            default=365,
+            help="The rows are created over the days before the epoch",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--method",
+            choices=["auto", "bulk", "copy"],
+            default="auto",
+            help="bulk_create, or COPY (PostgreSQL only), auto uses COPY on PostgreSQL",
+        )
+        parser.add_argument(
+            "--replace",
+            action="store_true",
+            help="Delete the rows generated before with the same seed first",
+        )
+
+    def handle(self, *args, **options):
+        is_postgresql = connection.vendor == "postgresql"
+
+        if options["method"] == "copy" and not is_postgresql:
+            raise CommandError("COPY is only supported on PostgreSQL, use --method bulk")
+
+        try:
+            status_weights = parse_weights(options["status_mix"], TransactionStatuses)
+            otp_status_weights = parse_weights(options["otp_status_mix"], OTPStatuses)
+
+        except ValueError as error:
+            raise CommandError(error)
+
+        epoch = parse_datetime(options["epoch"])
+
+        if epoch is None:
+            raise CommandError(f"--epoch {options['epoch']!r} is not an ISO 8601 date and time")
+
+        if epoch.tzinfo is None:
+            epoch = epoch.replace(tzinfo=timezone.utc)
+
+        generator = DataGenerator(
+            seed=options["seed"],
+            users=options["users"],
+            creator_rate=options["creator_rate"],
+            stories_alpha=options["stories_alpha"],
+            max_stories_per_user=options["max_stories_per_user"],
+            transactions_alpha=options["transactions_alpha"],
+            max_transactions_per_story=options["max_transactions_per_story"],
+            status_weights=status_weights,
+            otps_per_user=options["otps_per_user"],
+            otp_status_weights=otp_status_weights,
+            referral_rate=options["referral_rate"],
+            epoch=epoch,
+            span_days=options["span_days"],
+            batch_size=options["batch_size"],
+            use_copy=options["method"] == "copy" or (options["method"] == "auto" and is_postgresql),
+        )
+
+        start = time.perf_counter()
+
+        with transaction.atomic():
+            if options["replace"]:
+                deleted = generator.delete()
+                self.stdout.write(f"deleted {deleted} rows generated before with this seed")
+
+            elif CustomUser.objects.filter(email__endswith=f"@{generator.email_domain}").exists():
+                raise CommandError(
+                    f"rows were generated with the seed {options['seed']} before, use --replace "
+                    "or another seed"
+                )
+
+            counts = generator.generate()
+
+        elapsed = time.perf_counter() - start
+        rows = sum(count for kind, count in counts.items() if kind != "referrals")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"generated {counts['users']} users, {counts['stories']} stories, "
+                f"{counts['transactions']} transactions, {counts['otps']} OTPs and "
+                f"{counts['referrals']} referrals in {elapsed:.1f} s ({rows / elapsed:.0f} rows/s)"
+            )
+        )
+        self.stdout.write(
+            f"users are user-<n>@{generator.email_domain} with the password {GENERATED_PASSWORD}"
+        )
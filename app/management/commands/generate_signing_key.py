@@ -0,0 +1,35 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a signing key of the authentication tokens and print its JWT_SIGNING_KEYS "
+        "entry. To rotate: add it to JWT_SIGNING_KEYS, wait JWKS_MAX_AGE for the other services "
+        "to see it, set JWT_ACTIVE_KEY_ID to it, and remove the previous key once its tokens "
+        "have expired (REFRESH_TOKEN_LIFETIME_DAYS)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--algorithm", choices=["EdDSA", "ES256"], default="EdDSA")
+        parser.add_argument("--kid", default=None, help="Key id, the date by default")
+
+    def handle(self, *args, **options):
+        if options["algorithm"] == "EdDSA":
+            private_key = ed25519.Ed25519PrivateKey.generate()
+        else:
+            private_key = ec.generate_private_key(ec.SECP256R1())
+
+        pem = private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption(),
+        ).decode()
+        kid = options["kid"] or timezone.now().strftime("%Y-%m-%d")
+
+        self.stdout.write(json.dumps({kid: pem}))
@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.maintenance import MaintenanceTasks
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the expired OTPs and used refresh tokens and archive the abandoned checkouts "
+        "(pending payments older than PENDING_TRANSACTION_RETENTION_HOURS), in batches. "
+        "Schedule it, e.g. hourly, or run it with --interval as a long running process."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=None, help="Rows per batch (MAINTENANCE_BATCH_SIZE)"
+        )
+        parser.add_argument(
+            "--max-batches", type=int, default=None, help="Batches per purge and run, all if unset"
+        )
+        parser.add_argument(
+            "--pause", type=float, default=0.1, help="Seconds to wait between two batches"
+        )
+        parser.add_argument(
+            "--interval", type=int, default=None, help="Run again every INTERVAL seconds"
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Only count the rows that would be purged"
+        )
+
+    def handle(self, *args, **options):
+        if options["dry_run"]:
+            self.stdout.write(f"expired OTPs: {MaintenanceTasks.get_expired_otps().count()}")
+            self.stdout.write(
+                "expired refresh tokens: "
+                f"{MaintenanceTasks.get_expired_refresh_tokens().count()}"
+            )
+            self.stdout.write(
+                "abandoned transactions: "
+                f"{MaintenanceTasks.get_abandoned_transactions().count()}"
+            )
+            return
+
+        while True:
+            results = MaintenanceTasks.run_all(
+                batch_size=options["batch_size"],
+                max_batches=options["max_batches"],
+                pause=options["pause"],
+            )
+
+            self.stdout.write(f"{'rows':<24} {'purged':>8} {'batches':>8} {'s':>8} {'rows/s':>8}")
+
+            for result in results:
+                self.stdout.write(
+                    f"{result.name:<24} {result.rows:>8} {result.batches:>8} "
+                    f"{result.duration:>8.2f} {result.rows_per_second:>8.0f}"
+                )
+
+            if options["interval"] is None:
+                break
+
+            time.sleep(options["interval"])
@@ -0,0 +1,358 @@
+"""
+Request level performance metrics, exported in the Prometheus text format.
+
+Every request records its latency, status and response size. A sample of the requests
+(METRICS_SAMPLE_RATE) also records its SQL queries and the time spent calling upstreams
+(Stripe, Google, Facebook, Firebase, SMTP, S3). The metrics are kept per process, so every
+worker is scraped on its own.
+"""
+
+import random
+import threading
+import time
+
+from bisect import bisect_left
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+
+class LatencyHistogram:
+    """
+    Thread-safe cumulative latency histogram for a single upstream.
+
+    The bucket bounds are in seconds and follow the Prometheus convention, so the
+    counts can be exported directly as ``le`` buckets.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        """
+        Record a single observation.
+
+        Args:
+            seconds (float): The observed latency in seconds.
+        """
+        index = bisect_left(self.buckets, seconds)
+
+        with self._lock:
+            self.counts[index] += 1
+            self.total += seconds
+            self.count += 1
+
+    def snapshot(self) -> dict:
+        """
+        Return a consistent copy of the histogram.
+
+        Returns:
+            dict: The cumulative bucket counts keyed by upper bound, the sum and the count.
+        """
+        with self._lock:
+            counts = list(self.counts)
+            total = self.total
+            count = self.count
+
+        cumulative = {}
+        running = 0
+
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            running += bucket_count
+            cumulative[bound] = running
+
+        return {"buckets": cumulative, "sum": total, "count": count}
+
+
+class MetricsRegistry:
+    """
+    Counters and histograms of this process, keyed by metric name and labels.
+    """
+
+    DESCRIPTIONS = {
+        "http_requests_total": ("counter", "Requests served"),
+        "http_request_duration_seconds": ("histogram", "Time to serve a request"),
+        "http_response_size_bytes": ("histogram", "Size of the response body"),
+        "http_sampled_requests_total": ("counter", "Requests whose queries and calls are traced"),
+        "http_request_db_queries": ("histogram", "SQL queries per sampled request"),
+        "http_request_db_duration_seconds": ("histogram", "SQL time per sampled request"),
+        "http_request_upstream_duration_seconds": (
+            "histogram",
+            "Time spent calling an upstream per sampled request",
+        ),
+        "upstream_call_duration_seconds": (
+            "histogram",
+            "Duration of the calls to an upstream outside the pooled HTTP client",
+        ),
+    }
+
+    QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+    SIZE_BUCKETS = (100, 1000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+    _counters: dict = {}
+    _histograms: dict = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def inc(cls, name: str, labels: tuple = (), value: float = 1) -> None:
+        key = (name, labels)
+
+        with cls._lock:
+            cls._counters[key] = cls._counters.get(key, 0) + value
+
+    @classmethod
+    def observe(cls, name: str, labels: tuple, value: float, buckets=None) -> None:
+        key = (name, labels)
+        histogram = cls._histograms.get(key)
+
+        if histogram is None:
+            with cls._lock:
+                histogram = cls._histograms.setdefault(
+                    key, LatencyHistogram(buckets or settings.METRICS_LATENCY_BUCKETS)
+                )
+
+        histogram.observe(value)
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._counters = {}
+            cls._histograms = {}
+
+    @staticmethod
+    def format_labels(labels: tuple, extra: tuple = ()) -> str:
+        labels = labels + extra
+
+        if not labels:
+            return ""
+
+        def escape(value) -> str:
+            return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+        return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in labels) + "}"
+
+    @staticmethod
+    def format_value(value) -> str:
+        if value == float("inf"):
+            return "+Inf"
+
+        return repr(float(value)) if isinstance(value, float) else str(value)
+
+    @classmethod
+    def render(cls) -> str:
+        """
+        Return every metric in the Prometheus text exposition format (version 0.0.4).
+        """
+        from app.http_client import OutboundHTTPClient
+
+        with cls._lock:
+            counters = dict(cls._counters)
+            histograms = dict(cls._histograms)
+
+        # the pooled HTTP client keeps its own per upstream latency histograms
+        for upstream, snapshot in OutboundHTTPClient.get_latency_histograms().items():
+            histograms[
+                ("outbound_http_request_duration_seconds", (("upstream", upstream),))
+            ] = snapshot
+
+        descriptions = dict(cls.DESCRIPTIONS)
+        descriptions["outbound_http_request_duration_seconds"] = (
+            "histogram",
+            "Latency of the pooled HTTP client calls",
+        )
+
+        lines = []
+
+        for name in sorted({name for name, _ in counters} | {name for name, _ in histograms}):
+            metric_type, description = descriptions.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {metric_type}")
+
+            for (metric_name, labels), value in sorted(counters.items()):
+                if metric_name == name:
+                    lines.append(f"{name}{cls.format_labels(labels)} {cls.format_value(value)}")
+
+            for (metric_name, labels), histogram in sorted(
+                histograms.items(), key=lambda item: item[0]
+            ):
+                if metric_name != name:
+                    continue
+
+                snapshot = histogram if isinstance(histogram, dict) else histogram.snapshot()
+
+                for bound, count in snapshot["buckets"].items():
+                    le = (("le", cls.format_value(bound)),)
+                    lines.append(f"{name}_bucket{cls.format_labels(labels, le)} {count}")
+
+                lines.append(f"{name}_sum{cls.format_labels(labels)} {snapshot['sum']!r}")
+                lines.append(f"{name}_count{cls.format_labels(labels)} {snapshot['count']}")
+
+        return "\n".join(lines) + "\n"
+
+
+class RequestMetrics:
+    """
+    Queries and upstream calls of the sampled request being served.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.upstream_seconds = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        """Database execute wrapper, see django.db.connection.execute_wrapper"""
+        start = time.perf_counter()
+
+        try:
+            return execute(sql, params, many, context)
+
+        finally:
+            self.queries += 1
+            self.query_seconds += time.perf_counter() - start
+
+    def add_upstream_time(self, upstream: str, seconds: float) -> None:
+        self.upstream_seconds[upstream] = self.upstream_seconds.get(upstream, 0) + seconds
+
+
+_current_request: ContextVar[RequestMetrics | None] = ContextVar("request_metrics", default=None)
+
+
+def add_upstream_time(upstream: str, seconds: float) -> None:
+    """
+    Add the duration of a call to an upstream to the sampled request, if any.
+
+    The pooled HTTP client calls this alone, its calls already have their own histogram
+    (outbound_http_request_duration_seconds).
+
+    Args:
+        upstream (str): The name of the upstream, e.g. "stripe" or "smtp".
+        seconds (float): The duration of the call.
+    """
+    request_metrics = _current_request.get()
+
+    if request_metrics is not None:
+        request_metrics.add_upstream_time(upstream, seconds)
+
+
+def record_upstream_call(upstream: str, seconds: float) -> None:
+    """
+    Record the duration of a call to an upstream, and add it to the sampled request if any.
+
+    Args:
+        upstream (str): The name of the upstream, e.g. "smtp" or "s3".
+        seconds (float): The duration of the call.
+    """
+    if not settings.METRICS_ENABLED:
+        return
+
+    MetricsRegistry.observe("upstream_call_duration_seconds", (("upstream", upstream),), seconds)
+    add_upstream_time(upstream, seconds)
+
+
+@contextmanager
+def track_upstream(upstream: str):
+    """
+    Time the calls made to an upstream that do not go through the pooled HTTP client.
+
+    Usage:
+        with track_upstream("smtp"):
+            server.sendmail(...)
+    """
+    start = time.perf_counter()
+
+    try:
+        yield
+
+    finally:
+        record_upstream_call(upstream, time.perf_counter() - start)
+
+
+class RequestMetricsMiddleware:
+    """
+    Record the latency, status and response size of every request, and the SQL queries and
+    upstream calls of a sample of them. Should be the first middleware after
+    CorrelationIdMiddleware, so it times every other middleware and its logs carry the id.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        sampled = random.random() < settings.METRICS_SAMPLE_RATE
+        start = time.perf_counter()
+
+        if sampled:
+            request_metrics = RequestMetrics()
+            token = _current_request.set(request_metrics)
+
+            try:
+                with ExitStack() as stack:
+                    for connection in connections.all():
+                        stack.enter_context(connection.execute_wrapper(request_metrics))
+
+                    response = self.get_response(request)
+
+            finally:
+                _current_request.reset(token)
+
+        else:
+            response = self.get_response(request)
+
+        duration = time.perf_counter() - start
+
+        endpoint = self.get_endpoint(request)
+        labels = (("method", request.method), ("endpoint", endpoint))
+
+        MetricsRegistry.inc("http_requests_total", labels + (("status", response.status_code),))
+        MetricsRegistry.observe("http_request_duration_seconds", labels, duration)
+
+        if not response.streaming:
+            MetricsRegistry.observe(
+                "http_response_size_bytes",
+                labels,
+                len(response.content),
+                buckets=MetricsRegistry.SIZE_BUCKETS,
+            )
+
+        if sampled:
+            MetricsRegistry.inc("http_sampled_requests_total", labels)
+            MetricsRegistry.observe(
+                "http_request_db_queries",
+                labels,
+                request_metrics.queries,
+                buckets=MetricsRegistry.QUERY_BUCKETS,
+            )
+            MetricsRegistry.observe(
+                "http_request_db_duration_seconds", labels, request_metrics.query_seconds
+            )
+
+            for upstream, seconds in request_metrics.upstream_seconds.items():
+                MetricsRegistry.observe(
+                    "http_request_upstream_duration_seconds",
+                    labels + (("upstream", upstream),),
+                    seconds,
+                )
+
+        return response
+
+    @staticmethod
+    def get_endpoint(request) -> str:
+        """
+        Return the url pattern of the request, so the label values stay few.
+        """
+        resolver_match = getattr(request, "resolver_match", None)
+
+        if resolver_match is None:
+            return "unmatched"
+
+        return resolver_match.route or resolver_match.view_name
@@ -1,4 +1,6 @@
 import logging
+import re
+import uuid
 
 import traceback
 
@@ -7,6 +9,8 @@ from django.http import JsonResponse
 
 from rest_framework.status import HTTP_500_INTERNAL_SERVER_ERROR
 
+from app.structured_logging import correlation_id
+
 
 logger = logging.getLogger("server_error")
 
@@ -59,3 +63,35 @@ class Log500ErrorsMiddleware:
             },
             status=HTTP_500_INTERNAL_SERVER_ERROR,
         )
+
+
+class CorrelationIdMiddleware:
+    """
+    Give every request a correlation id, added to its log records and returned in the
+    X-Request-ID header. The id sent by the load balancer or the client is reused when valid.
+    """
+
+    HEADER = "X-Request-ID"
+    VALID_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_id = request.headers.get(self.HEADER, "")
+
+        if not self.VALID_ID.match(request_id):
+            request_id = uuid.uuid4().hex
+
+        request.correlation_id = request_id
+        token = correlation_id.set(request_id)
+
+        try:
+            response = self.get_response(request)
+
+        finally:
+            correlation_id.reset(token)
+
+        response[self.HEADER] = request_id
+
+        return response
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.2 on 2026-10-19 11:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0013_alter_customuser_profile_picture"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="story",
+            name="reference_number",
+            field=models.CharField(blank=True, db_index=True, max_length=1024, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.1.2 on 2026-10-19 12:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0014_story_reference_number_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="otp",
+            index=models.Index(
+                fields=["recipient", "purpose", "status", "-created_at"],
+                name="otp_recipient_purpose_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="otp",
+            index=models.Index(fields=["expire_at"], name="otp_expire_at_idx"),
+        ),
+    ]
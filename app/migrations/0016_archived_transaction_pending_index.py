@@ -0,0 +1,60 @@
+# Generated by Django 4.1.2 on 2026-10-19 12:26
+
+import django.core.serializers.json
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0015_otp_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedTransaction",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        db_index=True,
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        unique=True,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("last_edited_at", models.DateTimeField(auto_now=True)),
+                ("transaction_id", models.UUIDField(db_index=True)),
+                ("reference", models.CharField(db_index=True, max_length=1024)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("Pending", "Pending"),
+                            ("Success", "Success"),
+                            ("Failed", "Failed"),
+                            ("In Progress", "In Progress"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                ("transaction_created_at", models.DateTimeField()),
+                ("data", models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+            ],
+            options={
+                "ordering": ["-created_at"],
+                "abstract": False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                condition=models.Q(("status", "Pending")),
+                fields=["last_edited_at"],
+                name="transaction_pending_idx",
+            ),
+        ),
+    ]
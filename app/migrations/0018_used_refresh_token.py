@@ -0,0 +1,41 @@
+# Generated by Django 4.1.2 on 2026-10-19 13:05
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0017_customuser_token_version"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UsedRefreshToken",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        db_index=True,
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        unique=True,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("last_edited_at", models.DateTimeField(auto_now=True)),
+                ("jti", models.CharField(max_length=32, unique=True)),
+                ("expire_at", models.DateTimeField()),
+            ],
+            options={
+                "ordering": ["-created_at"],
+                "abstract": False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name="usedrefreshtoken",
+            index=models.Index(fields=["expire_at"], name="used_refresh_expire_at_idx"),
+        ),
+    ]
@@ -1,5 +1,7 @@
+import logging
 import uuid
 
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 
@@ -14,6 +16,9 @@ from app.enum_classes import (
 )
 
 
+logger = logging.getLogger(__name__)
+
+
 class BaseModelClass(models.Model):
     id = models.UUIDField(
         primary_key=True, unique=True, default=uuid.uuid4, editable=False, db_index=True
@@ -45,6 +50,10 @@ class CustomUser(AbstractUser, BaseModelClass):
 
     login_attempts = models.PositiveIntegerField(default=0)
 
+    # in the claims of the tokens, incremented to revoke every token of the user, see
+    # app.api_authentication.TokenRevocations
+    token_version = models.PositiveIntegerField(default=0)
+
     profile_picture = models.FileField(upload_to="profile_pictures/", null=True, blank=True)
 
     referral_code = models.CharField(max_length=1024, null=True, blank=True)
@@ -78,7 +87,7 @@ class CustomUser(AbstractUser, BaseModelClass):
             .aggregate(total_amount=models.Sum("amount"))
         )
 
-        print(debit_transactions)
+        logger.debug("Debit transactions of user %s: %s", self.id, debit_transactions)
 
         credit_transactions = (
             self.transactions.filter(payment_type=TransactionTypes.PAYMENT)
@@ -86,7 +95,7 @@ class CustomUser(AbstractUser, BaseModelClass):
             .aggregate(total_amount=models.Sum("amount"))
         )
 
-        print(credit_transactions)
+        logger.debug("Credit transactions of user %s: %s", self.id, credit_transactions)
 
 
 class OTP(BaseModelClass):
@@ -98,6 +107,16 @@ class OTP(BaseModelClass):
     expire_at = models.DateTimeField(null=True, blank=True)
     verified = models.BooleanField(default=False)
 
+    class Meta(BaseModelClass.Meta):
+        indexes = [
+            # the active OTP of a recipient, see app.otp_store.DatabaseOTPStore
+            models.Index(
+                fields=["recipient", "purpose", "status", "-created_at"],
+                name="otp_recipient_purpose_idx",
+            ),
+            models.Index(fields=["expire_at"], name="otp_expire_at_idx"),
+        ]
+
     def __str__(self):
         return str(self.purpose)
 
@@ -112,16 +131,20 @@ class Story(BaseModelClass):
     usage_number = models.PositiveIntegerField(default=0)
     used_number = models.PositiveIntegerField(default=0)
     file_type = models.CharField(max_length=20, null=True, blank=True)
-    reference_number = models.CharField(max_length=1024, null=True, blank=True)
+    reference_number = models.CharField(max_length=1024, null=True, blank=True, db_index=True)
 
     @property
     def can_still_download(self):
         """
         A property that checks if the user can still download based on their story transactions and usage number.
         """
-        story_transactions: int = self.story_transactions.filter(
-            status=TransactionStatuses.SUCCESS
-        ).count()
+        # annotated when the story is loaded through app.caching.StoryCache
+        story_transactions: int | None = getattr(self, "successful_transactions_count", None)
+
+        if story_transactions is None:
+            story_transactions = self.story_transactions.filter(
+                status=TransactionStatuses.SUCCESS
+            ).count()
 
         if story_transactions >= self.usage_number:
             return False
@@ -162,6 +185,48 @@ class Transaction(BaseModelClass):
     withdraw_account_name = models.CharField(max_length=1024, null=True, blank=True)
     withdraw_bank_name = models.CharField(max_length=1024, null=True, blank=True)
 
+    class Meta(BaseModelClass.Meta):
+        indexes = [
+            # the abandoned checkouts, see app.maintenance
+            models.Index(
+                fields=["last_edited_at"],
+                condition=models.Q(status=TransactionStatuses.PENDING),
+                name="transaction_pending_idx",
+            ),
+        ]
+
+
+class ArchivedTransaction(BaseModelClass):
+    """
+    A transaction removed from the Transaction table by app.maintenance, e.g. an abandoned
+    checkout. ``data`` holds every column of the original row.
+    """
+
+    transaction_id = models.UUIDField(db_index=True)
+    reference = models.CharField(max_length=1024, db_index=True)
+    status = models.CharField(max_length=50, choices=TransactionStatuses.choices)
+    transaction_created_at = models.DateTimeField()
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+
+    def __str__(self):
+        return str(self.reference)
+
+
+class UsedRefreshToken(BaseModelClass):
+    """
+    A refresh token exchanged for new tokens, kept until it expires so it cannot be used twice
+    (REFRESH_TOKEN_STORE "database", see app.api_authentication.TokenRevocations).
+    """
+
+    jti = models.CharField(max_length=32, unique=True)
+    expire_at = models.DateTimeField()
+
+    class Meta(BaseModelClass.Meta):
+        indexes = [models.Index(fields=["expire_at"], name="used_refresh_expire_at_idx")]
+
+    def __str__(self):
+        return str(self.jti)
+
 
 class Referral(BaseModelClass):
     referred_by = models.ForeignKey(
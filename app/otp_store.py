@@ -0,0 +1,191 @@
+"""
+Storage of the one-time passwords (OTP_STORE setting):
+
+- CacheOTPStore keeps them in the shared cache (Redis) with a native TTL, nothing to clean up,
+- DatabaseOTPStore keeps them in the OTP table, the fallback when there is no shared cache.
+
+A recipient has at most one active OTP per purpose, issuing a new one replaces it. Consuming an
+OTP is atomic, two concurrent requests cannot both use the same code.
+
+Usage:
+    store = ServiceRegistry.get("otp_store")
+    store.issue(purpose, channel, recipient, code)
+    store.verify(code, purpose, recipient, consume=True)
+"""
+
+import hashlib
+import hmac
+import time
+import uuid
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from app.enum_classes import OTPStatuses
+from app.models import OTP
+
+
+def codes_match(expected: str, code: str) -> bool:
+    # constant time, the codes are encoded as compare_digest only takes ASCII strings
+    return hmac.compare_digest(expected.encode(), code.encode())
+
+
+class CacheOTPStore:
+    KEY_PREFIX = "otp"
+
+    @classmethod
+    def get_key(cls, purpose: str, recipient: str) -> str:
+        # cache keys cannot contain spaces or control characters
+        digest = hashlib.sha256(f"{purpose}:{recipient}".encode()).hexdigest()
+        return f"{cls.KEY_PREFIX}:{digest}"
+
+    def can_issue(self, purpose: str, recipient: str) -> bool:
+        """
+        Return False while the last OTP of the recipient is younger than
+        OTP_GENERATE_TIME_LAPSE_MINUTES.
+        """
+        return cache.get(f"{self.get_key(purpose, recipient)}:throttle") is None
+
+    def issue(self, purpose: str, channel: str, recipient: str, code: str) -> None:
+        key = self.get_key(purpose, recipient)
+        timeout = settings.OTP_EXPIRATION_MINUTES * 60
+
+        entry = {
+            # consuming is recorded per issued OTP, see verify
+            "id": uuid.uuid4().hex,
+            "code": code,
+            "channel": channel,
+            "verified": False,
+            "expire_at": time.time() + timeout,
+        }
+
+        cache.set(key, entry, timeout=timeout)
+        cache.set(f"{key}:throttle", 1, timeout=settings.OTP_GENERATE_TIME_LAPSE_MINUTES * 60)
+
+    def verify(self, code: str, purpose: str, recipient: str, consume: bool = False) -> bool:
+        """
+        Check the code and mark the OTP as verified, or consume it.
+
+        Args:
+            code (str): The code sent to the recipient.
+            purpose (str): The purpose of the OTP.
+            recipient (str): The recipient of the OTP.
+            consume (bool): Use the OTP, it cannot be verified again.
+
+        Returns:
+            bool: True if the code is the one of the active OTP.
+        """
+        key = self.get_key(purpose, recipient)
+        entry = cache.get(key)
+
+        if entry is None or not codes_match(entry["code"], code):
+            return False
+
+        remaining = entry["expire_at"] - time.time()
+
+        if remaining <= 0:
+            return False
+
+        if consume:
+            # add() only sets a missing key (SET NX on Redis), a single request consumes the OTP
+            if not cache.add(f"{key}:used:{entry['id']}", 1, timeout=remaining):
+                return False
+
+            cache.delete(key)
+            return True
+
+        entry["verified"] = True
+        cache.set(key, entry, timeout=remaining)
+
+        return True
+
+    def is_verified(self, code: str, purpose: str, recipient: str) -> bool:
+        entry = cache.get(self.get_key(purpose, recipient))
+
+        if entry is None or not codes_match(entry["code"], code):
+            return False
+
+        return entry["verified"] and entry["expire_at"] > time.time()
+
+
+class DatabaseOTPStore:
+    @staticmethod
+    def get_active(purpose: str, recipient: str) -> OTP | None:
+        # served by the otp_recipient_purpose_idx index
+        return (
+            OTP.objects.filter(recipient=recipient, purpose=purpose, status=OTPStatuses.ACTIVE)
+            .order_by("-created_at")
+            .first()
+        )
+
+    def can_issue(self, purpose: str, recipient: str) -> bool:
+        """
+        Return False while the last OTP of the recipient is younger than
+        OTP_GENERATE_TIME_LAPSE_MINUTES.
+        """
+        lapse_start = timezone.now() - timedelta(minutes=settings.OTP_GENERATE_TIME_LAPSE_MINUTES)
+
+        return not OTP.objects.filter(
+            recipient=recipient, purpose=purpose, created_at__gt=lapse_start
+        ).exists()
+
+    def issue(self, purpose: str, channel: str, recipient: str, code: str) -> None:
+        with transaction.atomic():
+            OTP.objects.filter(
+                recipient=recipient, purpose=purpose, status=OTPStatuses.ACTIVE
+            ).update(status=OTPStatuses.INACTIVE)
+
+            OTP.objects.create(
+                otp=code,
+                purpose=purpose,
+                status=OTPStatuses.ACTIVE,
+                channel=channel,
+                recipient=recipient,
+                expire_at=timezone.now() + timedelta(minutes=settings.OTP_EXPIRATION_MINUTES),
+            )
+
+    def verify(self, code: str, purpose: str, recipient: str, consume: bool = False) -> bool:
+        """
+        Check the code and mark the OTP as verified, or consume it.
+
+        Args:
+            code (str): The code sent to the recipient.
+            purpose (str): The purpose of the OTP.
+            recipient (str): The recipient of the OTP.
+            consume (bool): Use the OTP, it cannot be verified again.
+
+        Returns:
+            bool: True if the code is the one of the active OTP.
+        """
+        otp = self.get_active(purpose, recipient)
+
+        if otp is None or not codes_match(otp.otp, code):
+            return False
+
+        active = OTP.objects.filter(id=otp.id, status=OTPStatuses.ACTIVE)
+
+        if otp.expire_at <= timezone.now():
+            active.update(status=OTPStatuses.EXPIRED)
+            return False
+
+        if consume:
+            # the conditional UPDATE only matches while the OTP is active, a single request
+            # consumes it
+            return active.update(status=OTPStatuses.USED, verified=True) == 1
+
+        if not otp.verified:
+            active.update(verified=True)
+
+        return True
+
+    def is_verified(self, code: str, purpose: str, recipient: str) -> bool:
+        otp = self.get_active(purpose, recipient)
+
+        if otp is None or not codes_match(otp.otp, code):
+            return False
+
+        return otp.verified and otp.expire_at > timezone.now()
@@ -0,0 +1,241 @@
+"""
+Query inspection for development and CI: captures the SQL executed in a block (or a request),
+flags the statements repeated with different parameters (N+1 queries) and the slow ones, and
+checks query budgets.
+
+Usage:
+    with QueryInspector() as inspector:
+        client.get("/api/v1/stories/")
+
+    inspector.assert_budget(max_queries=3)
+"""
+
+import logging
+import re
+import time
+
+from contextlib import ExitStack
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)")
+WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def get_statement_shape(sql: str) -> str:
+    """
+    Return the shape of a statement: the SQL without its literal values, so the same query run
+    with different parameters (or IN lists of different lengths) has the same shape.
+
+    Args:
+        sql (str): The SQL statement.
+
+    Returns:
+        str: The normalized statement.
+    """
+    sql = STRING_LITERAL.sub("?", sql)
+    sql = NUMBER_LITERAL.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    sql = PLACEHOLDER_LIST.sub("(?...)", sql)
+
+    return WHITESPACE.sub(" ", sql).strip()
+
+
+def get_query_budget(request) -> int | None:
+    """
+    Return the query budget of the endpoint of the request, see QUERY_BUDGETS.
+    """
+    resolver_match = getattr(request, "resolver_match", None)
+
+    if resolver_match is None:
+        return None
+
+    return settings.QUERY_BUDGETS.get(f"{request.method} {resolver_match.url_name}")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class CapturedQuery:
+    def __init__(self, sql: str, duration: float, alias: str):
+        self.sql = sql
+        self.duration = duration
+        self.alias = alias
+
+    @property
+    def shape(self) -> str:
+        return get_statement_shape(self.sql)
+
+    @property
+    def is_write(self) -> bool:
+        return self.sql.lstrip()[:6].upper() in ("INSERT", "UPDATE", "DELETE")
+
+
+class QueryInspector:
+    """
+    Capture the queries executed on every database connection while the context is active.
+
+    Args:
+        repeat_threshold (int): Number of executions of a statement shape from which it is
+            flagged as an N+1 query. Defaults to QUERY_INSPECTOR_REPEAT_THRESHOLD.
+        slow_query_ms (float): Duration from which a query is flagged as slow. Defaults to
+            QUERY_INSPECTOR_SLOW_QUERY_MS.
+    """
+
+    def __init__(self, repeat_threshold: int | None = None, slow_query_ms: float | None = None):
+        self.repeat_threshold = repeat_threshold or settings.QUERY_INSPECTOR_REPEAT_THRESHOLD
+        self.slow_query_ms = slow_query_ms or settings.QUERY_INSPECTOR_SLOW_QUERY_MS
+        self.queries: list[CapturedQuery] = []
+        self._stack = None
+
+    def __enter__(self):
+        self._stack = ExitStack()
+
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self._wrapper(connection.alias)))
+
+        return self
+
+    def __exit__(self, *args):
+        self._stack.close()
+        self._stack = None
+
+    def _wrapper(self, alias: str):
+        def capture(execute, sql, params, many, context):
+            start = time.perf_counter()
+
+            try:
+                return execute(sql, params, many, context)
+
+            finally:
+                self.queries.append(CapturedQuery(sql, time.perf_counter() - start, alias))
+
+        return capture
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def duration(self) -> float:
+        return sum(query.duration for query in self.queries)
+
+    @property
+    def writes(self) -> int:
+        return sum(query.is_write for query in self.queries)
+
+    def get_repeated_statements(self) -> list:
+        """
+        Return the statement shapes executed at least ``repeat_threshold`` times, most
+        repeated first, as ``(shape, count)`` tuples.
+        """
+        counts = {}
+
+        for query in self.queries:
+            counts[query.shape] = counts.get(query.shape, 0) + 1
+
+        repeated = [
+            (shape, count) for shape, count in counts.items() if count >= self.repeat_threshold
+        ]
+
+        return sorted(repeated, key=lambda item: item[1], reverse=True)
+
+    def get_slow_queries(self) -> list:
+        """
+        Return the queries that took longer than ``slow_query_ms``, slowest first.
+        """
+        slow = [query for query in self.queries if query.duration * 1000 >= self.slow_query_ms]
+
+        return sorted(slow, key=lambda query: query.duration, reverse=True)
+
+    def get_problems(self, max_queries: int | None = None, max_writes: int | None = None) -> list:
+        """
+        Return the human readable problems found: N+1 queries, slow queries and the query
+        budget exceeded when ``max_queries`` is given, the write budget (INSERT, UPDATE and
+        DELETE statements) when ``max_writes`` is given.
+        """
+        problems = []
+
+        if max_queries is not None and self.count > max_queries:
+            problems.append(f"{self.count} queries, the budget is {max_queries}")
+
+        if max_writes is not None and self.writes > max_writes:
+            problems.append(f"{self.writes} writes, the budget is {max_writes}")
+
+            for query in self.queries:
+                if query.is_write:
+                    problems.append(f"write: {query.sql[:300]}")
+
+        for shape, count in self.get_repeated_statements():
+            problems.append(f"N+1: {count} executions of {shape[:300]}")
+
+        for query in self.get_slow_queries():
+            problems.append(f"slow query ({query.duration * 1000:.1f} ms): {query.sql[:300]}")
+
+        return problems
+
+    def assert_budget(
+        self,
+        max_queries: int | None = None,
+        allow_repeated: bool = False,
+        max_writes: int | None = None,
+    ):
+        """
+        Raise QueryBudgetExceeded when the budget is exceeded, or when a statement is repeated
+        (N+1) or slow.
+
+        Args:
+            max_queries (int): The maximum number of queries.
+            allow_repeated (bool): Do not fail on repeated statements, e.g. for bulk endpoints.
+            max_writes (int): The maximum number of INSERT, UPDATE and DELETE statements.
+        """
+        problems = [
+            problem
+            for problem in self.get_problems(max_queries, max_writes)
+            if not (allow_repeated and problem.startswith("N+1"))
+        ]
+
+        if problems:
+            raise QueryBudgetExceeded("\n".join(problems))
+
+
+class QueryInspectorMiddleware:
+    """
+    Opt-in middleware (QUERY_INSPECTOR_ENABLED) logging the N+1 and slow queries of every
+    request, and returning the query count and time in the X-Query-Count and
+    X-Query-Duration-Ms headers. For development only, it keeps every query in memory.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with QueryInspector() as inspector:
+            response = self.get_response(request)
+
+        response["X-Query-Count"] = str(inspector.count)
+        response["X-Query-Duration-Ms"] = f"{inspector.duration * 1000:.1f}"
+
+        problems = inspector.get_problems(max_queries=get_query_budget(request))
+
+        if problems:
+            logger.warning(
+                "%s %s ran %s queries in %.1f ms:\n%s",
+                request.method,
+                request.path,
+                inspector.count,
+                inspector.duration * 1000,
+                "\n".join(problems),
+            )
+
+        return response
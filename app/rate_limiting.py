@@ -0,0 +1,106 @@
+"""
+Rate limits of the public endpoints, per client IP and per account.
+
+The requests are counted in the shared cache (Redis when REDIS_URL is set) with the sliding
+window counter algorithm: the count of the current fixed window plus the count of the previous
+one weighted by the part of it still inside the sliding window. That is two small counters per
+client instead of the timestamp list of every request kept by the DRF throttles.
+
+A view opts in with a scope of RATE_LIMITS:
+
+Usage:
+    class LoginView(APIView):
+        throttle_classes = [IPRateThrottle, AccountRateThrottle]
+        throttle_scope = "login"
+"""
+
+import hashlib
+
+from django.conf import settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    # the key of RATE_LIMITS[scope] holding the rate of the throttle
+    kind: str = ""
+
+    def __init__(self):
+        # the rate is read on each request, from the scope of the view
+        self.wait_time = None
+
+    def get_cache_key(self, request, view) -> str | None:
+        """
+        Return the client the requests are counted for, None to not limit the request.
+        """
+        raise NotImplementedError
+
+    def get_rate(self) -> str | None:
+        return settings.RATE_LIMITS.get(self.scope, {}).get(self.kind)
+
+    def allow_request(self, request, view) -> bool:
+        self.scope = getattr(view, "throttle_scope", None)
+        self.rate = self.get_rate()
+
+        if not settings.RATE_LIMITING_ENABLED or self.rate is None:
+            return True
+
+        client = self.get_cache_key(request, view)
+
+        if client is None:
+            return True
+
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+
+        now = self.timer()
+        window, elapsed = divmod(now, self.duration)
+        key = f"ratelimit:{self.scope}:{self.kind}:{client}"
+        current_key, previous_key = f"{key}:{window:.0f}", f"{key}:{window - 1:.0f}"
+
+        # counted before the check, concurrent requests cannot all slip under the limit; the
+        # counter lives two windows, as the previous window of the next one
+        self.cache.add(current_key, 0, timeout=self.duration * 2)
+        current = self.cache.incr(current_key)
+        previous = self.cache.get(previous_key, 0)
+
+        weight = 1 - elapsed / self.duration
+
+        if previous * weight + current <= self.num_requests:
+            return True
+
+        # the time until the previous window has decayed enough, or the next window
+        if current > self.num_requests:
+            self.wait_time = self.duration - elapsed
+        else:
+            decayed_weight = (self.num_requests - current) / previous
+            self.wait_time = max((weight - decayed_weight) * self.duration, 1)
+
+        return False
+
+    def wait(self) -> float | None:
+        return self.wait_time
+
+
+class IPRateThrottle(SlidingWindowRateThrottle):
+    kind = "ip"
+
+    def get_cache_key(self, request, view) -> str | None:
+        # X-Forwarded-For is trusted for NUM_PROXIES proxies, see the REST_FRAMEWORK settings
+        return self.get_ident(request)
+
+
+class AccountRateThrottle(SlidingWindowRateThrottle):
+    """
+    Counts the requests made for an email address, whatever the client, e.g. the login attempts
+    of a password spraying bot rotating its IP addresses.
+    """
+
+    kind = "account"
+
+    def get_cache_key(self, request, view) -> str | None:
+        email = request.data.get("email") if hasattr(request.data, "get") else None
+
+        if not isinstance(email, str) or not email.strip():
+            return None
+
+        # cache keys cannot contain every character of an email
+        return hashlib.sha256(email.strip().lower().encode()).hexdigest()
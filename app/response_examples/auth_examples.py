@@ -1,4 +1,4 @@
-from drf_yasg import openapi
+from app.swagger import openapi
 
 
 class AuthResponseExamples:
@@ -13,6 +13,8 @@ class AuthResponseExamples:
                     "data": {
                         "authToken": "eyJhbGciOiJIUzI1NiIsInR5cCI6Ikp",
                         "authTokenExp": "2024-04-17T19:42:11.864809Z",
+                        "refreshToken": "eyJhbGciOiJIUzI1NiIsInR5cCI6Ikp",
+                        "refreshTokenExp": "2024-05-17T19:27:11.864809Z",
                         "data": {
                             "id": "ac870942-efc2-42ca-bdc3-",
                             "username": "username",
@@ -30,6 +32,27 @@ class AuthResponseExamples:
         ),
     }
 
+    TOKEN_REFRESH_RESPONSE = {
+        "200": openapi.Response(
+            description="Token refreshed",
+            examples={
+                "application/json": {
+                    "message": "Token refreshed",
+                    "data": {
+                        "authToken": "eyJhbGciOiJIUzI1NiIsInR5cCI6Ikp",
+                        "authTokenExp": "2024-04-17T19:42:11.864809Z",
+                        "refreshToken": "eyJhbGciOiJIUzI1NiIsInR5cCI6Ikp",
+                        "refreshTokenExp": "2024-05-17T19:27:11.864809Z",
+                    },
+                }
+            },
+        ),
+        "401": openapi.Response(
+            description="Refresh Failed",
+            examples={"application/json": {"message": "Invalid or expired token"}},
+        ),
+    }
+
     PASSWORD_RESET_FIRST_RESPONSE = {
         "200": openapi.Response(
             description="Success",
@@ -94,6 +117,8 @@ class AuthResponseExamples:
                     "data": {
                         "authToken": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.",
                         "authTokenExp": "2024-04-24T10:50:45.391180Z",
+                        "refreshToken": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.",
+                        "refreshTokenExp": "2024-05-24T10:35:45.391180Z",
                         "data": {
                             "id": "6e0f0ef6-9030-4ef6-bd15-0b75c9d9bff8",
                             "username": "String",
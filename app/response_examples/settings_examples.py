@@ -1,4 +1,4 @@
-from drf_yasg import openapi
+from app.swagger import openapi
 
 
 class SettingsResponseExamples:
@@ -7,7 +7,17 @@ class SettingsResponseExamples:
     CHANGE_PASSWORD_RESPONSE = {
         "200": openapi.Response(
             description="Success",
-            examples={"application/json": {"message": "Password changed successfully"}},
+            examples={
+                "application/json": {
+                    "message": "Password changed successfully",
+                    "data": {
+                        "authToken": "eyJhbGciOiJIUzI1NiIsInR5cCI6Ikp",
+                        "authTokenExp": "2024-04-17T19:42:11.864809Z",
+                        "refreshToken": "eyJhbGciOiJIUzI1NiIsInR5cCI6Ikp",
+                        "refreshTokenExp": "2024-05-17T19:27:11.864809Z",
+                    },
+                }
+            },
         ),
         "400": openapi.Response(
             description="Failure",
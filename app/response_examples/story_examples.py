@@ -1,5 +1,5 @@
 from django.conf import settings
-from drf_yasg import openapi
+from app.swagger import openapi
 
 
 class StoryResponseExamples:
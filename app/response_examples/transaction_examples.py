@@ -1,4 +1,4 @@
-from drf_yasg import openapi
+from app.swagger import openapi
 
 
 class TransactionResponseExamples:
@@ -2,14 +2,15 @@ from typing import Any, Tuple
 
 from django.contrib.auth import authenticate
 from django.conf import settings
+from django.db.models import F
 
 from rest_framework import serializers
 
-import requests
-
 from app.validators import password_validator, email_not_exist_checker, email_exist_checker
 from app.enum_classes import APIMessages, AccountStatuses, OTPChannels, OTPPurposes
-from app.api_authentication import MyAPIAuthentication
+from app.api_authentication import MyAPIAuthentication, TokenRevocations
+from app.background_tasks import BackgroundTasks
+from app.http_client import OutboundHTTPClient
 from app.models import CustomUser
 from app.util_classes import (
     CodeGenerator,
@@ -121,24 +122,17 @@ class SignUpSerializer(serializers.Serializer):
         referral_code = self.validated_data.get("referral_code", None)
 
         if referral_code:
-            referral_user = CustomUser.objects.filter(referral_code=referral_code).first()
-            if referral_user:
-                referral_user.referred_users += 1
-                referral_user.save()
+            # a single UPDATE, concurrent signups with the same code are all counted
+            CustomUser.objects.filter(referral_code=referral_code).update(
+                referred_users=F("referred_users") + 1
+            )
 
         # create stripe connected account
         StripeHelper.create_connected_account(user_id=new_user.id)
 
         # login successful
-        auth_token, auth_exp = MyAPIAuthentication.get_access_token(
-            {
-                "user_id": str(new_user.id),
-            }
-        )
-
         data = {
-            "auth_token": auth_token,
-            "auth_token_exp": auth_exp,
+            **MyAPIAuthentication.get_auth_data(new_user),
             "data": ProfileDetailsSerializer(new_user).data,
         }
 
@@ -168,6 +162,8 @@ class LoginSerializer(serializers.Serializer):
             A tuple containing the authentication data and any error message. The authentication data is a dictionary with the following keys:
                 - auth_token: The authentication token.
                 - auth_token_exp: The expiration time of the authentication token.
+                - refresh_token: The refresh token, exchanged for new tokens.
+                - refresh_token_exp: The expiration time of the refresh token.
                 - data: The serialized profile details of the user.
 
             The error message is a string indicating the reason for the login failure.
@@ -192,18 +188,13 @@ class LoginSerializer(serializers.Serializer):
             # login successful
 
             # check the account setup on stripe, and update if needed
-            StripeHelper.get_connected_account(user_id=user.id)
-            user.refresh_from_db()
+            stripe_setup_complete = StripeHelper.get_connected_account(user_id=user.id)
 
-            auth_token, auth_exp = MyAPIAuthentication.get_access_token(
-                {
-                    "user_id": str(user.id),
-                }
-            )
+            if stripe_setup_complete is not None:
+                user.stripe_setup_complete = stripe_setup_complete
 
             data = {
-                "auth_token": auth_token,
-                "auth_token_exp": auth_exp,
+                **MyAPIAuthentication.get_auth_data(user),
                 "data": ProfileDetailsSerializer(user).data,
             }
 
@@ -212,6 +203,23 @@ class LoginSerializer(serializers.Serializer):
         return None, APIMessages.LOGIN_FAILURE
 
 
+class TokenRefreshSerializer(serializers.Serializer):
+    """Serializer class for exchanging a refresh token for new tokens"""
+
+    refresh_token = serializers.CharField()
+
+    def refresh(self) -> dict | None:
+        """
+        Exchange the refresh token for new access and refresh tokens, the refresh token can only
+        be used once.
+
+        Returns:
+            dict | None: The new tokens (auth_token, auth_token_exp, refresh_token and
+            refresh_token_exp), None if the refresh token is invalid, expired or revoked.
+        """
+        return MyAPIAuthentication.refresh_tokens(self.validated_data["refresh_token"])
+
+
 ################################################# Profile Serializer #######################################
 
 
@@ -294,15 +302,24 @@ class PasswordChangeSerializer(serializers.Serializer):
 
         return data
 
-    def change_password(self) -> None:
+    def change_password(self) -> dict:
         """
         A function to change the user's password. It retrieves the user object from the context, sets a new password provided in the validated data, saves the updated user object.
+
+        Returns:
+            dict: New tokens for the session changing the password, its previous ones are
+            revoked with the others, see MyAPIAuthentication.get_auth_data.
         """
 
         user: CustomUser = self.context.get("user")
         new_password = self.validated_data["new_password"]
         user.set_password(new_password)
-        user.save()
+        user.save(update_fields=["password", "last_edited_at"])
+
+        # log out the sessions opened with the previous password, a leaked refresh token included
+        TokenRevocations.revoke_user_tokens(user)
+
+        return MyAPIAuthentication.get_auth_data(user)
 
 
 ##################################### Delete Account Serializer ########################################
@@ -341,6 +358,8 @@ class DeleteAccountSerializer(serializers.Serializer):
         user.account_status = AccountStatuses.DEACTIVATED
         user.save()
 
+        TokenRevocations.revoke_user_tokens(user)
+
         # TODO finish this
 
 
@@ -446,29 +465,38 @@ class ForgotPasswordThirdSerializer(serializers.Serializer):
 
         return data
 
-    def reset_password(self) -> None:
+    def reset_password(self) -> bool:
         """
         Resets the password for a user.
 
         This function takes no parameters.
 
         Returns:
-            None: This function does not return any value.
+            bool: False if the OTP was used by another request in the meantime, the password is
+            then not reset.
         """
 
         email = self.validated_data["email"].lower().strip()
         code = self.validated_data["code"]
         new_password = self.validated_data["new_password"]
 
-        OTPHelper.verify_otp(
+        used = OTPHelper.verify_otp(
             otp=code, purpose=OTPPurposes.RESET_PASSWORD, recipient=email, mark_used=True
         )
 
+        if not used:
+            return False
+
         user = CustomUser.objects.get(email=email)
         user.account_status = AccountStatuses.ACTIVE
         user.set_password(new_password)
         user.save()
 
+        # log out the sessions opened with the previous password
+        TokenRevocations.revoke_user_tokens(user)
+
+        return True
+
 
 ######################################## GOOGLE OAuth Serializer ###############################3
 class GoogleOAuthSerializer(serializers.Serializer):
@@ -502,15 +530,8 @@ class GoogleOAuthSerializer(serializers.Serializer):
         try:
             user = CustomUser.objects.get(email=user_data["email"].lower().strip())
 
-            auth_token, auth_exp = MyAPIAuthentication.get_access_token(
-                {
-                    "user_id": str(user.id),
-                }
-            )
-
             data = {
-                "auth_token": auth_token,
-                "auth_token_exp": auth_exp,
+                **MyAPIAuthentication.get_auth_data(user),
                 "data": ProfileDetailsSerializer(user).data,
             }
 
@@ -528,23 +549,15 @@ class GoogleOAuthSerializer(serializers.Serializer):
 
             # get referral user and update
             if referral_code:
-                referral_user = CustomUser.objects.filter(referral_code=referral_code).first()
-                if referral_user:
-                    referral_user.referred_users += 1
-                    referral_user.save()
-
-            # create stripe connected account
-            StripeHelper.create_customer_account(user_id=new_user.id)
+                CustomUser.objects.filter(referral_code=referral_code).update(
+                    referred_users=F("referred_users") + 1
+                )
 
-            auth_token, auth_exp = MyAPIAuthentication.get_access_token(
-                {
-                    "user_id": str(new_user.id),
-                }
-            )
+            # create the stripe customer account in the background, the response does not need it
+            BackgroundTasks.submit(StripeHelper.create_customer_account, user_id=new_user.id)
 
             data = {
-                "auth_token": auth_token,
-                "auth_token_exp": auth_exp,
+                **MyAPIAuthentication.get_auth_data(new_user),
                 "data": ProfileDetailsSerializer(new_user).data,
             }
 
@@ -571,7 +584,9 @@ class GoogleOAuthSerializer(serializers.Serializer):
             "grant_type": "authorization_code",
         }
 
-        response = requests.post(settings.GOOGLE_ACCESS_TOKEN_OBTAIN_URL, data=data, timeout=60)
+        response = OutboundHTTPClient.post(
+            "google", settings.GOOGLE_ACCESS_TOKEN_OBTAIN_URL, data=data
+        )
 
         if not response.ok:
             return None, False
@@ -597,8 +612,8 @@ class GoogleOAuthSerializer(serializers.Serializer):
             None
         """
 
-        response = requests.get(
-            settings.GOOGLE_USER_INFO_URL, params={"access_token": access_token}, timeout=60
+        response = OutboundHTTPClient.get(
+            "google", settings.GOOGLE_USER_INFO_URL, params={"access_token": access_token}
         )
 
         if not response.ok:
@@ -622,6 +637,8 @@ class FaceBookOAuthSerializer(serializers.Serializer):
                 - If the authentication flow is successful, the user data is returned as a dictionary with the following keys:
                     - "auth_token": The authentication token.
                     - "auth_token_exp": The expiration time of the authentication token.
+                    - "refresh_token": The refresh token, exchanged for new tokens.
+                    - "refresh_token_exp": The expiration time of the refresh token.
                     - "data": The serialized profile details of the user.
                 - If the authentication flow fails, None is returned.
             - The success status, indicating whether the authentication flow was successful or not.
@@ -649,15 +666,8 @@ class FaceBookOAuthSerializer(serializers.Serializer):
         try:
             user = CustomUser.objects.get(email=user_data["email"].lower().strip())
 
-            auth_token, auth_exp = MyAPIAuthentication.get_access_token(
-                {
-                    "user_id": str(user.id),
-                }
-            )
-
             data = {
-                "auth_token": auth_token,
-                "auth_token_exp": auth_exp,
+                **MyAPIAuthentication.get_auth_data(user),
                 "data": ProfileDetailsSerializer(user).data,
             }
 
@@ -674,23 +684,15 @@ class FaceBookOAuthSerializer(serializers.Serializer):
             new_user.save()
 
             if referral_code:
-                referral_user = CustomUser.objects.filter(referral_code=referral_code).first()
-                if referral_user:
-                    referral_user.referred_users += 1
-                    referral_user.save()
+                CustomUser.objects.filter(referral_code=referral_code).update(
+                    referred_users=F("referred_users") + 1
+                )
 
-            # create stripe connected account
-            StripeHelper.create_customer_account(user_id=new_user.id)
-
-            auth_token, auth_exp = MyAPIAuthentication.get_access_token(
-                {
-                    "user_id": str(new_user.id),
-                }
-            )
+            # create the stripe customer account in the background, the response does not need it
+            BackgroundTasks.submit(StripeHelper.create_customer_account, user_id=new_user.id)
 
             data = {
-                "auth_token": auth_token,
-                "auth_token_exp": auth_exp,
+                **MyAPIAuthentication.get_auth_data(new_user),
                 "data": ProfileDetailsSerializer(new_user).data,
             }
 
@@ -716,8 +718,8 @@ class FaceBookOAuthSerializer(serializers.Serializer):
             "redirect_uri": redirect_uri,
         }
 
-        response = requests.get(
-            settings.FACEBOOK_ACCESS_TOKEN_OBTAIN_URL, params=query_params, timeout=60
+        response = OutboundHTTPClient.get(
+            "facebook", settings.FACEBOOK_ACCESS_TOKEN_OBTAIN_URL, params=query_params
         )
 
         if not response.ok:
@@ -739,27 +741,17 @@ class FaceBookOAuthSerializer(serializers.Serializer):
             Tuple[dict | None, bool]: A tuple containing the user information as a dictionary if successful, or None if unsuccessful. The second element of the tuple indicates whether the request was successful or not.
         """
 
-        response = requests.get(
+        # a single /me?fields= request returns the profile details, no need to look up the id first
+        response = OutboundHTTPClient.get(
+            "facebook",
             settings.FACEBOOK_PROFILE_ENDPOINT_URL,
-            params={"access_token": access_token},
-            timeout=60,
+            params={"access_token": access_token, "fields": settings.FACEBOOK_PROFILE_FIELDS},
         )
 
         if not response.ok:
             return None, False
 
-        user_id = response.json()["id"]
-
-        details_response = requests.get(
-            settings.FACEBOOK_PROFILE_DETAILS_URL.replace("USER-ID", user_id),
-            params={"access_token": access_token},
-            timeout=60,
-        )
-
-        if not details_response.ok:
-            return None, False
-
-        return details_response.json(), True
+        return response.json(), True
 
 
 class FireBaseOauthSerializer(serializers.Serializer):
@@ -774,15 +766,8 @@ class FireBaseOauthSerializer(serializers.Serializer):
         try:
             user = CustomUser.objects.get(email=user_data["email"].lower().strip())
 
-            auth_token, auth_exp = MyAPIAuthentication.get_access_token(
-                {
-                    "user_id": str(user.id),
-                }
-            )
-
             data = {
-                "auth_token": auth_token,
-                "auth_token_exp": auth_exp,
+                **MyAPIAuthentication.get_auth_data(user),
                 "data": ProfileDetailsSerializer(user).data,
             }
 
@@ -801,15 +786,8 @@ class FireBaseOauthSerializer(serializers.Serializer):
             # create stripe connected account
             StripeHelper.create_connected_account(user_id=new_user.id)
 
-            auth_token, auth_exp = MyAPIAuthentication.get_access_token(
-                {
-                    "user_id": str(new_user.id),
-                }
-            )
-
             data = {
-                "auth_token": auth_token,
-                "auth_token_exp": auth_exp,
+                **MyAPIAuthentication.get_auth_data(new_user),
                 "data": ProfileDetailsSerializer(new_user).data,
             }
 
@@ -2,37 +2,51 @@ from django.conf import settings
 
 from rest_framework import serializers
 
-from app.models import Story, Transaction, TransactionStatuses, TransactionTypes
+from app.caching import StoryCache, StoryDetailsCache
+from app.models import CustomUser, Story, Transaction, TransactionStatuses, TransactionTypes
 from app.util_classes import CodeGenerator, StripeHelper
 from app.serializers.story_serializers import StoryBriefDataSerializer
 
 
 class GetStoryDetailsSerializer:
     @staticmethod
-    def validate_story_reference(story_reference: str) -> Story | None:
+    def parse_story_reference(story_reference: str | None) -> str | None:
         """
-        A function to validate the story reference provided as input.
+        Extract the reference number of the story from the shared story reference.
 
         Parameters:
-            story_reference (str): The story reference to be validated.
+            story_reference (str): The story reference from the shared link, "xxxxxx-<reference number>".
 
         Returns:
-            Story | None: The validated story if found, else None.
+            str | None: The reference number of the story, None if the story reference is invalid.
         """
+        if not story_reference:
+            return None
 
         story_reference_split = story_reference.split("-")
 
         if len(story_reference_split) != 3:
             return None
 
-        actual_story_reference = "-".join(story_reference_split[1:])
+        return "-".join(story_reference_split[1:])
+
+    @classmethod
+    def validate_story_reference(cls, story_reference: str) -> Story | None:
+        """
+        A function to validate the story reference provided as input.
+
+        Parameters:
+            story_reference (str): The story reference to be validated.
 
-        story = Story.objects.filter(reference_number=actual_story_reference).first()
+        Returns:
+            Story | None: The validated story if found, else None.
+        """
+        actual_story_reference = cls.parse_story_reference(story_reference)
 
-        if story is None:
+        if actual_story_reference is None:
             return None
 
-        return story
+        return StoryCache.get_by_reference(actual_story_reference)
 
     @staticmethod
     def get_story_details(story) -> dict:
@@ -51,6 +65,36 @@ class GetStoryDetailsSerializer:
 
         return data
 
+    @classmethod
+    def get_cached_story_details(cls, story_reference: str) -> dict | None:
+        """
+        Returns the cached details of the story, from the database on a cache miss.
+
+        Parameters:
+            story_reference (str): The story reference from the shared link.
+
+        Returns:
+            dict | None: The cache entry with the details "data", "etag" and "last_modified",
+            None if the story does not exist.
+        """
+        actual_story_reference = cls.parse_story_reference(story_reference)
+
+        if actual_story_reference is None:
+            return None
+
+        entry = StoryDetailsCache.get(actual_story_reference)
+
+        if entry is None:
+            story = StoryCache.get_by_reference(actual_story_reference)
+
+            if story is None:
+                return None
+
+            data = dict(cls.get_story_details(story=story))
+            entry = StoryDetailsCache.set(actual_story_reference, data, story.last_edited_at)
+
+        return entry
+
 
 class GetPaymentLinkSerializer(serializers.Serializer):
     """Serializer class for getting the payment link"""
@@ -68,12 +112,7 @@ class GetPaymentLinkSerializer(serializers.Serializer):
 
         story_id = self.validated_data["story_id"]
 
-        story = Story.objects.filter(id=story_id).first()
-
-        if story is None:
-            return None
-
-        return story
+        return StoryCache.get_by_id(story_id)
 
     def get_payment_link(self, story: Story):
         """
@@ -116,8 +155,12 @@ class GetPaymentLinkSerializer(serializers.Serializer):
             int(int(story.price) * settings.STRIPE_APPLICATION_FEE_PERCENTAGE) * 100
         )
 
-        # get connected account id
-        connect_account_id = story.owner.customer_id
+        # get connected account id, read from the database as the cached owner can be stale
+        connect_account_id = (
+            CustomUser.objects.filter(id=story.owner_id)
+            .values_list("customer_id", flat=True)
+            .first()
+        )
 
         data = StripeHelper.generate_checkout_session_link(
             line_items=line_items,
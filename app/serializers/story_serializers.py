@@ -1,10 +1,17 @@
+import logging
+
 from django.conf import settings
 
 from rest_framework import serializers
 
 
+from app.metrics import track_upstream
 from app.models import CustomUser, Story, models
 from app.util_classes import MyPagination, CodeGenerator
+from app.serializers.values_serializer import ValuesSerializer, decimal_formatter, format_datetime
+
+
+logger = logging.getLogger(__name__)
 
 
 ########################################### Output serializers ###################################
@@ -29,6 +36,29 @@ class StoryBriefDataSerializer(serializers.ModelSerializer):
         return data
 
 
+class StoryBriefValuesSerializer(ValuesSerializer):
+    """Same output as StoryBriefDataSerializer, for lists of stories"""
+
+    fields = (
+        ("id", "id", str),
+        ("title", "title", str),
+        # the scale of the model field, as the DecimalField of StoryBriefDataSerializer
+        ("price", "price", decimal_formatter(Story._meta.get_field("price").decimal_places)),
+        ("author", "owner__username", str),
+        ("file_type", "file_type", str),
+        ("reference_number", "reference_number", str),
+        ("created_at", "created_at", format_datetime),
+    )
+
+    @classmethod
+    def post_process(cls, data: dict) -> dict:
+        data["shareable_link"] = (
+            settings.FRONT_END_SHARE_STORY_URL + f"xxxxxx-{data['reference_number']}"
+        )
+
+        return data
+
+
 class StoryFullDataSerializer(serializers.ModelSerializer):
     class Meta:
         model = Story
@@ -64,7 +94,11 @@ class StorySerializer:
         if page_error:
             return False, None, None
 
-        data = StoryBriefDataSerializer(result, many=True).data
+        if settings.FAST_LIST_SERIALIZATION:
+            data = StoryBriefValuesSerializer.serialize(result)
+
+        else:
+            data = StoryBriefDataSerializer(result, many=True).data
 
         return True, data, paginate_data
 
@@ -81,7 +115,7 @@ class StorySerializer:
         Returns:
             Union[dict, Story, None]: If the story is found and return_data is True, returns the serialized data of the story as a dictionary. If return_data is False, returns the story object. If the story is not found, returns None.
         """
-        story = Story.objects.filter(id=story_id, owner=user).first()
+        story = Story.objects.filter(id=story_id, owner=user).select_related("owner").first()
 
         if story:
             if return_data:
@@ -105,12 +139,13 @@ class StorySerializer:
         """
         try:
             # delete the file from s3 here
-            story.file.delete()
+            with track_upstream("s3"):
+                story.file.delete()
             story.delete()
             return True
 
-        except Exception as error:
-            print(f"Error when deleting story: {error}")
+        except Exception:
+            logger.exception("Error when deleting story %s", story.id)
             return False
 
 
@@ -172,7 +207,9 @@ class CreateStorySerializer(serializers.Serializer):
         new_story.file = self.validated_data["file"]
         new_story.file_type = self.validated_data["file"].name.split(".")[-1].upper()
 
-        new_story.save()
+        # saving uploads the file to s3
+        with track_upstream("s3"):
+            new_story.save()
 
         data = StoryBriefDataSerializer(new_story).data
 
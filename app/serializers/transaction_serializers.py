@@ -1,21 +1,44 @@
 from typing import Tuple, Dict, List
+
+from django.conf import settings
+
 from rest_framework import serializers
 
 
 from app.models import CustomUser, Transaction
 from app.util_classes import MyPagination
+from app.serializers.values_serializer import ValuesSerializer, decimal_formatter, format_datetime
+
+
+PAYABLE_AMOUNT_FIELD = Transaction._meta.get_field("payable_amount")
 
 
 class TransactionDataSerializer(serializers.ModelSerializer):
     """Serializer for transaction data"""
 
-    amount = serializers.DecimalField(source="payable_amount", max_digits=10, decimal_places=2)
+    amount = serializers.DecimalField(
+        source="payable_amount",
+        max_digits=PAYABLE_AMOUNT_FIELD.max_digits,
+        decimal_places=PAYABLE_AMOUNT_FIELD.decimal_places,
+    )
 
     class Meta:
         model = Transaction
         fields = ["id", "amount", "payment_type", "status", "created_at"]
 
 
+class TransactionValuesSerializer(ValuesSerializer):
+    """Same output as TransactionDataSerializer, for lists of transactions"""
+
+    fields = (
+        ("id", "id", str),
+        ("amount", "payable_amount", decimal_formatter(PAYABLE_AMOUNT_FIELD.decimal_places)),
+        ("payment_type", "payment_type", str),
+        ("status", "status", str),
+        ("created_at", "created_at", format_datetime),
+    )
+
+
 class TransactionSerializer:
     @staticmethod
     def get_user_transactions(request) -> Tuple[bool, List[Dict], Dict]:
@@ -43,6 +66,10 @@ class TransactionSerializer:
         if page_error:
             return False, None, None
 
-        data = TransactionDataSerializer(result, many=True).data
+        if settings.FAST_LIST_SERIALIZATION:
+            data = TransactionValuesSerializer.serialize(result)
+
+        else:
+            data = TransactionDataSerializer(result, many=True).data
 
         return True, data, paginate_data
@@ -0,0 +1,111 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+from django.db.models import QuerySet
+from django.utils import timezone
+
+
+def decimal_formatter(decimal_places: int):
+    """
+    Return a function formatting a Decimal like rest_framework's DecimalField, e.g. "12.50".
+    """
+    quantum = Decimal(1).scaleb(-decimal_places)
+
+    def format_decimal(value) -> str:
+        if not isinstance(value, Decimal):
+            value = Decimal(str(value))
+
+        return f"{value.quantize(quantum, rounding=ROUND_HALF_UP):f}"
+
+    return format_decimal
+
+
+def format_datetime(value) -> str:
+    """
+    Format a datetime like rest_framework's DateTimeField, in the current timezone and with a Z
+    suffix for UTC.
+    """
+    if settings.USE_TZ and timezone.is_aware(value):
+        value = timezone.localtime(value)
+
+    value = value.isoformat()
+
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+
+    return value
+
+
+class ValuesSerializer:
+    """
+    Fast path for list endpoints, builds the same dicts as a ModelSerializer straight from
+    ``values_list()`` rows, without instantiating fields or model instances per row.
+
+    Subclasses declare their fields in output order as ``(name, lookup, formatter)``, the lookup
+    is any values_list() expression (e.g. "owner__username") and the formatter converts the
+    database value, None values are returned as is like rest_framework does.
+
+    Usage:
+        data = TransactionValuesSerializer.serialize(queryset)
+    """
+
+    fields: tuple = ()
+
+    @classmethod
+    def get_lookups(cls) -> list:
+        return [lookup for _, lookup, _ in cls.fields]
+
+    @classmethod
+    def get_row_serializer(cls):
+        """
+        Return the function converting a values_list() row to the response dict, built once
+        per class.
+        """
+        row_serializer = cls.__dict__.get("_row_serializer")
+
+        if row_serializer is not None:
+            return row_serializer
+
+        names = tuple(name for name, _, _ in cls.fields)
+        formatters = tuple(
+            (name, formatter) for name, _, formatter in cls.fields if formatter is not None
+        )
+
+        def serialize_row(row) -> dict:
+            data = dict(zip(names, row))
+
+            for name, formatter in formatters:
+                value = data[name]
+
+                if value is not None:
+                    data[name] = formatter(value)
+
+            return data
+
+        cls._row_serializer = serialize_row
+
+        return serialize_row
+
+    @classmethod
+    def serialize(cls, queryset: QuerySet) -> list:
+        """
+        Serialize the rows of the queryset.
+
+        Args:
+            queryset (QuerySet): The queryset (or page of a queryset) to serialize.
+
+        Returns:
+            list: The serialized rows.
+        """
+        serialize_row = cls.get_row_serializer()
+
+        return [
+            cls.post_process(serialize_row(row)) for row in queryset.values_list(*cls.get_lookups())
+        ]
+
+    @classmethod
+    def post_process(cls, data: dict) -> dict:
+        """
+        Add the computed fields to a serialized row, override in the subclasses that have some.
+        """
+        return data
@@ -0,0 +1,149 @@
+import threading
+
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+
+class ServiceRegistry:
+    """
+    Registry of the third party clients (Firebase, Stripe) used by the app.
+
+    Clients are registered with a factory and only imported and initialized the first time
+    they are requested, so process startup (manage.py, gunicorn workers, tests) does not pay
+    for them or need their credentials unless they are actually used.
+
+    Usage:
+        stripe = ServiceRegistry.get("stripe")
+    """
+
+    _factories: dict = {}
+    _instances: dict = {}
+    _lock = threading.RLock()
+
+    @classmethod
+    def register(cls, name: str, factory) -> None:
+        """
+        Register the factory of a service. The factory takes no arguments and returns the client.
+
+        Args:
+            name (str): The name of the service.
+            factory (callable): The function that initializes the service.
+        """
+        with cls._lock:
+            cls._factories[name] = factory
+            cls._instances.pop(name, None)
+
+    @classmethod
+    def get(cls, name: str):
+        """
+        Return the service, initializing it on first use.
+
+        Args:
+            name (str): The name of the service.
+
+        Returns:
+            The initialized client returned by the service factory.
+        """
+        try:
+            return cls._instances[name]
+
+        except KeyError:
+            pass
+
+        with cls._lock:
+            if name not in cls._instances:
+                if name not in cls._factories:
+                    raise ImproperlyConfigured(f"No service registered with the name '{name}'")
+
+                cls._instances[name] = cls._factories[name]()
+
+            return cls._instances[name]
+
+    @classmethod
+    def is_initialized(cls, name: str) -> bool:
+        return name in cls._instances
+
+    @classmethod
+    @contextmanager
+    def override(cls, name: str, instance):
+        """
+        Replace a service while the context is active, e.g. by a stub in benchmarks.
+
+        Usage:
+            with ServiceRegistry.override("firebase_auth", StubFirebaseAuth()):
+                ...
+        """
+        with cls._lock:
+            previous = cls._instances.get(name)
+            cls._instances[name] = instance
+
+        try:
+            yield instance
+
+        finally:
+            with cls._lock:
+                if previous is None:
+                    cls._instances.pop(name, None)
+                else:
+                    cls._instances[name] = previous
+
+
+def initialize_firebase_auth():
+    """
+    Initialize the default Firebase Admin app and return the firebase_admin.auth module.
+    """
+    import firebase_admin
+    from firebase_admin import auth, credentials
+
+    if not settings.GOOGLE_APPLICATION_CREDENTIALS:
+        raise ImproperlyConfigured("GOOGLE_APPLICATION_CREDENTIALS is required to use Firebase")
+
+    try:
+        firebase_admin.get_app()
+
+    except ValueError:
+        cred = credentials.Certificate(settings.GOOGLE_APPLICATION_CREDENTIALS)
+        firebase_admin.initialize_app(cred)
+
+    return auth
+
+
+def initialize_stripe():
+    """
+    Configure the stripe module with the API key and the pooled outbound HTTP client.
+    """
+    import stripe
+
+    from app.http_client import OutboundHTTPClient
+
+    stripe.api_key = settings.STRIPE_SECRET_KEY
+
+    # stripe retries with idempotency keys itself, so its session does not retry at the adapter level
+    stripe.max_network_retries = settings.OUTBOUND_HTTP_MAX_RETRIES
+    stripe.default_http_client = stripe.RequestsClient(
+        timeout=(settings.OUTBOUND_HTTP_CONNECT_TIMEOUT, settings.OUTBOUND_HTTP_READ_TIMEOUT),
+        session=OutboundHTTPClient.get_session("stripe", retries=0),
+    )
+
+    return stripe
+
+
+def initialize_otp_store():
+    """
+    Return the OTP store selected by OTP_STORE, "cache" or "database".
+    """
+    from app.otp_store import CacheOTPStore, DatabaseOTPStore
+
+    stores = {"cache": CacheOTPStore, "database": DatabaseOTPStore}
+
+    if settings.OTP_STORE not in stores:
+        raise ImproperlyConfigured(f"OTP_STORE must be one of {list(stores)}")
+
+    return stores[settings.OTP_STORE]()
+
+
+ServiceRegistry.register("firebase_auth", initialize_firebase_auth)
+ServiceRegistry.register("stripe", initialize_stripe)
+ServiceRegistry.register("otp_store", initialize_otp_store)
@@ -0,0 +1,34 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from app.caching import StoryCache, StoryDetailsCache
+from app.enum_classes import TransactionStatuses
+from app.models import Story, Transaction
+
+
+@receiver(post_save, sender=Story)
+@receiver(post_delete, sender=Story)
+def invalidate_story_cache(sender, instance: Story, **kwargs):
+    """
+    Remove the story from the caches when it is edited or deleted.
+    """
+    StoryDetailsCache.invalidate(instance.reference_number)
+    StoryCache.invalidate(instance.id, reference_number=instance.reference_number)
+
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+def invalidate_story_transactions(sender, instance: Transaction, created=False, **kwargs):
+    """
+    Refresh the number of successful transactions of the cached story. Pending transactions
+    (payment links) do not change it, so creating or purging them keeps the story cached.
+    """
+    if instance.story_id is None:
+        return
+
+    if (
+        created or kwargs["signal"] is post_delete
+    ) and instance.status == TransactionStatuses.PENDING:
+        return
+
+    StoryCache.invalidate_transactions(instance.story_id)
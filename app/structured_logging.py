@@ -0,0 +1,127 @@
+"""
+Structured, non-blocking logging.
+
+Log records are put on an in-memory queue by the request threads and written by a single
+listener thread, so a slow stdout (e.g. under gunicorn) never blocks a request. Records are
+formatted as one JSON object per line and carry the correlation id of the request that emitted
+them (see app.middlewares.CorrelationIdMiddleware).
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+
+correlation_id: ContextVar[str | None] = ContextVar("correlation_id", default=None)
+
+
+class CorrelationIdFilter(logging.Filter):
+    """
+    Add the correlation id of the current request (or None) to the records. Django logs the
+    4xx/5xx responses after the middlewares returned, the id is then read from the request.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.correlation_id = correlation_id.get() or getattr(
+            getattr(record, "request", None), "correlation_id", None
+        )
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Format a record as a single line JSON object. Attributes passed with ``extra`` are added
+    to the object, e.g. ``logger.info("Payout created", extra={"amount": 10})``.
+    """
+
+    RESERVED_ATTRIBUTES = frozenset(
+        logging.LogRecord("", 0, "", 0, "", None, None).__dict__.keys()
+        | {"message", "asctime", "correlation_id"}
+    )
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "correlation_id": getattr(record, "correlation_id", None),
+            "module": record.module,
+            "line": record.lineno,
+        }
+
+        for key, value in record.__dict__.items():
+            if key not in self.RESERVED_ATTRIBUTES and not key.startswith("_"):
+                data[key] = value
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+
+        if record.exc_text:
+            data["exception"] = record.exc_text
+
+        if record.stack_info:
+            data["stack"] = self.formatStack(record.stack_info)
+
+        return json.dumps(data, default=str)
+
+
+class BackgroundQueueHandler(QueueHandler):
+    """
+    Queue the records and write them to the stream from a listener thread.
+
+    The records are formatted by the listener thread with the formatter of this handler, only
+    the message arguments and the traceback are resolved by the emitting thread, while they are
+    still valid.
+
+    Usage in LOGGING:
+        "console": {"()": "app.structured_logging.BackgroundQueueHandler", "formatter": "json"}
+    """
+
+    def __init__(self, stream=None):
+        super().__init__(queue.SimpleQueue())
+
+        self.target = logging.StreamHandler(stream)
+        self.listener = None
+        self.start_listener()
+
+        # flush the queue on exit, a forked worker does not inherit the listener thread
+        atexit.register(self.stop_listener)
+        os.register_at_fork(after_in_child=self.start_listener)
+
+    def start_listener(self) -> None:
+        self.listener = QueueListener(self.queue, self.target)
+        self.listener.start()
+
+    def stop_listener(self) -> None:
+        listener, self.listener = self.listener, None
+
+        if listener is not None:
+            listener.stop()
+
+    def setFormatter(self, fmt: logging.Formatter) -> None:
+        # the listener thread formats the records
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(record.__dict__)
+
+        record.msg = record.getMessage()
+        record.args = None
+
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+
+        return record
+
+    def close(self) -> None:
+        self.stop_listener()
+        self.target.close()
+        super().close()
@@ -0,0 +1,40 @@
+"""
+Thin wrapper around drf_yasg used by the views and the response examples.
+
+drf_yasg (and pkg_resources, which it imports for its version number) is only imported when the
+API documentation is enabled with SHOW_DOCS. Otherwise ``swagger_auto_schema`` is a no-op
+decorator and ``openapi`` only returns placeholders, so workers that never serve /docs/ do not
+pay for building the schema objects at import time.
+"""
+
+from django.conf import settings
+
+
+if settings.SHOW_DOCS:
+    from drf_yasg import openapi  # noqa: F401
+    from drf_yasg.utils import swagger_auto_schema  # noqa: F401
+
+else:
+
+    class openapi:  # pylint: disable=invalid-name
+        """Placeholder for drf_yasg.openapi when the documentation is disabled"""
+
+        IN_QUERY = "query"
+        TYPE_STRING = "string"
+        TYPE_INTEGER = "integer"
+
+        @staticmethod
+        def Parameter(*args, **kwargs):
+            return None
+
+        @staticmethod
+        def Response(*args, **kwargs):
+            return None
+
+    def swagger_auto_schema(*args, **kwargs):
+        """No-op replacement for drf_yasg.utils.swagger_auto_schema"""
+
+        def decorator(view_method):
+            return view_method
+
+        return decorator
@@ -0,0 +1,190 @@
+"""
+Signing keys of the authentication tokens (app.api_authentication).
+
+JWT_SIGNING_KEYS maps key ids to PEM private keys, Ed25519 (EdDSA) or P-256 (ES256). The
+JWT_ACTIVE_KEY_ID key signs the new tokens, the others only verify the tokens they signed, which
+is how a key is rotated. The keys are parsed once per process and a token names its key in the
+``kid`` header, so verifying a token is a dictionary lookup and a single signature check with a
+single algorithm.
+
+The public keys are published as a JWKS on /api/v1/auth/jwks.json, other services verify the
+tokens locally with any JWT library.
+
+Without JWT_SIGNING_KEYS, e.g. in development, the tokens are HS256-signed with SECRET_KEY. The
+HS256 tokens issued before the signing keys (no ``kid``) are accepted while
+JWT_ACCEPT_LEGACY_TOKENS is on.
+
+Usage:
+    token = TokenKeys.encode({"user_id": "...", "exp": ...})
+    claims = TokenKeys.decode(token)  # raises jwt.InvalidTokenError
+"""
+
+import json
+import threading
+
+import jwt
+
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from cryptography.hazmat.primitives.serialization import load_pem_private_key
+from jwt.algorithms import ECAlgorithm, OKPAlgorithm
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+# the key of the tokens signed with SECRET_KEY, never published
+LEGACY_KEY_ID = "hs256"
+
+KEY_SETTINGS = {
+    "JWT_SIGNING_KEYS",
+    "JWT_ACTIVE_KEY_ID",
+    "JWT_ACCEPT_LEGACY_TOKENS",
+    "SECRET_KEY",
+}
+
+
+class TokenKey:
+    def __init__(self, kid: str, algorithm: str, signing_key, verifying_key):
+        self.kid = kid
+        self.algorithm = algorithm
+        self.signing_key = signing_key
+        self.verifying_key = verifying_key
+
+    @classmethod
+    def from_pem(cls, kid: str, pem: str) -> "TokenKey":
+        """
+        Load a PEM private key, its type gives the algorithm of the tokens.
+
+        Raises:
+            ImproperlyConfigured: If the key is not an Ed25519 or P-256 private key.
+        """
+        try:
+            private_key = load_pem_private_key(pem.encode(), password=None)
+
+        except ValueError as error:
+            raise ImproperlyConfigured(f"JWT_SIGNING_KEYS[{kid!r}]: {error}") from error
+
+        if isinstance(private_key, ed25519.Ed25519PrivateKey):
+            algorithm = "EdDSA"
+        elif isinstance(private_key, ec.EllipticCurvePrivateKey) and isinstance(
+            private_key.curve, ec.SECP256R1
+        ):
+            algorithm = "ES256"
+        else:
+            raise ImproperlyConfigured(
+                f"JWT_SIGNING_KEYS[{kid!r}] must be an Ed25519 or a P-256 private key"
+            )
+
+        return cls(kid, algorithm, private_key, private_key.public_key())
+
+    def to_jwk(self) -> dict | None:
+        """
+        Return the public key as a JWK, None for the symmetric key.
+        """
+        if self.algorithm == "EdDSA":
+            jwk = OKPAlgorithm.to_jwk(self.verifying_key)
+        elif self.algorithm == "ES256":
+            jwk = ECAlgorithm.to_jwk(self.verifying_key)
+        else:
+            return None
+
+        return {**json.loads(jwk), "kid": self.kid, "alg": self.algorithm, "use": "sig"}
+
+
+class TokenKeys:
+    _keys: dict | None = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def load_keys() -> dict:
+        """
+        Parse the keys of the settings.
+
+        Returns:
+            dict: The TokenKey of every key id.
+        """
+        keys = {kid: TokenKey.from_pem(kid, pem) for kid, pem in settings.JWT_SIGNING_KEYS.items()}
+
+        if not keys or settings.JWT_ACCEPT_LEGACY_TOKENS:
+            secret = settings.SECRET_KEY
+            keys[LEGACY_KEY_ID] = TokenKey(LEGACY_KEY_ID, "HS256", secret, secret)
+
+        return keys
+
+    @classmethod
+    def get_keys(cls) -> dict:
+        if cls._keys is None:
+            with cls._lock:
+                if cls._keys is None:
+                    cls._keys = cls.load_keys()
+
+        return cls._keys
+
+    @classmethod
+    def clear(cls) -> None:
+        cls._keys = None
+
+    @classmethod
+    def get_signing_key(cls) -> TokenKey:
+        """
+        Return the key signing the new tokens: JWT_ACTIVE_KEY_ID, else the first signing key,
+        else the SECRET_KEY one.
+        """
+        keys = cls.get_keys()
+        kid = settings.JWT_ACTIVE_KEY_ID or next(iter(settings.JWT_SIGNING_KEYS), LEGACY_KEY_ID)
+
+        if kid not in keys:
+            raise ImproperlyConfigured(f"JWT_ACTIVE_KEY_ID {kid!r} is not in JWT_SIGNING_KEYS")
+
+        return keys[kid]
+
+    @classmethod
+    def encode(cls, payload: dict) -> str:
+        key = cls.get_signing_key()
+
+        return jwt.encode(
+            payload, key.signing_key, algorithm=key.algorithm, headers={"kid": key.kid}
+        )
+
+    @classmethod
+    def decode(cls, token: str, **options) -> dict:
+        """
+        Verify the token with the key named by its ``kid`` header.
+
+        Args:
+            token (str): The token.
+            options: The options of jwt.decode, e.g. ``{"require": ["exp"]}``.
+
+        Returns:
+            dict: The claims of the token.
+
+        Raises:
+            jwt.InvalidTokenError: If the token is malformed, expired, signed by an unknown key
+                or its signature does not match.
+        """
+        kid = jwt.get_unverified_header(token).get("kid", LEGACY_KEY_ID)
+        key = cls.get_keys().get(kid)
+
+        if key is None:
+            raise jwt.InvalidTokenError(f"Unknown key id {kid!r}")
+
+        # the algorithm comes from the key, never from the token
+        return jwt.decode(token, key.verifying_key, algorithms=[key.algorithm], options=options)
+
+    @classmethod
+    def get_jwks(cls) -> dict:
+        """
+        Return the public keys, the retired ones included while they still verify tokens.
+        """
+        jwks = (key.to_jwk() for key in cls.get_keys().values())
+
+        return {"keys": [jwk for jwk in jwks if jwk is not None]}
+
+
+@receiver(setting_changed)
+def reset_token_keys(*, setting, **kwargs):
+    # e.g. override_settings in the checks and benchmarks
+    if setting in KEY_SETTINGS:
+        TokenKeys.clear()
@@ -2,6 +2,8 @@ from django.urls import path
 
 from app.views.auth_views import (
     LoginView,
+    TokenRefreshView,
+    jwks_view,
     SignUpView,
     ChangePasswordView,
     ProfileView,
@@ -23,6 +25,7 @@ from app.views.download_views import (
     StoryDownloadView,
     StripeWebhookView,
 )
+from app.views.internal_views import CacheStatsView, metrics_view
 from app.views.referral_views import ReferralView
 from app.views.story_views import StoryView, SingleStoryView
 from app.views.transaction_views import TransactionView
@@ -32,6 +35,8 @@ from app.views.wallet_views import WalletView
 urlpatterns = [
     ######################################### auth paths #########################################
     path("auth/login/", LoginView.as_view(), name="login-view"),
+    path("auth/token/refresh/", TokenRefreshView.as_view(), name="token-refresh-view"),
+    path("auth/jwks.json", jwks_view, name="jwks-view"),
     path("auth/signup/", SignUpView.as_view(), name="sign-up-view"),
     path("auth/signup/google/", GoogleSignUpView.as_view(), name="google-sign-up-view"),
     path("auth/signup/facebook/", FacebookSignUpView.as_view(), name="facebook-sign-up-view"),
@@ -83,4 +88,7 @@ urlpatterns = [
     path("wallet/", WalletView.as_view(), name="wallet-view"),
     ############################################ referral paths #############################
     path("referral/", ReferralView.as_view(), name="referral-view"),
+    ############################################ internal paths #############################
+    path("internal/cache-stats/", CacheStatsView.as_view(), name="cache-stats-view"),
+    path("internal/metrics/", metrics_view, name="metrics-view"),
 ]
@@ -1,8 +1,9 @@
 from random import choices, shuffle
 import string
 import json
+import logging
 
-from datetime import timedelta
+from functools import lru_cache
 
 import smtplib
 import ssl
@@ -16,31 +17,32 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
 
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, MultiFernet
 
 from django.core.paginator import Paginator
 from django.conf import settings
-from django.utils import timezone
 from django.contrib.auth import get_user_model
-
-from firebase_admin import auth
+from django.utils import timezone
 
 from rest_framework.response import Response
 
-import stripe
+
+from app.camel_case import camelize_key
+from app.enum_classes import OTPChannels
+from app.metrics import track_upstream
+from app.services import ServiceRegistry
 
 
-from app.enum_classes import OTPStatuses
-from app.models import OTP
+logger = logging.getLogger(__name__)
 
 
 USER_MODEL = get_user_model()
-stripe.api_key = settings.STRIPE_SECRET_KEY
 
 
 def snake_case_to_camel_case(value: str):
     """
-    Convert a snake_case string to camelCase.
+    Convert a snake_case string to camelCase, with the same rules as the keys of the response
+    bodies (app.camel_case), which memoize the converted names.
 
     Args:
         value (str): The snake_case string to be converted.
@@ -48,14 +50,7 @@ def snake_case_to_camel_case(value: str):
     Returns:
         str: The camelCase string.
     """
-    splitted_string = value.split("_")
-
-    camel_string = splitted_string.pop(0)
-
-    for other_words in splitted_string:
-        camel_string += other_words.title()
-
-    return camel_string
+    return camelize_key(value)
 
 
 class APIResponses:
@@ -97,16 +92,13 @@ class APIResponses:
         }
 
         if errors is not None:
-            errors_list = []
-            for key, value in errors.items():
-                if isinstance(value, list):
-                    value = value[0]
-
-                key = snake_case_to_camel_case(key)
-
-                errors_list.append({"fieldName": key, "error": value})
-
-            context["errors"] = errors_list
+            context["errors"] = [
+                {
+                    "fieldName": snake_case_to_camel_case(key),
+                    "error": value[0] if isinstance(value, list) else value,
+                }
+                for key, value in errors.items()
+            ]
 
         return Response(context, status=status_code)
 
@@ -205,7 +197,8 @@ class MyPagination:
             return None, None, "Invalid page number"
 
         total_data = {
-            "itemsCount": queryset.count(),
+            # cached by the paginator, queryset.count() would run the count again
+            "itemsCount": paginator.count,
             "currentPage": current_page.number,
             "numberOfPages": paginator.num_pages,
             "nextPage": current_page.next_page_number() if current_page.has_next() else None,
@@ -258,14 +251,14 @@ class EmailSender:
             # Log in to server using secure context and send email
             context = ssl.create_default_context()
 
-            with smtplib.SMTP_SSL(
+            with track_upstream("smtp"), smtplib.SMTP_SSL(
                 settings.EMAIL_HOST, settings.EMAIL_PORT, context=context
             ) as server:
                 server.login(settings.EMAIL_HOST_USER, settings.EMAIL_HOST_PASSWORD)
                 server.sendmail(settings.EMAIL_HOST_USER, receiver, customer_text)
 
-        except Exception as error:
-            print(f"Error sending download email: {error}")
+        except Exception:
+            logger.exception("Error sending download email")
 
     @staticmethod
     def send_download_link_email(receiver: str, download_link: str):
@@ -300,17 +293,26 @@ class EmailSender:
             # Log in to server using secure context and send email
             context = ssl.create_default_context()
 
-            with smtplib.SMTP_SSL(
+            with track_upstream("smtp"), smtplib.SMTP_SSL(
                 settings.EMAIL_HOST, settings.EMAIL_PORT, context=context
             ) as server:
                 server.login(settings.EMAIL_HOST_USER, settings.EMAIL_HOST_PASSWORD)
                 server.sendmail(settings.EMAIL_HOST_USER, receiver, customer_text)
 
-        except Exception as error:
-            print(f"Error sending download email: {error}")
+        except Exception:
+            logger.exception("Error sending download email")
 
 
 class OTPHelper:
+    """
+    Issue and verify the one-time passwords, kept in the OTP store selected by OTP_STORE
+    (see app.otp_store).
+    """
+
+    @staticmethod
+    def get_store():
+        return ServiceRegistry.get("otp_store")
+
     @classmethod
     def throttle_otp(cls, recipient, purpose):
         """
@@ -324,27 +326,13 @@ class OTPHelper:
             True -> if creation of another otp should be allowed
             False -> if creation of another otp should be denied
         """
-
-        otp_object = OTP.objects.filter(purpose=purpose).filter(recipient=recipient).first()
-
-        if otp_object is None:
-            # there is no previous otp, so creation is allowed
-            return True
-
-        # there is an otp, compare the time it was created with the current time, to make sure it has passed the period
-
-        if otp_object.created_at < timezone.now().now() + timedelta(
-            minutes=settings.OTP_GENERATE_TIME_LAPSE_MINUTES
-        ):
-            # created_at is lower then the current time, so don't create new otp
-            return False
-
-        return True
+        return cls.get_store().can_issue(purpose=purpose, recipient=recipient)
 
     @classmethod
     def generate_otp(cls, purpose, channel, recipient):
         """
         Generates a one-time password (OTP) for the specified purpose, channel, and recipient.
+        The previous OTP of the recipient for the purpose is replaced.
 
         Parameters:
             purpose (str): The purpose of the OTP.
@@ -359,17 +347,7 @@ class OTPHelper:
         """
         code = CodeGenerator.generate_code()
 
-        new_otp = OTP()
-        new_otp.otp = code
-        new_otp.purpose = purpose
-        new_otp.status = OTPStatuses.ACTIVE
-        new_otp.channel = channel
-        new_otp.recipient = recipient
-        new_otp.expire_at = timezone.now().now() + timedelta(
-            minutes=settings.OTP_EXPIRATION_MINUTES
-        )
-
-        new_otp.save()
+        cls.get_store().issue(purpose=purpose, channel=channel, recipient=recipient, code=code)
 
         return code
 
@@ -391,34 +369,13 @@ class OTPHelper:
             None
 
         Notes:
-            - This method checks if there is an existing OTP for the given purpose and recipient.
-              If an existing OTP is found, it is marked as inactive.
-            - The generated OTP code is saved in the database.
+            - The previous OTP of the recipient for the purpose is replaced.
             - If the DEBUG setting is False, the OTP is sent to the recipient's email address using the EmailSender.send_otp_email() method.
 
         """
-        # try to see if an otp for this purpose exists already
-        previous_otps = (
-            OTP.objects.filter(recipient=recipient)
-            .filter(purpose=purpose)
-            .filter(status=OTPStatuses.ACTIVE)
-            # .filter(expire_at__lte=timezone.now().now())  # add this
-        )
+        channel = OTPChannels.SMS if phone_number else OTPChannels.EMAIL
 
-        previous_otps.update(status=OTPStatuses.INACTIVE)
-
-        code = CodeGenerator.generate_code()
-
-        new_otp = OTP()
-        new_otp.otp = code
-        new_otp.purpose = purpose
-        new_otp.status = OTPStatuses.ACTIVE
-        new_otp.recipient = recipient
-        new_otp.expire_at = timezone.now().now() + timedelta(
-            minutes=settings.OTP_EXPIRATION_MINUTES
-        )
-
-        new_otp.save()
+        code = cls.generate_otp(purpose=purpose, channel=channel, recipient=recipient)
 
         if not settings.DEBUG:
             # DEBUG is false
@@ -438,38 +395,15 @@ class OTPHelper:
             otp (str): The OTP to be verified.
             purpose (str): The purpose of the OTP.
             recipient (str): The recipient of the OTP.
-            mark_used (bool, optional): Whether to mark the OTP as used if it is valid. Defaults to False.
+            mark_used (bool, optional): Whether to mark the OTP as used if it is valid, atomically: only one caller can use an OTP. Defaults to False.
 
         Returns:
-            bool: True if the OTP is valid and has not expired, False otherwise.
-        """
-        # update the otp model
-        otp_object = (
-            OTP.objects.filter(status=OTPStatuses.ACTIVE)
-            .filter(recipient=recipient)
-            .filter(purpose=purpose)
-            .first()
+            bool: True if the OTP is valid and has not expired (and was not used by another caller), False otherwise.
+        """
+        return cls.get_store().verify(
+            code=otp, purpose=purpose, recipient=recipient, consume=mark_used
         )
 
-        if otp_object:
-            if otp == otp_object.otp:
-                if otp_object.expire_at <= timezone.now():
-                    otp_object.status = OTPStatuses.EXPIRED
-                    otp_object.save()
-                    return False
-
-                if mark_used:
-                    otp_object.status = OTPStatuses.USED
-
-                otp_object.verified = True
-                otp_object.save()
-
-                return True
-
-            return False
-
-        return False
-
     @classmethod
     def check_verified(cls, otp, purpose, recipient):
         """
@@ -483,21 +417,7 @@ class OTPHelper:
         Returns:
             bool: True if the provided OTP is verified, False otherwise.
         """
-        # update the otp model
-        otp_object = (
-            OTP.objects.filter(status=OTPStatuses.ACTIVE)
-            .filter(recipient=recipient)
-            .filter(purpose=purpose)
-            .first()
-        )
-
-        if otp_object:
-            if otp == otp_object.otp:
-                return otp_object.verified
-
-            return False
-
-        return False
+        return cls.get_store().is_verified(code=otp, purpose=purpose, recipient=recipient)
 
 
 class EncryptionHelper:
@@ -515,6 +435,27 @@ class EncryptionHelper:
         hashed_key = sha256(key).digest()
         return hashed_key[:32]
 
+    @classmethod
+    def get_cipher(cls) -> MultiFernet:
+        """
+        Return the cipher of the download tokens: the DOWNLOAD_TOKEN_KEYS, then the key derived
+        from SECRET_KEY, which encrypts when DOWNLOAD_TOKEN_KEYS is empty.
+        """
+        return cls._get_cipher(tuple(settings.DOWNLOAD_TOKEN_KEYS), settings.SECRET_KEY)
+
+    @staticmethod
+    @lru_cache(maxsize=4)
+    def _get_cipher(keys: tuple, secret: str) -> MultiFernet:
+        # built once per set of keys, not on every download
+        secret_key = secret.encode()
+
+        if len(secret_key) != 32:
+            secret_key = EncryptionHelper.ensure_32_bytes(secret_key)
+
+        legacy_key = Fernet(urlsafe_b64encode(secret_key))
+
+        return MultiFernet([Fernet(key) for key in keys] + [legacy_key])
+
     @classmethod
     def encrypt_download_payload(cls, payload: dict):
         """
@@ -530,20 +471,14 @@ class EncryptionHelper:
             None
 
         Algorithm:
-            1. Get the secret key from the settings module.
-            2. Ensure that the secret key is 32 bytes long.
-            3. Generate a Fernet key from the secret key.
-            4. Initialize a Fernet cipher instance with the key.
-            5. Convert the dictionary to a JSON string.
-            6. Encrypt the JSON string using the Fernet cipher.
-            7. Return the encrypted payload as a string.
+            1. Get the cached cipher of the download tokens (get_cipher).
+            2. Convert the dictionary to a JSON string.
+            3. Encrypt the JSON string with the first key of the cipher.
+            4. Return the encrypted payload as a string.
 
         Note:
-            - The secret key is obtained from the settings module.
-            - The secret key is converted to a Fernet key using the urlsafe_b64encode function.
-            - The Fernet cipher is initialized with the generated key.
+            - The keys are the DOWNLOAD_TOKEN_KEYS, then the key derived from SECRET_KEY.
             - The dictionary is converted to a JSON string using the json.dumps function.
-            - The JSON string is encrypted using the Fernet cipher.
             - The encrypted payload is returned as a string.
 
         Example:
@@ -552,28 +487,18 @@ class EncryptionHelper:
             print(encrypted_payload)
             # Output: 'gAAAAABd2Y5cQXc0Fk_x5DQ=='
         """
-        secret_key = settings.SECRET_KEY.encode()
-
-        if len(secret_key) != 32:
-            secret_key = cls.ensure_32_bytes(secret_key)
-
-        fernet_key = urlsafe_b64encode(secret_key)
-
-        # Initialize a Fernet cipher instance with the key
-        cipher_suite = Fernet(fernet_key)
-
         # Convert the dictionary to a JSON string
         json_str = json.dumps(payload)
 
         # Encrypt the JSON string
-        encrypted_str = cipher_suite.encrypt(json_str.encode()).decode()
+        encrypted_str = cls.get_cipher().encrypt(json_str.encode()).decode()
 
         return encrypted_str
 
     @classmethod
     def decrypt_download_payload(cls, token: str):
         """
-        Decrypts a download payload using a Fernet cipher.
+        Decrypts a download payload using a Fernet cipher, any key of get_cipher.
 
         Args:
             token (str): The encrypted download payload token.
@@ -582,17 +507,7 @@ class EncryptionHelper:
             dict or None: The decrypted JSON dictionary if successful, None otherwise.
         """
         try:
-            secret_key = settings.SECRET_KEY.encode()
-
-            if len(secret_key) != 32:
-                secret_key = cls.ensure_32_bytes(secret_key)
-
-            fernet_key = urlsafe_b64encode(secret_key)
-
-            # Initialize a Fernet cipher instance with the key
-            cipher_suite = Fernet(fernet_key)
-
-            decrypted_data = cipher_suite.decrypt(token).decode()
+            decrypted_data = cls.get_cipher().decrypt(token).decode()
 
             # Convert the dictionary to a JSON string
             json_dict = json.loads(decrypted_data)
@@ -600,7 +515,7 @@ class EncryptionHelper:
             return json_dict
 
         except Exception as error:
-            print("Error when decrypting download payload: ", error)
+            logger.warning("Error when decrypting download payload: %s", error)
 
             return None
 
@@ -608,19 +523,21 @@ class EncryptionHelper:
 class StripeHelper:
     @staticmethod
     def get_connected_account_login_link(connected_account_id: str):
+        stripe = ServiceRegistry.get("stripe")
+
         try:
             login_link = stripe.Account.create_login_link(connected_account_id)
 
-            print("Done creating login link for the user")
-
             return True, {"login_link": login_link["url"]}
 
-        except Exception as e:
-            print(f"Error when creating login link: {e}")
+        except Exception:
+            logger.exception("Error when creating login link for %s", connected_account_id)
             return False, None
 
     @staticmethod
     def get_connected_account_balance(connected_account_id: str):
+        stripe = ServiceRegistry.get("stripe")
+
         try:
             account_balance = stripe.Balance.retrieve(stripe_account=connected_account_id)
 
@@ -629,12 +546,10 @@ class StripeHelper:
                 "pending": account_balance["pending"][0]["amount"] / 100,
             }
 
-            print("Done fetching account balance for the user")
-
             return True, data
 
-        except Exception as e:
-            print(f"Error when fetching account balance: {e}")
+        except Exception:
+            logger.exception("Error when fetching account balance for %s", connected_account_id)
             return False, None
 
     @staticmethod
@@ -654,12 +569,13 @@ class StripeHelper:
             Exception: If there is an error when creating the payment intent from Stripe.
 
         """
+        stripe = ServiceRegistry.get("stripe")
 
         try:
             payment_intent = stripe.PaymentIntent.create(**data)
 
-        except Exception as e:
-            print(f"Error when creating payment intent from stripe: {e}")
+        except Exception:
+            logger.exception("Error when creating payment intent from stripe")
             return None, False
 
         data = {"client_secret": payment_intent.client_secret}
@@ -670,6 +586,8 @@ class StripeHelper:
     def generate_checkout_session_link(
         line_items: list, connected_account_id: str, application_fee_amount: int, reference: str
     ):
+        stripe = ServiceRegistry.get("stripe")
+
         try:
             checkout = stripe.checkout.Session.create(
                 mode="payment",
@@ -683,15 +601,24 @@ class StripeHelper:
                 cancel_url=settings.FRONTEND_PAYMENT_CANCEL_URL,
             )
 
-            print("Done creating a checkout session")
             return True, {"payment_link": checkout["url"]}
 
-        except Exception as e:
-            print(f"Error when creating a checkout session: {e}")
+        except Exception:
+            logger.exception("Error when creating a checkout session")
             return False, None
 
+    @staticmethod
+    def is_connected_account_id(customer_id: str | None) -> bool:
+        """
+        Tell the connected account ids (acct_...) from the ids of the customers created at the
+        OAuth signups (cus_...), both are stored in customer_id.
+        """
+        return bool(customer_id) and customer_id.startswith("acct_")
+
     @classmethod
     def create_connected_account(cls, user_id: str):
+        stripe = ServiceRegistry.get("stripe")
+
         try:
             user_account = USER_MODEL.objects.get(id=user_id)
 
@@ -706,43 +633,68 @@ class StripeHelper:
             )
 
             user_account.customer_id = customer["id"]
-            user_account.save()
+            user_account.save(update_fields=["customer_id", "last_edited_at"])
 
-            print("Done creating a connected account for the new user")
+            logger.info("Created connected account %s for user %s", customer["id"], user_id)
             return True
 
-        except Exception as e:
-            print(f"Error when creating a new connected account: {e}")
+        except Exception:
+            logger.exception("Error when creating a new connected account for user %s", user_id)
             return False
 
     @classmethod
-    def get_connected_account(cls, user_id: str):
+    def get_connected_account(cls, user_id: str) -> bool | None:
+        """
+        Sync the stripe_setup_complete flag of the user with the connected account, the user row
+        is only written when the flag changed.
+
+        Returns:
+            bool | None: Whether the account can accept payments, None if it could not be fetched
+            or the user has no connected account yet.
+        """
+        stripe = ServiceRegistry.get("stripe")
+
         try:
             user_account = USER_MODEL.objects.get(id=user_id)
 
+            if not cls.is_connected_account_id(user_account.customer_id):
+                return None
+
             connected_account = stripe.Account.retrieve(user_account.customer_id)
+            charges_enabled = connected_account["charges_enabled"]
 
-            print(connected_account)
+            if user_account.stripe_setup_complete != charges_enabled:
+                user_account.stripe_setup_complete = charges_enabled
+                user_account.save(update_fields=["stripe_setup_complete", "last_edited_at"])
 
-            user_account.stripe_setup_complete = connected_account["charges_enabled"]
-            user_account.save()
+            logger.debug(
+                "Fetched connected account %s, charges enabled: %s",
+                connected_account["id"],
+                charges_enabled,
+            )
 
-            print("Done fetching a connected account for the user")
+            return charges_enabled
 
-        except Exception as e:
-            print(f"Error when fetching a connected account: {e}")
+        except Exception:
+            logger.exception("Error when fetching the connected account of user %s", user_id)
+            return None
 
     @classmethod
     def create_connected_account_onboarding_link(cls, user_id: str):
+        stripe = ServiceRegistry.get("stripe")
+
         try:
             user_account = USER_MODEL.objects.get(id=user_id)
 
-            if user_account.customer_id is None:
+            # no account yet, or only the customer of an OAuth signup
+            if not cls.is_connected_account_id(user_account.customer_id):
                 account_success = cls.create_connected_account(user_id)
 
                 if not account_success:
                     return False, None
 
+                user_account.refresh_from_db(fields=["customer_id"])
+
             # encrypt the user id here
             payload = {"user_id": user_id}
             encrypted_auth_token = EncryptionHelper.encrypt_download_payload(payload=payload)
@@ -753,8 +705,6 @@ class StripeHelper:
                 + encrypted_auth_token
             )
 
-            print(refresh_url)
-
             account_link = stripe.AccountLink.create(
                 account=user_account.customer_id,
                 refresh_url=refresh_url,
@@ -762,11 +712,10 @@ class StripeHelper:
                 type="account_onboarding",
             )
 
-            print("Done creating a new account link for the user")
             return True, {"account_link": account_link["url"]}
 
-        except Exception as e:
-            print(f"Error when creating a new account link: {e}")
+        except Exception:
+            logger.exception("Error when creating a new account link for user %s", user_id)
             return False, None
 
     @staticmethod
@@ -780,6 +729,8 @@ class StripeHelper:
         Returns:
             None
         """
+        stripe = ServiceRegistry.get("stripe")
+
         try:
             user_account = USER_MODEL.objects.get(id=user_id)
 
@@ -789,11 +740,21 @@ class StripeHelper:
                 description=f"Custom Account for user {str(user_id)}",
             )
 
-            user_account.customer_id = customer["id"]
-            user_account.save()
+            # runs in the background: only set the id when the onboarding did not store a
+            # connected account in the meantime, which must not be overwritten
+            updated = USER_MODEL.objects.filter(id=user_id, customer_id__isnull=True).update(
+                customer_id=customer["id"], last_edited_at=timezone.now()
+            )
+
+            if not updated:
+                logger.info(
+                    "User %s already has a Stripe account, customer %s not stored",
+                    user_id,
+                    customer["id"],
+                )
 
-        except Exception as e:
-            print(f"Error when creating a new connected account: {e}")
+        except Exception:
+            logger.exception("Error when creating a new connected account for user %s", user_id)
 
     @staticmethod
     def create_bank_account(user_id: str, account_id: str, account_number: str, account_name: str):
@@ -809,13 +770,12 @@ class StripeHelper:
         Returns:
             None
 
-        Raises:
-            Exception: If there is an error when creating the bank account.
-
-        Prints:
-            - "Bank account created successfully" if the bank account is created successfully.
-            - "Error when creating bank account: {error_message}" if there is an error.
+        Logs:
+            - An info record with the bank account and user ids when the account is created.
+            - An error record with the traceback when creating it fails, the error is not raised.
         """
+        stripe = ServiceRegistry.get("stripe")
+
         try:
             bank_account = stripe.Customer.create_source(
                 account_id,
@@ -834,10 +794,10 @@ class StripeHelper:
             user_account.bank_account_id = bank_account["id"]
             user_account.save()
 
-            print("Bank account created successfully successfully")
+            logger.info("Created bank account %s for user %s", bank_account["id"], user_id)
 
-        except Exception as e:
-            print(f"Error when creating bank account: {e}")
+        except Exception:
+            logger.exception("Error when creating bank account for user %s", user_id)
 
     @staticmethod
     def process_payout(amount, bank_account_id, transaction_id, transaction_reference):
@@ -853,6 +813,7 @@ class StripeHelper:
         Returns:
             None
         """
+        stripe = ServiceRegistry.get("stripe")
 
         try:
             stripe.Payout.create(
@@ -867,8 +828,8 @@ class StripeHelper:
                 },
             )
 
-        except Exception as e:
-            print(f"Error when processing payout: {e}")
+        except Exception:
+            logger.exception("Error when processing payout of transaction %s", transaction_id)
 
 
 class FireBaseHelper:
@@ -876,43 +837,44 @@ class FireBaseHelper:
     def Firebase_validation(id_token: str):
         """
         This function receives id token sent by Firebase and
-        validate the id token then check if the user exist on
-        Firebase or not if exist it returns True else False
+        validate the id token, then reads the user details from the verified claims.
+
+        The email is taken from the token claims; Firebase is only asked for the user record
+        (an extra round trip) when the token does not carry an email claim.
+
+        The Google signing certificates used by ``verify_id_token`` are cached by firebase_admin
+        (CacheControl) for the max-age announced by Google, so they are not fetched per login.
         """
         try:
-            decoded_token = auth.verify_id_token(id_token)
+            auth = ServiceRegistry.get("firebase_auth")
+            with track_upstream("firebase"):
+                decoded_token = auth.verify_id_token(id_token)
             uid = decoded_token["uid"]
             provider = decoded_token["firebase"]["sign_in_provider"]
 
-            image = None
-            name = None
-
-            if "name" in decoded_token:
-                name = decoded_token["name"]
+            image = decoded_token.get("picture", None)
+            name = decoded_token.get("name", None)
+            email = decoded_token.get("email", None)
 
-            if "picture" in decoded_token:
-                image = decoded_token["picture"]
+            if not email:
+                try:
+                    with track_upstream("firebase"):
+                        email = auth.get_user(uid).email
 
-            try:
-                user = auth.get_user(uid)
-                if user:
-                    email = user.email
-                    data = {
-                        "uid": uid,
-                        "email": email,
-                        "name": name,
-                        "provider": provider,
-                        "picture": image,
-                    }
-
-                    return True, data
+                except Exception as error:
+                    logger.warning("Error when fetching user details for firebase oauth: %s", error)
+                    return False, None
 
-                return False, None
+            data = {
+                "uid": uid,
+                "email": email,
+                "name": name,
+                "provider": provider,
+                "picture": image,
+            }
 
-            except Exception as error:
-                print(f"Error when fetching user details for firebase oauth: {error}")
-                return False, None
+            return True, data
 
         except Exception as error2:
-            print(f"Error during the whole firebase oauth process: {error2}")
+            logger.warning("Error during the whole firebase oauth process: %s", error2)
             return False, None
@@ -1,4 +1,6 @@
-from django.http import HttpResponseRedirect
+from django.conf import settings
+from django.http import HttpResponseRedirect, JsonResponse
+from django.utils.cache import patch_cache_control
 from rest_framework.status import (
     HTTP_200_OK,
     HTTP_400_BAD_REQUEST,
@@ -11,7 +13,9 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import FormParser, MultiPartParser
 
 
-from drf_yasg.utils import swagger_auto_schema
+from app.rate_limiting import AccountRateThrottle, IPRateThrottle
+from app.swagger import swagger_auto_schema
+from app.token_keys import TokenKeys
 
 from app.response_examples.auth_examples import AuthResponseExamples
 from app.response_examples.settings_examples import SettingsResponseExamples
@@ -30,6 +34,7 @@ from app.serializers.auth_serializers import (
     GoogleOAuthSerializer,
     FaceBookOAuthSerializer,
     FireBaseOauthSerializer,
+    TokenRefreshSerializer,
 )
 
 
@@ -37,6 +42,9 @@ from app.serializers.auth_serializers import (
 
 
 class LoginView(APIView):
+    throttle_classes = [IPRateThrottle, AccountRateThrottle]
+    throttle_scope = "login"
+
     @swagger_auto_schema(
         request_body=LoginSerializer, responses=AuthResponseExamples.LOGIN_RESPONSE
     )
@@ -60,10 +68,53 @@ class LoginView(APIView):
         )
 
 
+class TokenRefreshView(APIView):
+    throttle_classes = [IPRateThrottle]
+    throttle_scope = "token_refresh"
+
+    @swagger_auto_schema(
+        request_body=TokenRefreshSerializer, responses=AuthResponseExamples.TOKEN_REFRESH_RESPONSE
+    )
+    def post(self, request, *args, **kwargs):
+        form = TokenRefreshSerializer(data=request.data)
+
+        if form.is_valid():
+            data = form.refresh()
+
+            if data is None:
+                return APIResponses.error_response(
+                    message=APIMessages.TOKEN_REFRESH_FAILURE, status_code=HTTP_401_UNAUTHORIZED
+                )
+
+            return APIResponses.success_response(
+                status_code=HTTP_200_OK, message=APIMessages.TOKEN_REFRESH_SUCCESS, data=data
+            )
+
+        return APIResponses.error_response(
+            status_code=HTTP_400_BAD_REQUEST,
+            message=APIMessages.FORM_ERROR,
+            errors=form.errors,
+        )
+
+
+def jwks_view(request):
+    """
+    Public keys of the authentication tokens (see app.token_keys), for the services verifying
+    the tokens themselves.
+    """
+    response = JsonResponse(TokenKeys.get_jwks())
+    patch_cache_control(response, public=True, max_age=settings.JWKS_MAX_AGE)
+
+    return response
+
+
 ################################## Signup Views #############################################
 
 
 class SignUpView(APIView):
+    throttle_classes = [IPRateThrottle, AccountRateThrottle]
+    throttle_scope = "signup"
+
     @swagger_auto_schema(
         request_body=SignUpSerializer, responses=AuthResponseExamples.SIGN_UP_RESPONSE
     )
@@ -85,6 +136,10 @@ class SignUpView(APIView):
 
 
 class GoogleSignUpView(APIView):
+    # the provider checks the account, only the clients are limited
+    throttle_classes = [IPRateThrottle]
+    throttle_scope = "login"
+
     @swagger_auto_schema(
         request_body=GoogleOAuthSerializer, responses=AuthResponseExamples.LOGIN_RESPONSE
     )
@@ -105,6 +160,10 @@ class GoogleSignUpView(APIView):
 
 
 class FacebookSignUpView(APIView):
+    # the provider checks the account, only the clients are limited
+    throttle_classes = [IPRateThrottle]
+    throttle_scope = "login"
+
     @swagger_auto_schema(
         request_body=FaceBookOAuthSerializer, responses=AuthResponseExamples.LOGIN_RESPONSE
     )
@@ -125,6 +184,10 @@ class FacebookSignUpView(APIView):
 
 
 class FirebaseOauthView(APIView):
+    # the provider checks the account, only the clients are limited
+    throttle_classes = [IPRateThrottle]
+    throttle_scope = "login"
+
     @swagger_auto_schema(request_body=FireBaseOauthSerializer)
     def post(self, request):
         form = FireBaseOauthSerializer(data=request.data)
@@ -246,10 +309,10 @@ class ChangePasswordView(APIView):
         form = PasswordChangeSerializer(data=request.data, context={"user": request.user})
 
         if form.is_valid():
-            form.change_password()
+            data = form.change_password()
 
             return APIResponses.success_response(
-                message=APIMessages.PASSWORD_CHANGED, status_code=HTTP_200_OK
+                message=APIMessages.PASSWORD_CHANGED, status_code=HTTP_200_OK, data=data
             )
 
         return APIResponses.error_response(
@@ -285,6 +348,9 @@ class DeleteAccountView(APIView):
 
 
 class ResetPasswordGenerateView(APIView):
+    throttle_classes = [IPRateThrottle, AccountRateThrottle]
+    throttle_scope = "otp"
+
     @swagger_auto_schema(
         request_body=ForgotPasswordFirstSerializer,
         responses=AuthResponseExamples.PASSWORD_RESET_FIRST_RESPONSE,
@@ -310,6 +376,9 @@ class ResetPasswordGenerateView(APIView):
 
 
 class ResetPasswordVerifyView(APIView):
+    throttle_classes = [IPRateThrottle, AccountRateThrottle]
+    throttle_scope = "otp"
+
     @swagger_auto_schema(
         request_body=ForgotPasswordSecondSerializer,
         responses=AuthResponseExamples.PASSWORD_RESET_SECOND_RESPONSE,
@@ -335,6 +404,9 @@ class ResetPasswordVerifyView(APIView):
 
 
 class ResetPasswordCompleteView(APIView):
+    throttle_classes = [IPRateThrottle, AccountRateThrottle]
+    throttle_scope = "otp"
+
     @swagger_auto_schema(
         request_body=ForgotPasswordThirdSerializer,
         responses=AuthResponseExamples.PASSWORD_RESET_THIRD_RESPONSE,
@@ -348,7 +420,12 @@ class ResetPasswordCompleteView(APIView):
         form = ForgotPasswordThirdSerializer(data=request.data)
 
         if form.is_valid():
-            form.reset_password()
+            if not form.reset_password():
+                return APIResponses.error_response(
+                    status_code=HTTP_400_BAD_REQUEST,
+                    message=APIMessages.FORM_ERROR,
+                    errors={"code": ["Unverified OTP, please verify to continue"]},
+                )
 
             return APIResponses.success_response(
                 message=APIMessages.PASSWORD_RESET, status_code=HTTP_200_OK
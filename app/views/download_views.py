@@ -1,27 +1,38 @@
+import logging
+
+from decimal import Decimal
+
 import requests
 
 from django.http import HttpResponseRedirect, HttpResponse
 from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 
-from drf_yasg import openapi
-from drf_yasg.utils import swagger_auto_schema
+from app.swagger import openapi, swagger_auto_schema
 
 from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST, HTTP_404_NOT_FOUND
 from rest_framework.views import APIView
 
-import stripe
-
+from app.caching import StoryCache
+from app.metrics import track_upstream
 from app.models import CustomUser, Story, Transaction
+from app.rate_limiting import AccountRateThrottle, IPRateThrottle
 from app.response_examples.download_examples import DownloadResponseExamples
 from app.util_classes import APIResponses, EncryptionHelper, EmailSender
 from app.enum_classes import APIMessages, TransactionStatuses
 from app.serializers.download_serializers import GetStoryDetailsSerializer, GetPaymentLinkSerializer
+from app.services import ServiceRegistry
 
 
-stripe.api_key = settings.STRIPE_SECRET_KEY
+logger = logging.getLogger(__name__)
 
 
 class GetStoryDetailsView(APIView):
+    # public endpoint, the same response for everyone so shared caches can store it
+    authentication_classes = []
+    read_from_replica = True
+
     story_reference = openapi.Parameter(
         "storyReference", openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True
     )
@@ -33,22 +44,37 @@ class GetStoryDetailsView(APIView):
     def get(self, request):
         story_reference = request.query_params.get("story_reference", None)
 
-        story = GetStoryDetailsSerializer.validate_story_reference(story_reference=story_reference)
+        details = GetStoryDetailsSerializer.get_cached_story_details(
+            story_reference=story_reference
+        )
 
-        if story is None:
+        if details is None:
             return APIResponses.error_response(
                 status_code=HTTP_404_NOT_FOUND,
                 message=APIMessages.STORY_DETAILS_ERROR,
             )
 
-        data = GetStoryDetailsSerializer.get_story_details(story=story)
-
-        return APIResponses.success_response(
-            message=APIMessages.SUCCESS, status_code=HTTP_200_OK, data=data
+        # answer If-None-Match / If-Modified-Since with a 304 when the story did not change
+        response = get_conditional_response(
+            request, etag=details["etag"], last_modified=details["last_modified"]
         )
 
+        if response is None:
+            response = APIResponses.success_response(
+                message=APIMessages.SUCCESS, status_code=HTTP_200_OK, data=details["data"]
+            )
+
+        response["ETag"] = details["etag"]
+        response["Last-Modified"] = http_date(details["last_modified"])
+        patch_cache_control(response, public=True, max_age=settings.STORY_DETAILS_MAX_AGE)
+
+        return response
+
 
 class GetPaymentLinkView(APIView):
+    throttle_classes = [IPRateThrottle, AccountRateThrottle]
+    throttle_scope = "payment_link"
+
     @swagger_auto_schema(
         request_body=GetPaymentLinkSerializer,
         responses=DownloadResponseExamples.STORY_PAYMENT_LINK_RESPONSE,
@@ -102,7 +128,7 @@ class StoryDownloadView(APIView):
 
                 actual_story_reference = "-".join(story_reference_split[1:])
 
-                story = Story.objects.filter(reference_number=actual_story_reference).first()
+                story = StoryCache.get_by_reference(actual_story_reference)
 
                 # get transaction for the story based on the story, and transaction reference that will replace email later on
                 transaction_object = Transaction.objects.get(
@@ -114,7 +140,8 @@ class StoryDownloadView(APIView):
                     return HttpResponseRedirect(settings.FRONTEND_DOWNLOAD_ERROR_URL)
 
                 # Download the file from the URL
-                response = requests.get(story.file.url, timeout=None)
+                with track_upstream("s3"):
+                    response = requests.get(story.file.url, timeout=None)
 
                 if response.status_code == 200:
                     # mark the file as downloaded in transaction model
@@ -241,13 +268,14 @@ class StripeWebhookView(APIView):
                 checkout_id = event["data"]["object"]["id"]
 
             except Exception as error:
-                print(f"error: {error}")
+                logger.warning("Error when fetching checkout id: %s", error)
                 return APIResponses.success_response(
                     message="Error when fetching checkout id", status_code=HTTP_200_OK
                 )
 
             # event_type = event["type"]
 
+            stripe = ServiceRegistry.get("stripe")
             response = stripe.checkout.Session.retrieve(checkout_id)
 
             reference = response["client_reference_id"]
@@ -268,7 +296,8 @@ class StripeWebhookView(APIView):
                     message=APIMessages.TRANSACTION_COMPLETED_ALREADY, status_code=HTTP_200_OK
                 )
 
-            amount_received = response["amount_received"] / 100
+            # in cents, a Decimal so it can be added to the wallet balance
+            amount_received = Decimal(response["amount_received"]) / 100
             status = response["status"]
 
             # # update the transaction details
@@ -0,0 +1,45 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotFound
+
+from rest_framework.permissions import IsAdminUser
+from rest_framework.status import HTTP_200_OK
+from rest_framework.views import APIView
+
+from app.caching import StoryCache
+from app.enum_classes import APIMessages
+from app.metrics import MetricsRegistry
+from app.util_classes import APIResponses
+
+
+class CacheStatsView(APIView):
+    """Hit counts and ratios of the caches of the process serving the request"""
+
+    swagger_schema = None
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        data = {"story_cache": StoryCache.get_stats()}
+
+        return APIResponses.success_response(
+            message=APIMessages.SUCCESS, status_code=HTTP_200_OK, data=data
+        )
+
+
+def metrics_view(request):
+    """
+    Prometheus metrics of the process serving the request (see app.metrics), for the scraper.
+    Requires the METRICS_AUTH_TOKEN bearer token, and does not exist when it is not set.
+    """
+    if not settings.METRICS_ENABLED or not settings.METRICS_AUTH_TOKEN:
+        return HttpResponseNotFound("Not Found", content_type="text/plain")
+
+    expected = f"Bearer {settings.METRICS_AUTH_TOKEN}"
+
+    if not hmac.compare_digest(request.headers.get("Authorization", ""), expected):
+        return HttpResponse("Unauthorized", status=401, content_type="text/plain")
+
+    return HttpResponse(
+        MetricsRegistry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -3,7 +3,7 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 
 
-from drf_yasg.utils import swagger_auto_schema
+from app.swagger import swagger_auto_schema
 
 
 from app.serializers.referral_serializers import ReferralSerializer
@@ -14,6 +14,7 @@ from app.response_examples.referral_examples import ReferralResponseExamples
 
 class ReferralView(APIView):
     permission_classes = [IsAuthenticated]
+    read_from_replica = True
 
     @swagger_auto_schema(responses=ReferralResponseExamples.GET_REFERRAL_RESPONSE)
     def get(self, request):
@@ -10,8 +10,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import FormParser, MultiPartParser
 
 
-from drf_yasg import openapi
-from drf_yasg.utils import swagger_auto_schema
+from app.swagger import openapi, swagger_auto_schema
 
 
 from app.util_classes import APIResponses
@@ -23,6 +22,10 @@ from app.response_examples.story_examples import StoryResponseExamples
 class StoryView(APIView):
     permission_classes = [IsAuthenticated]
     parser_classes = [FormParser, MultiPartParser]
+    # the GET requests read from the replicas, see app.db_router
+    read_from_replica = True
+    # the GET requests are authorized from the claims of the token, see app.api_authentication
+    stateless_auth = True
 
     search = openapi.Parameter(
         "search",
@@ -85,6 +88,7 @@ class StoryView(APIView):
 
 class SingleStoryView(APIView):
     permission_classes = [IsAuthenticated]
+    stateless_auth = True
 
     @swagger_auto_schema(
         responses=StoryResponseExamples.GET_SINGLE_STORY,
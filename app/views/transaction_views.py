@@ -6,8 +6,7 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 
 
-from drf_yasg import openapi
-from drf_yasg.utils import swagger_auto_schema
+from app.swagger import openapi, swagger_auto_schema
 
 
 from app.util_classes import APIResponses
@@ -18,6 +17,8 @@ from app.response_examples.transaction_examples import TransactionResponseExampl
 
 class TransactionView(APIView):
     permission_classes = [IsAuthenticated]
+    read_from_replica = True
+    stateless_auth = True
 
     page = openapi.Parameter(
         "page",
@@ -3,7 +3,7 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 
 
-from drf_yasg.utils import swagger_auto_schema
+from app.swagger import swagger_auto_schema
 
 
 from app.serializers.wallet_serializers import WalletSerializer
@@ -0,0 +1,17 @@
+"""
+gunicorn settings, read from the working directory when gunicorn starts (see the Dockerfile).
+
+The workers run GUNICORN_THREADS threads: a password hash (app.hashers) or a call to Stripe
+releases the GIL, so the other threads of the worker keep serving requests meanwhile.
+
+Every thread keeps its own persistent database connection (DATABASE_CONN_MAX_AGE), so an
+instance holds up to workers x (GUNICORN_THREADS + BACKGROUND_TASK_WORKERS) connections per
+database, the primary and each replica: 4 x (2 + 2) = 16 with the defaults. Raise the threads
+behind PgBouncer (DATABASE_PGBOUNCER), or size max_connections for it.
+"""
+
+import os
+
+
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "2"))